@@ -0,0 +1,11 @@
+"""
+benchmarks/__init__.py
+
+Version: 1.1.0
+Date: 2026-10-18
+Purpose: Performance benchmarks for SIMA Manager (run from support/flask)
+Project: SIMA
+
+ADDED: Benchmark package
+ADDED: suite (end-to-end cases, baseline regression check) and generate_tree corpus
+"""
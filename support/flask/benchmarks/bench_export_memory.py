@@ -0,0 +1,95 @@
+"""
+benchmarks/bench_export_memory.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Peak memory of streaming export vs the previous in-memory export
+Project: SIMA
+
+ADDED: Corpus builder and per-run child-process measurement
+
+Usage: python -m benchmarks.bench_export_memory [--files 10000 100000] [--legacy]
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import argparse
+import json
+import multiprocessing
+import resource
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.corpus import make_document
+
+FILES_PER_DIR = 1000
+
+def build_corpus(root: Path, count: int) -> Path:
+    """Write `count` small knowledge files under root (reused if present)"""
+    source = root / f"corpus_{count}"
+    marker = source / ".complete"
+    if marker.exists():
+        return source
+    for i in range(count):
+        folder = source / f"dir_{i // FILES_PER_DIR:04d}"
+        if i % FILES_PER_DIR == 0:
+            folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"LESS-{i:06d}.md").write_text(
+            make_document(i, sections=3, lines_per_section=8), encoding='utf-8')
+    marker.touch()
+    return source
+
+def legacy_export(source_dir: Path, output_file: Path) -> int:
+    """Pre-streaming export: whole archive in memory, dumped as one string"""
+    from modules.knowledge import KnowledgeFile
+    export_data = {"manifest": {"file_count": 0}, "files": []}
+    for file_path in source_dir.rglob("*.md"):
+        json_data = KnowledgeFile(file_path).to_json()
+        json_data['path'] = str(file_path.relative_to(source_dir))
+        export_data['files'].append(json_data)
+    export_data['manifest']['file_count'] = len(export_data['files'])
+    output_file.write_text(json.dumps(export_data, indent=2), encoding='utf-8')
+    return export_data['manifest']['file_count']
+
+def measure(mode: str, source_dir: str, output_file: str) -> dict:
+    """Run one export in this (fresh) process and report time and memory"""
+    from modules.managers import ExportManager
+    tracemalloc.start()
+    start = time.perf_counter()
+    if mode == 'legacy':
+        count = legacy_export(Path(source_dir), Path(output_file))
+    else:
+        count = ExportManager.export_to_json(Path(source_dir), Path(output_file))['file_count']
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    return {
+        'files': count,
+        'seconds': elapsed,
+        'traced_peak_mb': peak / 2 ** 20,
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'archive_mb': Path(output_file).stat().st_size / 2 ** 20
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Export peak-memory benchmark")
+    parser.add_argument('--files', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--legacy', action='store_true', help="also measure the in-memory export")
+    parser.add_argument('--workdir', type=Path, default=Path(tempfile.gettempdir()) / "sima_bench")
+    args = parser.parse_args()
+
+    modes = ['streaming', 'legacy'] if args.legacy else ['streaming']
+    ctx = multiprocessing.get_context('spawn')
+    print(f"{'mode':>10} {'files':>8} {'archive MB':>11} {'seconds':>8} {'traced MB':>10} {'max RSS MB':>11}")
+    for count in args.files:
+        source = build_corpus(args.workdir, count)
+        for mode in modes:
+            output = args.workdir / f"export_{mode}_{count}.json"
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                r = pool.submit(measure, mode, str(source), str(output)).result()
+            print(f"{mode:>10} {r['files']:>8} {r['archive_mb']:>11.1f} {r['seconds']:>8.1f} "
+                  f"{r['traced_peak_mb']:>10.1f} {r['max_rss_mb']:>11.1f}")
+            output.unlink()
+
+if __name__ == '__main__':
+    main()
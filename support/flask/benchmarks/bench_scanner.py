@@ -0,0 +1,80 @@
+"""
+benchmarks/bench_scanner.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Micro-benchmark single-pass scanner vs legacy multi-regex parsing
+Project: SIMA
+
+ADDED: Legacy parser reference and timing harness
+
+Usage: python -m benchmarks.bench_scanner [--sections N] [--repeat N]
+"""
+
+from pathlib import Path
+import argparse
+import re
+import time
+
+from modules.config import LANGUAGE_PATTERNS
+from modules.knowledge import KnowledgeFile
+from benchmarks.corpus import make_document
+
+def legacy_parse(content: str) -> dict:
+    """Replica of the pre-scanner KnowledgeFile.parse + to_json passes"""
+    metadata = {}
+    for line in content.split('\n')[:20]:
+        for field, key in (('**Version:**', 'version'), ('**Date:**', 'date'),
+                           ('**Purpose:**', 'purpose'), ('**Category:**', 'category'),
+                           ('**REF-ID:**', 'ref_id')):
+            if line.startswith(field):
+                metadata[key] = line.split(field)[1].strip()
+    languages = {lang for lang, pattern in LANGUAGE_PATTERNS.items() if re.search(pattern, content)}
+    re.search(r'^# (.+)$', content, re.MULTILINE)
+    re.search(r'\*\*Keywords:\*\* (.+)$', content, re.MULTILINE)
+    re.search(r'\*\*Related:\*\* (.+)$', content, re.MULTILINE)
+    line_count = len(content.split('\n'))
+    len(content.split('\n'))
+
+    sections, current, body = [], None, []
+    for line in content.split('\n'):
+        if line.startswith('## '):
+            if current:
+                sections.append((current, '\n'.join(body)))
+            current, body = line[3:].strip(), []
+        elif current:
+            body.append(line)
+    if current:
+        sections.append((current, '\n'.join(body)))
+    return {'metadata': metadata, 'languages': languages, 'line_count': line_count, 'sections': sections}
+
+def scanner_parse(content: str) -> dict:
+    """Current KnowledgeFile parse plus section extraction"""
+    kf = KnowledgeFile(Path('bench.md'), content)
+    kf.extract_sections()
+    return kf.state()
+
+def best_of(func, content: str, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[4])
+    parser.add_argument('--sections', type=int, nargs='+', default=[8, 64, 512, 2048])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'sections':>8} {'size KB':>9} {'legacy ms':>10} {'scanner ms':>11} {'speedup':>8}")
+    for sections in args.sections:
+        content = make_document(1, sections=sections)
+        legacy = best_of(legacy_parse, content, args.repeat)
+        scanner = best_of(scanner_parse, content, args.repeat)
+        print(f"{sections:>8} {len(content) / 1024:>9.1f} {legacy * 1000:>10.2f} "
+              f"{scanner * 1000:>11.2f} {legacy / scanner:>7.2f}x")
+
+if __name__ == '__main__':
+    main()
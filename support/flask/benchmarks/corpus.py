@@ -0,0 +1,140 @@
+"""
+benchmarks/corpus.py
+
+Version: 1.1.0
+Date: 2026-10-18
+Purpose: Deterministic synthetic SIMA knowledge documents and trees
+Project: SIMA
+
+ADDED: make_document generator
+ADDED: generate_tree (SIMA directory layout, navigation files, resolvable Related links)
+"""
+
+from pathlib import Path
+from typing import Dict, List
+import json
+import random
+
+from modules.config import LANGUAGE_PATTERNS
+
+WORDS = (
+    "cache gateway lambda import export index router pattern decision lesson "
+    "anti-pattern verification latency memory cold start dependency interface "
+    "boundary module config threshold retry timeout throughput isolation"
+).split()
+
+def _sentence(rng: random.Random, words: int = 12) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+# (directory, REF-ID prefix, category): files are spread over these round-robin
+LAYOUT = (
+    ('generic/lessons', 'LESS', 'Lessons'),
+    ('generic/decisions', 'DEC', 'Decisions'),
+    ('generic/anti-patterns', 'AP', 'Anti-Patterns'),
+    ('generic/core', 'ARCH', 'Core'),
+    ('platforms/aws/lambda', 'AWS-LAM', 'Platform'),
+    ('platforms/aws/dynamodb', 'AWS-DDB', 'Platform'),
+    ('languages/python/lessons', 'PY-LESS', 'Lessons'),
+    ('languages/python/anti-patterns', 'PY-AP', 'Anti-Patterns'),
+    ('projects/demo/decisions', 'PROJ-DEC', 'Decisions'),
+)
+FILES_PER_FOLDER = 500
+# File-name words (nothing that makes a name look like a navigation file)
+SLUG_WORDS = [w for w in WORDS if w not in ('index', 'router')]
+MARKER = '.corpus.json'
+
+def make_document(index: int, sections: int = 8, lines_per_section: int = 20, seed: int = 0,
+                  ref_id: str = None, category: str = None, related: List[str] = None) -> str:
+    """Build a knowledge file with header fields, sections, code fences and footer refs
+
+    Code fences rotate through every LANGUAGE_PATTERNS language across
+    sections and documents. Without `related`, three random DEC-NN IDs
+    are listed.
+    """
+    rng = random.Random(seed * 1000003 + index)
+    languages = list(LANGUAGE_PATTERNS)
+    ref_id = ref_id or f"LESS-{index:05d}"
+
+    lines = [
+        f"# {ref_id}: {_sentence(rng, 4)[:-1]}",
+        "",
+        "**Version:** 1.0.0",
+        "**Date:** 2026-10-18",
+        f"**Purpose:** {_sentence(rng, 8)}",
+        f"**Category:** {category or rng.choice(['Lessons', 'Decisions', 'Anti-Patterns', 'Core'])}",
+        f"**REF-ID:** {ref_id}",
+        "",
+        "---",
+        "",
+    ]
+    for s in range(sections):
+        lines.append(f"## Section {s + 1}")
+        lines.append("")
+        for _ in range(lines_per_section):
+            lines.append(_sentence(rng))
+        lang = languages[(index + s) % len(languages)]
+        lines.append("")
+        lines.append(f"```{lang}")
+        lines.extend(f"    step_{i}()  # {rng.choice(WORDS)}" for i in range(6))
+        lines.append("```")
+        lines.append("")
+
+    if related is None:
+        related = [f"DEC-{rng.randrange(1, 99):02d}" for _ in range(3)]
+    lines.append(f"**Keywords:** {', '.join(rng.sample(WORDS, 4))}")
+    lines.append(f"**Related:** {', '.join(related)}")
+    return '\n'.join(lines)
+
+def _navigation(title: str) -> str:
+    return f"# {title}\n\n**Version:** 1.0.0\n**Date:** 2026-10-18\n**Purpose:** Navigation\n\n---\n"
+
+def generate_tree(root: Path, count: int, seed: int = 0) -> Dict:
+    """Write a SIMA-shaped tree of `count` knowledge files under root (reused if already built)
+
+    Files are spread over LAYOUT (at most FILES_PER_FOLDER per folder),
+    named <REF-ID>-<slug>.md, with 3-10 sections of 3-12 lines and Related
+    links to 1-4 REF-IDs that exist earlier in the corpus. Each layout
+    directory gets a <dir>-Index.md and the root a master index and router,
+    so index and hierarchy code has real navigation files to find. The same
+    (count, seed) always produces the same bytes. Returns {root, files, bytes}.
+    """
+    root = Path(root)
+    marker = root / MARKER
+    if marker.exists():
+        summary = json.loads(marker.read_text(encoding='utf-8'))
+        if summary.get('files') == count and summary.get('seed') == seed:
+            return summary
+
+    rng = random.Random(seed)
+    ref_ids = []
+    total = 0
+    folders = set()
+    for i in range(count):
+        directory, prefix, category = LAYOUT[i % len(LAYOUT)]
+        number = i // len(LAYOUT)
+        folder = root / directory
+        if count > FILES_PER_FOLDER * len(LAYOUT):
+            folder = folder / f"part-{number // FILES_PER_FOLDER:03d}"
+        if folder not in folders:
+            folder.mkdir(parents=True, exist_ok=True)
+            folders.add(folder)
+        ref_id = f"{prefix}-{number + 1:02d}"
+        related = rng.sample(ref_ids, min(len(ref_ids), rng.randint(1, 4)))
+        text = make_document(i, sections=rng.randint(3, 10), lines_per_section=rng.randint(3, 12),
+                             seed=seed, ref_id=ref_id, category=category, related=related)
+        slug = '-'.join(rng.sample(SLUG_WORDS, 2)).title()
+        data = text.encode('utf-8')
+        (folder / f"{ref_id}-{slug}.md").write_bytes(data)
+        total += len(data)
+        ref_ids.append(ref_id)
+
+    for directory, _, _ in LAYOUT:
+        folder = root / directory
+        if folder.is_dir():
+            (folder / f"{folder.name}-Index.md").write_text(_navigation(f"{folder.name} Index"), encoding='utf-8')
+    (root / "SIMA-Master-Index-of-Indexes.md").write_text(_navigation("Master Index"), encoding='utf-8')
+    (root / "SIMA-Router.md").write_text(_navigation("Router"), encoding='utf-8')
+
+    summary = {'root': str(root), 'files': count, 'seed': seed, 'bytes': total}
+    marker.write_text(json.dumps(summary), encoding='utf-8')
+    return summary
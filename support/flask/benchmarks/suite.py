@@ -0,0 +1,226 @@
+"""
+benchmarks/suite.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: End-to-end benchmark suite with baseline regression check
+Project: SIMA
+
+ADDED: Cases for parsing, tree listing, index generation, export, import and JSONToMD
+ADDED: Per-case child processes, throughput and peak memory, stored baseline comparison
+
+Usage: python -m benchmarks.suite [--files 1000 10000] [--cases parse export ...]
+                                  [--repeat N] [--save-baseline] [--threshold 0.2]
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+import argparse
+import json
+import multiprocessing
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.corpus import generate_tree
+
+BASELINE_FILE = Path(__file__).with_name('baseline.json')
+
+# name -> setup(corpus, workdir) -> (run, reset); run() returns the number of items processed
+CASES = {}
+
+def case(name: str):
+    """Register a benchmark case"""
+    def register(setup: Callable[[Path, Path], Tuple[Callable[[], int], Callable[[], None]]]):
+        CASES[name] = setup
+        return setup
+    return register
+
+def _nothing():
+    pass
+
+def _knowledge_files(corpus: Path):
+    from modules.indexes import is_navigation_file
+    from modules.managers import FileBrowser
+    return [p for p in FileBrowser.walk_markdown(corpus) if not is_navigation_file(p.name)]
+
+
+@case('parse')
+def setup_parse(corpus: Path, workdir: Path):
+    """KnowledgeFile parsing of in-memory content"""
+    from modules.knowledge import KnowledgeFile
+    documents = [(p, p.read_text(encoding='utf-8')) for p in _knowledge_files(corpus)]
+
+    def run() -> int:
+        for path, text in documents:
+            KnowledgeFile(path, text)
+        return len(documents)
+    return run, _nothing
+
+@case('tree')
+def setup_tree(corpus: Path, workdir: Path):
+    """FileBrowser.get_tree over the whole corpus (no metadata)"""
+    from modules.managers import FileBrowser
+
+    def count(node: Dict) -> int:
+        return sum(count(c) if c['type'] == 'directory' else 1 for c in node.get('children', []))
+
+    def run() -> int:
+        return count(FileBrowser.get_tree(corpus, depth=-1, limit=1 << 30))
+    return run, _nothing
+
+@case('index')
+def setup_index(corpus: Path, workdir: Path):
+    """IndexGenerator.generate over the corpus, cold (no sidecar state)"""
+    from modules.indexes import IndexGenerator
+
+    def run() -> int:
+        return IndexGenerator.generate(corpus, "Bench Index").count('\n- ')
+    return run, _nothing
+
+@case('index-warm')
+def setup_index_warm(corpus: Path, workdir: Path):
+    """IndexGenerator.generate with sidecar state from a previous run (nothing changed)"""
+    from modules.indexes import IndexGenerator
+    state_file = workdir / 'bench.state.json'
+    IndexGenerator.generate(corpus, "Bench Index", state_file)
+
+    def run() -> int:
+        return IndexGenerator.generate(corpus, "Bench Index", state_file).count('\n- ')
+    return run, _nothing
+
+@case('export')
+def setup_export(corpus: Path, workdir: Path):
+    """ExportManager.export_to_json with a cold parse cache (serial, default format)"""
+    from modules.cache import PARSE_CACHE
+    from modules.managers import ExportManager
+    output = workdir / 'bench_export.json'
+
+    def run() -> int:
+        return ExportManager.export_to_json(corpus, output, workers=1)['file_count']
+    return run, PARSE_CACHE.clear
+
+@case('import')
+def setup_import(corpus: Path, workdir: Path):
+    """ExportManager.import_from_json of a full archive into an empty directory"""
+    from modules.managers import ExportManager
+    archive = workdir / 'bench_import.json'
+    ExportManager.export_to_json(corpus, archive, workers=1)
+    target = workdir / 'bench_import_target'
+
+    def run() -> int:
+        return len(ExportManager.import_from_json(archive, target))
+
+    def reset():
+        shutil.rmtree(target, ignore_errors=True)
+    return run, reset
+
+@case('json-to-md')
+def setup_json_to_md(corpus: Path, workdir: Path):
+    """JSONToMD.convert of v1 records held in memory"""
+    from modules.knowledge import JSONToMD, KnowledgeFile
+    records = [KnowledgeFile(p).to_json() for p in _knowledge_files(corpus)]
+
+    def run() -> int:
+        for record in records:
+            JSONToMD.convert(record)
+        return len(records)
+    return run, _nothing
+
+
+def measure(name: str, corpus: str, workdir: str, repeat: int, memory: bool) -> Dict:
+    """Run one case in this (fresh) process: best-of-`repeat` time, then one traced run"""
+    workdir = Path(workdir) / name
+    workdir.mkdir(parents=True, exist_ok=True)
+    try:
+        run, reset = CASES[name](Path(corpus), workdir)
+        best = float('inf')
+        items = 0
+        for _ in range(repeat):
+            reset()
+            start = time.perf_counter()
+            items = run()
+            best = min(best, time.perf_counter() - start)
+
+        peak = None
+        if memory:
+            reset()
+            tracemalloc.start()
+            run()
+            peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+        return {'items': items, 'seconds': best, 'peak_mb': peak}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def compare(result: Dict, base: Dict, threshold: float) -> Tuple[str, bool]:
+    """Change against the baseline entry and whether it is a regression"""
+    if not base:
+        return 'new', False
+    notes = []
+    speed = result['items_per_sec'] / base['items_per_sec'] - 1
+    notes.append(f"{speed:+.0%} speed")
+    regressed = speed < -threshold
+    if result['peak_mb'] is not None and base.get('peak_mb'):
+        memory = result['peak_mb'] / base['peak_mb'] - 1
+        notes.append(f"{memory:+.0%} mem")
+        regressed = regressed or memory > threshold
+    return ', '.join(notes) + (' REGRESSION' if regressed else ''), regressed
+
+def main():
+    parser = argparse.ArgumentParser(description="SIMA Manager benchmark suite")
+    parser.add_argument('--files', type=int, nargs='+', default=[1000])
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), default=list(CASES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help="skip the traced peak-memory run")
+    parser.add_argument('--workdir', type=Path, default=Path(tempfile.gettempdir()) / "sima_bench")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the baseline")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="relative slowdown or memory growth reported as a regression")
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text(encoding='utf-8')) if args.baseline.exists() else {}
+    results = {}
+    regressions = 0
+    ctx = multiprocessing.get_context('spawn')
+
+    print(f"{'case':>11} {'files':>7} {'seconds':>8} {'items/s':>9} {'MB/s':>7} {'peak MB':>8}  vs baseline")
+    for count in args.files:
+        corpus = generate_tree(args.workdir / f"tree_{count}_{args.seed}", count, args.seed)
+        corpus_mb = corpus['bytes'] / 2 ** 20
+        for name in args.cases:
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                r = pool.submit(measure, name, corpus['root'], str(args.workdir / 'runs'),
+                                max(1, args.repeat), not args.no_memory).result()
+            r['items_per_sec'] = r['items'] / r['seconds'] if r['seconds'] else 0.0
+            r['mb_per_sec'] = corpus_mb / r['seconds'] if r['seconds'] else 0.0
+            key = f"{name}@{count}"
+            results[key] = r
+            note, regressed = compare(r, baseline.get('results', {}).get(key), args.threshold)
+            regressions += regressed
+            peak = f"{r['peak_mb']:>8.1f}" if r['peak_mb'] is not None else f"{'-':>8}"
+            print(f"{name:>11} {count:>7} {r['seconds']:>8.3f} {r['items_per_sec']:>9.0f} "
+                  f"{r['mb_per_sec']:>7.1f} {peak}  {note}")
+
+    if args.save_baseline:
+        stored = baseline.get('results', {})
+        stored.update(results)
+        args.baseline.write_text(json.dumps({
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'saved': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'results': stored
+        }, indent=2), encoding='utf-8')
+        print(f"Baseline saved to {args.baseline}")
+    if regressions:
+        print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""
+gunicorn.conf.py
+
+Version: 1.0.1
+Date: 2026-10-18
+Purpose: gunicorn settings for serving SIMA with several worker processes
+Project: SIMA
+
+ADDED: Worker count, threads and bind address from the environment
+ADDED: on_starting hook clearing metrics snapshots
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('SIMA_BIND', f"{os.environ.get('SIMA_HOST', '127.0.0.1')}:{os.environ.get('SIMA_PORT', '5000')}")
+workers = int(os.environ.get('WEB_CONCURRENCY', min(4, multiprocessing.cpu_count() * 2 + 1)))
+# Threads keep Server-Sent Events streams from tying up a whole worker
+threads = int(os.environ.get('SIMA_THREADS', 4))
+worker_class = 'gthread'
+# Long exports and imports run as background jobs; synchronous requests may still take a while
+timeout = int(os.environ.get('SIMA_TIMEOUT', 120))
+# Each worker builds its own app: SQLite connections, job threads and the watcher must not cross fork()
+preload_app = False
+accesslog = '-'
+
+def on_starting(server):
+    """Start metrics from zero: drop worker snapshots left by the previous run"""
+    from modules.config import Config, apply_settings, load_settings
+    from modules.metrics import clear_snapshots
+    apply_settings(load_settings())
+    clear_snapshots(Config.METRICS_DIR)
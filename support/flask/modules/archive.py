@@ -0,0 +1,236 @@
+"""
+modules/archive.py
+
+Version: 1.5.1
+Date: 2026-10-18
+Purpose: Streaming JSON archive writer and reader
+Project: SIMA
+
+ADDED: new_manifest helper
+ADDED: ArchiveWriter (one file record at a time, bounded memory)
+ADDED: ArchiveReader (incremental decoder over the file stream)
+ADDED: Pre-encoded record writes for worker processes
+ADDED: Compact v2 layout (single body copy, section offsets, interned strings)
+ADDED: Optional gzip/lzma container (detected on read)
+ADDED: Index footer and IndexedArchive (mmap random access)
+ADDED: archive_id in manifests; trailing top-level fields (checksums, deleted) via close()
+MODIFIED: Record encoding and stream writes timed as "serialise"/"write" metrics phases
+MODIFIED: Writers moved to modules/archive_writer.py, IndexedArchive to modules/archive_index.py
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, TextIO
+import gzip
+import json
+import lzma
+import re
+import uuid
+
+from modules.config import Config
+
+ARCHIVE_VERSION = "1.0.0"
+ARCHIVE_VERSION_V2 = "2.0.0"
+SIMA_VERSION = "4.2.2"
+
+READ_CHUNK_SIZE = 1 << 20
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+COMPRESSION_SUFFIXES = {'': '.json', 'gzip': '.json.gz', 'lzma': '.json.xz'}
+
+GZIP_MAGIC = b'\x1f\x8b'
+XZ_MAGIC = b'\xfd7zXZ\x00'
+
+def new_manifest(archive_version: str = ARCHIVE_VERSION, **extra) -> Dict:
+    """Archive manifest with standard fields (file_count filled in on close)"""
+    manifest = {
+        "version": archive_version,
+        "sima_version": SIMA_VERSION,
+        "created": datetime.now().isoformat(),
+        "archive_id": uuid.uuid4().hex,
+    }
+    manifest.update(extra)
+    manifest["file_count"] = 0
+    return manifest
+
+def is_compact(manifest: Dict) -> bool:
+    """True for v2 (compact) archives"""
+    return str(manifest.get('version', '')).startswith('2.')
+
+def archive_filename(stem: str, compression: str = '') -> str:
+    """Export file name for a compression mode ('', 'gzip' or 'lzma')"""
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown compression: {compression!r}")
+    return stem + COMPRESSION_SUFFIXES[compression]
+
+def open_archive_output(path: Path, compression: str = '') -> BinaryIO:
+    """Binary output stream, optionally gzip or lzma compressed"""
+    if compression == 'gzip':
+        return gzip.open(path, 'wb', compresslevel=6)
+    if compression == 'lzma':
+        return lzma.open(path, 'wb', preset=6)
+    if compression:
+        raise ValueError(f"Unknown compression: {compression!r}")
+    return open(path, 'wb')
+
+def open_archive(path: Path) -> TextIO:
+    """Text stream over an archive, decompressing gzip/xz containers transparently"""
+    with open(path, 'rb') as f:
+        magic = f.read(len(XZ_MAGIC))
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if magic.startswith(XZ_MAGIC):
+        return lzma.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+def expand_record(record: Dict, strings: List[str], manifest: Dict) -> Dict:
+    """Rebuild the v1 record shape from a v2 record (for JSONToMD and importers)"""
+    def lookup(value):
+        return strings[value] if isinstance(value, int) else value
+
+    markdown = record.get('markdown', '')
+    languages = [lookup(l) for l in record.get('languages', [])]
+    line_count = record.get('line_count', markdown.count('\n') + 1)
+    created = manifest.get('created', datetime.now().isoformat())
+    return {
+        "format_version": "1.0.0",
+        "sima_version": manifest.get('sima_version', SIMA_VERSION),
+        "title": record.get('title', ''),
+        "ref_id": record.get('ref_id', ''),
+        "metadata": {
+            "version": lookup(record.get('version', '1.0.0')),
+            "date": lookup(record.get('date', '')),
+            "purpose": record.get('purpose', ''),
+            "category": lookup(record.get('category', '')),
+            "created": created,
+            "modified": created
+        },
+        "languages": languages,
+        "keywords": record.get('keywords', []),
+        "related": record.get('related', []),
+        "content": {
+            "markdown": markdown,
+            "sections": [{"heading": h, "content": markdown[start:end]}
+                         for h, start, end in record.get('sections', [])]
+        },
+        "flags": {
+            "has_code": len(languages) > 0,
+            "line_count": line_count,
+            "exceeds_limit": line_count > Config.MAX_FILE_LINES
+        },
+        "path": record.get('path', '')
+    }
+
+def archive_records(archive: Dict) -> Iterator[Dict]:
+    """v1-shaped records from an already-parsed archive dict (v1 or v2)"""
+    manifest = archive.get('manifest', {})
+    if not is_compact(manifest):
+        yield from archive.get('files', [])
+        return
+    strings = []
+    for record in archive.get('files', []):
+        strings.extend(record.get('+', []))
+        yield expand_record(record, strings, manifest)
+
+
+class ArchiveReader:
+    """Read a JSON export archive incrementally from a text stream
+
+    Top-level values other than "files" (the manifest, an appended
+    file_count) are decoded whole; file records are decoded and yielded one
+    at a time, so memory is bounded by the largest single record. v2
+    records are expanded to the v1 shape as they are read.
+    """
+
+    def __init__(self, stream: TextIO, chunk_size: int = READ_CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.fields = {}
+        self._decoder = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    @property
+    def manifest(self) -> Dict:
+        """Manifest (complete with trailing fields once files() is exhausted)"""
+        manifest = dict(self.fields.get('manifest', {}))
+        for key, value in self.fields.items():
+            if key not in ('manifest', 'index', 'index_offset'):
+                manifest[key] = value
+        return manifest
+
+    def _fill(self, size: int) -> bool:
+        """Append up to `size` characters; False at end of stream"""
+        if self._eof:
+            return False
+        if self._pos > len(self._buf) // 2:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        chunk = self.stream.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf += chunk
+        return True
+
+    def _skip_ws(self):
+        while True:
+            self._pos = WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf) or not self._fill(self.chunk_size):
+                return
+
+    def _expect(self, chars: str) -> str:
+        self._skip_ws()
+        char = self._buf[self._pos:self._pos + 1]
+        if not char or char not in chars:
+            raise ValueError(f"Malformed archive: expected one of {chars!r} at offset {self._pos}, got {char!r}")
+        self._pos += 1
+        return char
+
+    def _value(self):
+        """Decode the next JSON value, reading more input until it is complete"""
+        self._skip_ws()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+                # A value ending exactly at the buffer edge may be a truncated number
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            # Grow reads geometrically so large records decode in linear time
+            self._fill(max(self.chunk_size, len(self._buf) - self._pos))
+
+    def files(self) -> Iterator[Dict]:
+        """Yield file records in archive order"""
+        self._expect('{')
+        self._skip_ws()
+        if self._buf[self._pos:self._pos + 1] == '}':
+            return
+        while True:
+            key = self._value()
+            self._expect(':')
+            if key == 'files':
+                self._expect('[')
+                self._skip_ws()
+                if self._buf[self._pos:self._pos + 1] == ']':
+                    self._pos += 1
+                else:
+                    compact = is_compact(self.fields.get('manifest', {}))
+                    strings = []
+                    while True:
+                        record = self._value()
+                        if compact:
+                            strings.extend(record.get('+', []))
+                            record = expand_record(record, strings, self.fields['manifest'])
+                        yield record
+                        if self._expect(',]') == ']':
+                            break
+            else:
+                self.fields[key] = self._value()
+            if self._expect(',}') == '}':
+                return
@@ -0,0 +1,111 @@
+"""
+modules/archive_index.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Random access to archives written with an index footer
+Project: SIMA
+
+ADDED: IndexedArchive (moved from modules/archive.py)
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+import json
+import mmap
+import re
+
+from modules.archive import expand_record, is_compact
+
+# Index footer: ... "index_offset": <n>} at the very end of the file
+INDEX_OFFSET_RE = re.compile(rb'"index_offset":\s*(\d+)\s*}\s*$')
+INDEX_TAIL_BYTES = 64
+
+
+class IndexedArchive:
+    """Random access to an archive written with an index footer
+
+    The file is mmap'ed; opening decodes only the footer, and each get()
+    decodes one record from its byte range, so listing, previewing and
+    selective imports cost time and memory proportional to what is read.
+    Raises ValueError for archives without an index (or compressed ones).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise ValueError(f"{self.path} is not an indexed archive")
+        tail_start = max(0, len(self._mm) - INDEX_TAIL_BYTES)
+        match = INDEX_OFFSET_RE.search(self._mm[tail_start:])
+        if not match:
+            self.close()
+            raise ValueError(f"{self.path} is not an indexed archive")
+        index_offset = int(match.group(1))
+        try:
+            raw = self._mm[index_offset:tail_start + match.start()].rstrip(b' \t\r\n,')
+            footer = json.loads(raw.decode('utf-8'))
+        except ValueError:
+            self.close()
+            raise ValueError(f"{self.path} has a corrupt index footer")
+        self.manifest = footer['manifest']
+        self.strings = footer['strings']
+        self.entries = footer['records']
+        self.compact = is_compact(self.manifest)
+        self._by_path = {entry[0]: i for i, entry in enumerate(self.entries)}
+
+    @staticmethod
+    def is_indexed(path: Path) -> bool:
+        """True if path ends with an index footer (cheap: reads only the tail)"""
+        try:
+            with open(path, 'rb') as f:
+                f.seek(0, 2)
+                f.seek(max(0, f.tell() - INDEX_TAIL_BYTES))
+                return INDEX_OFFSET_RE.search(f.read()) is not None
+        except OSError:
+            return False
+
+    def __enter__(self) -> 'IndexedArchive':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def close(self):
+        if getattr(self, '_mm', None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def listing(self, offset: int = 0, limit: int = None) -> List[Dict]:
+        """[{path, ref_id, size}] from the footer alone (no records decoded)"""
+        end = None if limit is None else offset + limit
+        return [{'path': path, 'ref_id': ref_id, 'size': length}
+                for path, ref_id, _, length in self.entries[offset:end]]
+
+    def record(self, i: int) -> Dict:
+        """Decode record i (v1 shape)"""
+        _, _, offset, length = self.entries[i]
+        record = json.loads(self._mm[offset:offset + length].decode('utf-8'))
+        return expand_record(record, self.strings, self.manifest) if self.compact else record
+
+    def get(self, path: str) -> Dict:
+        """Decode the record stored under an archive path (KeyError if absent)"""
+        return self.record(self._by_path[path])
+
+    def records(self, paths: Iterable[str] = None) -> Iterator[Dict]:
+        """Decode the given paths (unknown ones skipped), or every record in order"""
+        if paths is None:
+            for i in range(len(self.entries)):
+                yield self.record(i)
+            return
+        for path in paths:
+            i = self._by_path.get(path)
+            if i is not None:
+                yield self.record(i)
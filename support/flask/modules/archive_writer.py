@@ -0,0 +1,208 @@
+"""
+modules/archive_writer.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Streaming JSON archive writers (v1 indent=2 and compact v2)
+Project: SIMA
+
+ADDED: ArchiveWriter, CompactArchiveWriter and open_writer (moved from modules/archive.py)
+"""
+
+from typing import BinaryIO, Dict, List
+import json
+
+from modules.archive import ARCHIVE_VERSION_V2
+from modules.metrics import METRICS
+
+# Width reserved for the file_count value so it can be patched in place
+FILE_COUNT_WIDTH = 20
+
+# v2 record fields stored as indexes into the archive's string table
+INTERNED_FIELDS = ('version', 'date', 'category')
+
+
+class ArchiveWriter:
+    """Write a JSON export archive incrementally to a binary stream
+
+    Layout matches json.dumps(archive, indent=2). The manifest is written
+    first with a padded file_count that is patched in place on close; for
+    non-seekable streams (or seekable=False, e.g. compressed output) a
+    top-level "file_count" is appended instead.
+
+    With indexed=True (seekable output only) the archive ends with an
+    "index" footer - final manifest, string table and [path, ref_id, offset,
+    length] per record - followed by "index_offset", so IndexedArchive can
+    mmap the file and decode single records.
+
+    Fields passed to close() (e.g. delta checksums) are written as
+    top-level keys after "files" and merged into the final manifest.
+    """
+
+    # Framing for the indent=2 layout (overridden by CompactArchiveWriter)
+    OPEN = '{\n  "manifest": '
+    FILES_OPEN = ',\n  "files": ['
+    FIRST_SEPARATOR = '\n    '
+    SEPARATOR = ',\n    '
+    FILES_CLOSE = '\n  ]'
+    EMPTY_FILES_CLOSE = ']'
+    COUNT_FIELD = ',\n  "file_count": '
+    FIELD = ',\n  {}: '
+    INDEX_FIELD = ',\n  "index": '
+    INDEX_OFFSET_FIELD = ',\n  "index_offset": '
+    CLOSE = '\n}'
+    COUNT_MARKER = '"file_count": 0'
+
+    def __init__(self, stream: BinaryIO, manifest: Dict, seekable: bool = None, indexed: bool = False):
+        self.stream = stream
+        self.manifest = manifest
+        self.file_count = 0
+        self.bytes_written = 0
+        self._seekable = stream.seekable() if seekable is None else seekable
+        self._start = stream.tell() if self._seekable else 0
+        self._index = [] if indexed and self._seekable else None
+        self._count_offset = None
+        self._closed = False
+        self._write_header()
+
+    def __enter__(self) -> 'ArchiveWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._closed:
+            self.close()
+
+    def _write(self, text: str) -> int:
+        data = text.encode('utf-8')
+        with METRICS.phase('write'):
+            self.stream.write(data)
+        self.bytes_written += len(data)
+        return len(data)
+
+    def _dump_manifest(self, manifest: Dict) -> str:
+        return json.dumps(manifest, indent=2).replace('\n', '\n  ')
+
+    def _write_header(self):
+        # file_count goes last so the placeholder is the final occurrence of the marker
+        manifest = {k: v for k, v in self.manifest.items() if k != 'file_count'}
+        manifest['file_count'] = 0
+        head, tail = self._dump_manifest(manifest).rsplit(self.COUNT_MARKER, 1)
+        head = self.OPEN + head + self.COUNT_MARKER[:-1]
+
+        self._write(head)
+        if self._seekable:
+            self._count_offset = self._start + self.bytes_written
+        self._write('0'.ljust(FILE_COUNT_WIDTH) + tail + self.FILES_OPEN)
+
+    @staticmethod
+    def encode_record(record: Dict) -> str:
+        """Serialize a file record as it appears inside the files array"""
+        return json.dumps(record, indent=2).replace('\n', '\n    ')
+
+    def write_file(self, record: Dict):
+        """Append one file record"""
+        with METRICS.phase('serialise'):
+            encoded = self.encode_record(record)
+        self.write_encoded(encoded, record.get('path', ''), record.get('ref_id', ''))
+
+    def write_encoded(self, encoded: str, path: str = '', ref_id: str = ''):
+        """Append a record already serialized with encode_record (e.g. by a worker process)"""
+        self._write(self.SEPARATOR if self.file_count else self.FIRST_SEPARATOR)
+        offset = self._start + self.bytes_written
+        length = self._write(encoded)
+        if self._index is not None:
+            self._index.append([path, ref_id, offset, length])
+        self.file_count += 1
+
+    def _strings(self) -> List[str]:
+        return []
+
+    def close(self, **fields) -> Dict:
+        """Finish the archive (appending `fields` as top-level keys) and return the final manifest"""
+        self._write(self.FILES_CLOSE if self.file_count else self.EMPTY_FILES_CLOSE)
+        for key, value in fields.items():
+            self._write(self.FIELD.format(json.dumps(key)) + self._dump_manifest(value))
+        self.manifest.update(fields)
+        if self._count_offset is None:
+            self._write(f'{self.COUNT_FIELD}{self.file_count}')
+        if self._index is not None:
+            self._write(self.INDEX_FIELD)
+            index_offset = self._start + self.bytes_written
+            footer = {'manifest': dict(self.manifest, file_count=self.file_count),
+                      'strings': self._strings(), 'records': self._index}
+            self._write(json.dumps(footer, separators=(',', ':'), ensure_ascii=False))
+            self._write(f'{self.INDEX_OFFSET_FIELD}{index_offset}')
+        self._write(self.CLOSE)
+
+        if self._count_offset is not None:
+            end = self.stream.tell()
+            self.stream.seek(self._count_offset)
+            self.stream.write(str(self.file_count).ljust(FILE_COUNT_WIDTH).encode('utf-8'))
+            self.stream.seek(end)
+
+        self._closed = True
+        self.manifest['file_count'] = self.file_count
+        return self.manifest
+
+
+class CompactArchiveWriter(ArchiveWriter):
+    """Write a v2 archive: compact separators, one body copy, interned strings
+
+    write_file() takes KnowledgeFile.to_compact() records plus 'path'.
+    Sections are [heading, start, end] offsets into 'markdown'. Values of
+    INTERNED_FIELDS and languages are replaced by indexes into a string
+    table; each record lists the strings it introduces under "+", so the
+    table is rebuilt while streaming.
+    """
+
+    OPEN = '{"manifest":'
+    FILES_OPEN = ',"files":['
+    FIRST_SEPARATOR = ''
+    SEPARATOR = ','
+    FILES_CLOSE = ']'
+    EMPTY_FILES_CLOSE = ']'
+    COUNT_FIELD = ',"file_count":'
+    FIELD = ',{}:'
+    INDEX_FIELD = ',"index":'
+    INDEX_OFFSET_FIELD = ',"index_offset":'
+    CLOSE = '}'
+    COUNT_MARKER = '"file_count":0'
+
+    def __init__(self, stream: BinaryIO, manifest: Dict, seekable: bool = None, indexed: bool = False):
+        self._string_ids = {}
+        manifest['version'] = ARCHIVE_VERSION_V2
+        super().__init__(stream, manifest, seekable, indexed)
+
+    def _dump_manifest(self, manifest: Dict) -> str:
+        return json.dumps(manifest, separators=(',', ':'), ensure_ascii=False)
+
+    def _intern(self, value: str, new: List[str]) -> int:
+        index = self._string_ids.get(value)
+        if index is None:
+            index = self._string_ids[value] = len(self._string_ids)
+            new.append(value)
+        return index
+
+    def _strings(self) -> List[str]:
+        return list(self._string_ids)
+
+    def write_file(self, record: Dict):
+        """Intern and append one compact record"""
+        new = []
+        record = dict(record)
+        for field in INTERNED_FIELDS:
+            if field in record:
+                record[field] = self._intern(record[field], new)
+        record['languages'] = [self._intern(l, new) for l in record.get('languages', [])]
+        if new:
+            record = {'+': new, **record}
+        with METRICS.phase('serialise'):
+            encoded = json.dumps(record, separators=(',', ':'), ensure_ascii=False)
+        self.write_encoded(encoded, record.get('path', ''), record.get('ref_id', ''))
+
+
+def open_writer(stream: BinaryIO, manifest: Dict, archive_version: int = 1,
+                compressed: bool = False, indexed: bool = False) -> ArchiveWriter:
+    """Writer for archive layout 1 (indent=2) or 2 (compact), optionally with an index footer"""
+    cls = CompactArchiveWriter if archive_version == 2 else ArchiveWriter
+    return cls(stream, manifest, seekable=False if compressed else None, indexed=indexed)
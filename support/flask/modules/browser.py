@@ -0,0 +1,90 @@
+"""
+modules/browser.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Directory walking and tree listings for the UI and the CLI
+Project: SIMA
+
+ADDED: FileBrowser (moved from modules/managers.py)
+"""
+
+from pathlib import Path
+from typing import Dict, Iterator, List
+import os
+
+from modules.cache import LISTING_CACHE, PARSE_CACHE
+from modules.config import Config
+from modules.metrics import METRICS
+
+class FileBrowser:
+    """Browse file system for UI"""
+    
+    # ADDED: Deterministic lazy walk (sorted at each level)
+    @staticmethod
+    def walk_markdown(root_path: Path) -> Iterator[Path]:
+        """Yield .md files under root_path in sorted path order"""
+        for dirpath, dirnames, filenames in METRICS.timed('walk', os.walk(root_path)):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if name.endswith('.md'):
+                    yield Path(dirpath) / name
+    
+    @staticmethod
+    def get_tree(root_path: Path, depth: int = 1, offset: int = 0, limit: int = None,
+                 metadata: bool = False, stamps: List = None) -> Dict:
+        """Get directory tree structure
+        
+        Lists at most `limit` children per directory (starting at `offset` for
+        the root) down to `depth` levels; depth < 0 walks the whole tree.
+        Directories beyond the depth limit are returned with loaded=False.
+        Languages/REF-ID are parsed only when metadata=True. If a `stamps`
+        list is given, (path, mtime_ns, size) of every directory listed and
+        file returned is appended to it (the tree's validator).
+        """
+        if limit is None:
+            limit = Config.TREE_PAGE_SIZE
+        
+        def file_item(name: str, path: str, st: os.stat_result) -> Dict:
+            item = {'name': name, 'path': path, 'type': 'file', 'size': st.st_size}
+            if stamps is not None:
+                stamps.append((path, st.st_mtime_ns, st.st_size))
+            if metadata and name.endswith('.md'):
+                try:
+                    kf = PARSE_CACHE.get(Path(path), st)
+                    item['languages'] = sorted(kf.languages)
+                    item['ref_id'] = kf.metadata.get('ref_id', '')
+                except Exception:
+                    pass
+            return item
+        
+        def build_dir(path: str, name: str, level: int, start: int, st: os.stat_result) -> Dict:
+            item = {'name': name, 'path': path, 'type': 'directory', 'loaded': False}
+            if level == depth:
+                return item
+            if stamps is not None:
+                # A directory's mtime changes when entries are added, removed or renamed
+                stamps.append((path, st.st_mtime_ns, 0))
+            try:
+                entries = LISTING_CACHE.list(path)
+            except PermissionError:
+                item['error'] = 'Permission denied'
+                return item
+            
+            page = entries[start:start + limit]
+            children = []
+            for name, entry_path, is_dir, st in page:
+                if is_dir:
+                    children.append(build_dir(entry_path, name, level + 1, 0, st))
+                else:
+                    children.append(file_item(name, entry_path, st))
+            
+            item.update({'loaded': True, 'children': children,
+                         'offset': start, 'total': len(entries)})
+            if start + limit < len(entries):
+                item['next_offset'] = start + limit
+            return item
+        
+        if not root_path.is_dir():
+            return file_item(root_path.name, str(root_path), root_path.stat())
+        return build_dir(str(root_path), root_path.name, 0, offset, root_path.stat())
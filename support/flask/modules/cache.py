@@ -0,0 +1,298 @@
+"""
+modules/cache.py
+
+Version: 1.4.2
+Date: 2026-10-18
+Purpose: Process-wide parse cache for knowledge files
+Project: SIMA
+
+ADDED: ParseCache (LRU keyed by path, mtime and size)
+ADDED: On-disk snapshot load/save
+MODIFIED: Snapshot format 2 (section offsets in state)
+ADDED: ListingCache (directory listings kept hot by the watcher)
+ADDED: ListingCache hit/miss counters; cache samples for /metrics
+ADDED: SharedParseStore (SQLite, cross-worker) behind ParseCache; configure()
+MODIFIED: ListingCache caches only directories under the watcher root (enable(root))
+MODIFIED: Format 3 (parse state carries the content digest)
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+import sqlite3
+import threading
+
+from modules.config import Config
+from modules.knowledge import KnowledgeFile
+from modules.metrics import METRICS
+
+CACHE_FORMAT = 3
+
+class SharedParseStore:
+    """Parse state in SQLite, shared by worker processes behind each ParseCache
+
+    Entries are keyed by (path, mtime_ns, size) like the in-memory cache, so
+    a file parsed by one worker is not parsed again by the others. WAL mode
+    lets workers read while one writes. The connection is (re)opened per
+    process, so a store created before a fork is safe to use after it.
+    Errors are reported and treated as misses.
+    """
+
+    def __init__(self, db_file: Path):
+        self.db_file = Path(db_file)
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_file), timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            if conn.execute('PRAGMA user_version').fetchone()[0] != CACHE_FORMAT:
+                conn.execute('DROP TABLE IF EXISTS parse_state')
+                conn.execute(f'PRAGMA user_version={CACHE_FORMAT}')
+            conn.execute('CREATE TABLE IF NOT EXISTS parse_state (path TEXT PRIMARY KEY, '
+                         'mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, state TEXT NOT NULL)')
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, key: str, signature: tuple) -> Optional[Dict]:
+        """Stored state for a path if its signature still matches"""
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    'SELECT state FROM parse_state WHERE path = ? AND mtime_ns = ? AND size = ?',
+                    (key, *signature)).fetchone()
+        except sqlite3.Error as e:
+            print(f"Shared parse store error: {e}")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, signature: tuple, state: Dict):
+        try:
+            with self._lock:
+                self._connection().execute('INSERT OR REPLACE INTO parse_state VALUES (?, ?, ?, ?)',
+                                           (key, *signature, json.dumps(state)))
+        except sqlite3.Error as e:
+            print(f"Shared parse store error: {e}")
+
+
+class ParseCache:
+    """LRU cache of KnowledgeFile parse state keyed by (path, st_mtime_ns, st_size)
+
+    With a shared store (Config.PARSE_CACHE_SHARED), misses are looked up
+    there before parsing, and new parse state is written through to it.
+    """
+
+    def __init__(self, max_entries: int, cache_file: Optional[Path] = None, shared: SharedParseStore = None):
+        self.max_entries = max_entries
+        self.cache_file = cache_file
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self):
+        """Apply Config (size, snapshot file, shared store); called by create_app()"""
+        self.max_entries = Config.PARSE_CACHE_SIZE
+        self.cache_file = Config.PARSE_CACHE_FILE
+        self.shared = SharedParseStore(Config.PARSE_CACHE_DB) if Config.PARSE_CACHE_SHARED else None
+
+    def get(self, path: Path, st: os.stat_result = None) -> KnowledgeFile:
+        """Return parsed file, re-parsing only if it changed since last parse
+
+        Pass a stat result (e.g. from os.scandir) to avoid a second stat call.
+        """
+        if st is None:
+            st = path.stat()
+        key = os.path.abspath(path)
+        signature = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return KnowledgeFile.from_state(path, entry[1])
+            self.misses += 1
+
+        state = self.shared.get(key, signature) if self.shared else None
+        if state is not None:
+            self._remember(key, signature, state)
+            with self._lock:
+                self.shared_hits += 1
+            return KnowledgeFile.from_state(path, state)
+
+        kf = KnowledgeFile(path)
+        self.put(key, signature, kf.state())
+        return kf
+
+    def put(self, key: str, signature: tuple, state: Dict):
+        """Store parse state (and write it through to the shared store)"""
+        self._remember(key, signature, state)
+        if self.shared:
+            self.shared.put(key, signature, state)
+
+    def _remember(self, key: str, signature: tuple, state: Dict):
+        """Store parse state in memory, evicting least recently used entries"""
+        with self._lock:
+            self._entries[key] = (signature, state)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, path: Path):
+        """Drop cached state for a path"""
+        with self._lock:
+            self._entries.pop(os.path.abspath(path), None)
+
+    def clear(self):
+        """Drop all cached state and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.shared_hits = 0
+
+    def stats(self) -> Dict:
+        """Cache size and hit/miss counters (misses include shared-store hits)"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'shared': self.shared is not None,
+                'shared_hits': self.shared_hits
+            }
+
+    def load(self) -> int:
+        """Load snapshot from cache_file, returns number of entries loaded"""
+        if not self.cache_file or not self.cache_file.exists():
+            return 0
+        try:
+            data = json.loads(self.cache_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            print(f"Error loading parse cache {self.cache_file}: {e}")
+            return 0
+        if data.get('format') != CACHE_FORMAT:
+            return 0
+
+        loaded = 0
+        for key, signature, state in data.get('entries', [])[-self.max_entries:]:
+            self._remember(key, tuple(signature), state)
+            loaded += 1
+        return loaded
+
+    def save(self):
+        """Write snapshot to cache_file atomically"""
+        if not self.cache_file:
+            return
+        with self._lock:
+            entries = [[key, list(sig), state] for key, (sig, state) in self._entries.items()]
+
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_name(self.cache_file.name + '.tmp')
+        tmp_file.write_text(json.dumps({'format': CACHE_FORMAT, 'entries': entries}), encoding='utf-8')
+        os.replace(tmp_file, self.cache_file)
+
+
+class ListingCache:
+    """Sorted directory listings, kept only while a watcher invalidates them
+
+    Disabled by default: list() then always scans. modules/watcher.py enables
+    it for its root and drops entries for directories whose contents change,
+    so tree requests under that root are answered from memory. Directories
+    outside the root are never cached, since nothing would invalidate them.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.root = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def list(self, path: str) -> List[Tuple[str, str, bool, os.stat_result]]:
+        """[(name, path, is_dir, stat)] for non-hidden entries, sorted by name"""
+        key = os.path.abspath(path)
+        cached = self.enabled and self.covers(key)
+        if cached:
+            with self._lock:
+                listing = self._entries.get(key)
+                if listing is not None:
+                    self.hits += 1
+            if listing is not None:
+                return listing
+
+        with METRICS.phase('walk'), os.scandir(path) as it:
+            listing = sorted(((e.name, e.path, e.is_dir(), e.stat()) for e in it if not e.name.startswith('.')),
+                             key=lambda e: e[0])
+        if cached:
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = listing
+        return listing
+
+    def enable(self, root):
+        """Cache listings of root and the directories below it"""
+        self.clear()
+        self.root = os.path.abspath(root)
+        self.enabled = True
+
+    def disable(self):
+        """Stop caching and drop all listings"""
+        self.enabled = False
+        self.root = None
+        self.clear()
+
+    def covers(self, key: str) -> bool:
+        """True if the absolute path key is the cached root or below it"""
+        return self.root is not None and (key == self.root or key.startswith(self.root.rstrip(os.sep) + os.sep))
+
+    def invalidate(self, path: str, recursive: bool = False):
+        """Drop a directory's listing (and, with recursive, everything below it)"""
+        key = os.path.abspath(path)
+        with self._lock:
+            self._entries.pop(key, None)
+            if recursive:
+                prefix = key + os.sep
+                for other in [k for k in self._entries if k.startswith(prefix)]:
+                    del self._entries[other]
+
+    def clear(self):
+        """Drop all listings"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Listing count and hit/miss counters (while enabled)"""
+        with self._lock:
+            return {'enabled': self.enabled, 'root': self.root, 'entries': len(self._entries),
+                    'hits': self.hits, 'misses': self.misses}
+
+
+# Shared by tree, index, export and analyze
+PARSE_CACHE = ParseCache(Config.PARSE_CACHE_SIZE, Config.PARSE_CACHE_FILE)
+
+# Directory listings for /api/tree (active while the watcher runs)
+LISTING_CACHE = ListingCache()
+
+@METRICS.collector
+def cache_samples():
+    """Hit, miss and entry counts of both caches for /metrics"""
+    samples = []
+    for name, stats in (('parse', PARSE_CACHE.stats()), ('listing', LISTING_CACHE.stats())):
+        samples.append(('sima_cache_hits_total', {'cache': name}, stats['hits']))
+        samples.append(('sima_cache_misses_total', {'cache': name}, stats['misses']))
+        samples.append(('sima_cache_entries', {'cache': name}, stats['entries']))
+    if PARSE_CACHE.shared:
+        samples.append(('sima_cache_hits_total', {'cache': 'parse_shared'}, PARSE_CACHE.stats()['shared_hits']))
+    return samples
@@ -0,0 +1,295 @@
+"""
+modules/catalog.py
+
+Version: 1.2.3
+Date: 2026-10-18
+Purpose: Persistent SQLite catalog of knowledge-file metadata with faceted queries
+Project: SIMA
+
+ADDED: Catalog (files, languages, keywords, related REF-IDs, section headings; WAL mode)
+ADDED: Incremental refresh by (mtime_ns, size), then content digest
+ADDED: query() with filters, sort, pagination and facet counts
+ADDED: get_catalog registry (one catalog per root, all in Config.CATALOG_FILE)
+ADDED: validator() for conditional /api/query responses
+MODIFIED: Stored signatures read inside the write transaction (several worker processes)
+MODIFIED: Schema, filters and facets moved to modules/catalog_schema.py
+MODIFIED: _update() decodes with knowledge.decode_source (CRLF files)
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from modules.cache import PARSE_CACHE
+from modules import catalog_schema
+from modules.catalog_schema import (CATALOG_FORMAT, CHILD_TABLES, FACETS, LIST_SEPARATOR, SCHEMA, SORT_COLUMNS,
+                                    _like, ref_type)
+from modules.config import Config
+from modules.indexes import is_navigation_file
+from modules.knowledge import KnowledgeFile, decode_source
+from modules.metrics import METRICS
+from modules.refs import file_ref_id, related_ids
+
+
+class Catalog:
+    """SQLite catalog of the knowledge files under a root
+
+    Stores each file's header fields, languages, keywords, related REF-IDs,
+    line count and section headings. refresh() re-stats the tree and re-reads
+    only files whose (mtime_ns, size) changed; files whose bytes hash to the
+    stored digest are not re-parsed. The database uses WAL mode, so the
+    catalog survives restarts and other processes can read it while it is
+    updated. Navigation files (indexes, routers) are not catalogued. Safe
+    for use from multiple threads.
+    """
+
+    def __init__(self, db_file: Path, root: Path):
+        self.db_file = Path(db_file)
+        self.root = Path(root)
+        self.key = os.path.abspath(root)
+        self.refreshed_at = 0.0
+        self.changed_at = time.time()
+        self.watched = False   # set by modules/watcher.py: changes arrive via update_file()
+        self._lock = threading.RLock()
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        if str(self.db_file) != ':memory:':
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_file), check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA foreign_keys=ON')
+        conn.execute('PRAGMA busy_timeout=5000')
+        if conn.execute('PRAGMA user_version').fetchone()[0] != CATALOG_FORMAT:
+            conn.execute('BEGIN IMMEDIATE')
+            for table in CHILD_TABLES + ('files',):
+                conn.execute(f'DROP TABLE IF EXISTS {table}')
+            conn.execute('COMMIT')
+            conn.executescript(SCHEMA)
+            conn.execute(f'PRAGMA user_version={CATALOG_FORMAT}')
+        return conn
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        """One write transaction (the connection is in autocommit mode)"""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+
+    def refresh(self, force: bool = False) -> Dict:
+        """Re-catalog changed files, drop deleted ones (throttled; skipped while watched unless forced)"""
+        stats = {'added': 0, 'updated': 0, 'touched': 0, 'removed': 0}
+        with self._lock:
+            if not force and (self.watched or time.monotonic() - self.refreshed_at < Config.CATALOG_REFRESH_SECONDS):
+                return stats
+            seen = set()
+            # Read inside the write transaction: another process may have refreshed meanwhile
+            with self._transaction():
+                known = {row[0]: row[1:] for row in self._conn.execute(
+                    'SELECT path, id, mtime_ns, size, digest FROM files WHERE root = ?', (self.key,))}
+                for dirpath, dirnames, filenames in METRICS.timed('walk', os.walk(self.root)):
+                    dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+                    for name in filenames:
+                        if not name.endswith('.md') or is_navigation_file(name):
+                            continue
+                        file_path = Path(dirpath) / name
+                        rel = file_path.relative_to(self.root).as_posix()
+                        seen.add(rel)
+                        try:
+                            kind = self._update(file_path, rel, file_path.stat(), known.get(rel))
+                        except (OSError, UnicodeDecodeError) as e:
+                            print(f"Error cataloguing {file_path}: {e}")
+                            continue
+                        if kind:
+                            stats[kind] += 1
+                stale = [(known[rel][0],) for rel in set(known) - seen]
+                self._conn.executemany('DELETE FROM files WHERE id = ?', stale)
+                stats['removed'] = len(stale)
+            self.refreshed_at = time.monotonic()
+            if stats['added'] or stats['updated'] or stats['removed']:
+                self.changed_at = time.time()
+        METRICS.processed('catalog', stats['added'] + stats['updated'])
+        return stats
+
+    def update_file(self, path: Path) -> Optional[str]:
+        """Catalog or re-catalog one file (removes it if it no longer exists)"""
+        path = Path(path)
+        rel = Path(os.path.relpath(os.path.abspath(path), self.key)).as_posix()
+        if rel.startswith('../') or not path.name.endswith('.md') or is_navigation_file(path.name):
+            return None
+        with self._lock:
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                self.remove(path)
+                return 'removed'
+            with self._transaction():
+                row = self._conn.execute('SELECT id, mtime_ns, size, digest FROM files WHERE root = ? AND path = ?',
+                                         (self.key, rel)).fetchone()
+                kind = self._update(path, rel, st, row)
+            if kind in ('added', 'updated'):
+                self.changed_at = time.time()
+            return kind
+
+    def _update(self, path: Path, rel: str, st: os.stat_result, row: tuple = None) -> Optional[str]:
+        """Insert or replace one file's rows; row is its stored (id, mtime_ns, size, digest)"""
+        if row is not None and (row[1], row[2]) == (st.st_mtime_ns, st.st_size):
+            return None
+        data = path.read_bytes()
+        digest = hashlib.sha1(data).hexdigest()
+        if row is not None and row[3] == digest:
+            self._conn.execute('UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?',
+                               (st.st_mtime_ns, st.st_size, row[0]))
+            return 'touched'
+
+        kf = KnowledgeFile(path, decode_source(data), digest)
+        PARSE_CACHE.put(os.path.abspath(path), (st.st_mtime_ns, st.st_size), kf.state())
+        ref_id = file_ref_id(kf)
+        meta = kf.metadata
+        values = (st.st_mtime_ns, st.st_size, digest, kf.title, meta.get('ref_id', ''), ref_type(ref_id),
+                  meta.get('category', ''), meta.get('version', ''), meta.get('date', ''),
+                  meta.get('purpose', ''), kf.line_count)
+        if row is None:
+            file_id = self._conn.execute(
+                'INSERT INTO files (mtime_ns, size, digest, title, ref_id, ref_type, category, version, date, '
+                'purpose, line_count, root, path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                values + (self.key, rel)).lastrowid
+        else:
+            file_id = row[0]
+            self._conn.execute(
+                'UPDATE files SET mtime_ns = ?, size = ?, digest = ?, title = ?, ref_id = ?, ref_type = ?, '
+                'category = ?, version = ?, date = ?, purpose = ?, line_count = ? WHERE id = ?',
+                values + (file_id,))
+            for table in CHILD_TABLES:
+                self._conn.execute(f'DELETE FROM {table} WHERE file_id = ?', (file_id,))
+
+        self._conn.executemany('INSERT INTO languages VALUES (?, ?)', ((file_id, l) for l in sorted(kf.languages)))
+        self._conn.executemany('INSERT INTO keywords VALUES (?, ?)',
+                               ((file_id, k) for k in dict.fromkeys(kf.keywords)))
+        self._conn.executemany('INSERT INTO related VALUES (?, ?)', ((file_id, r) for r in related_ids(kf.related)))
+        self._conn.executemany('INSERT INTO sections VALUES (?, ?, ?)',
+                               ((file_id, i, s['heading']) for i, s in enumerate(kf.sections)))
+        return 'added' if row is None else 'updated'
+
+    def remove_tree(self, path: Path):
+        """Drop every file under a directory that was deleted or moved away"""
+        rel = Path(os.path.relpath(os.path.abspath(path), self.key)).as_posix()
+        with self._transaction():
+            self._conn.execute("DELETE FROM files WHERE root = ? AND path LIKE ? ESCAPE '\\'",
+                               (self.key, _like(rel) + '/%'))
+            self.changed_at = time.time()
+
+    def remove(self, path: Path):
+        """Drop a file from the catalog"""
+        rel = Path(os.path.relpath(os.path.abspath(path), self.key)).as_posix()
+        with self._transaction():
+            self._conn.execute('DELETE FROM files WHERE root = ? AND path = ?', (self.key, rel))
+            self.changed_at = time.time()
+
+    def query(self, filters: Dict[str, List[str]] = None, sort: str = 'path', limit: int = None,
+              offset: int = 0, facets: Iterable[str] = FACETS, refresh: bool = False) -> Dict:
+        """Filtered, sorted page of files with the total and facet counts over all matches
+
+        Filters: category, ref_type, ref_id, language, keyword, related (any
+        of several values), min_lines, max_lines, has_ref_id, exceeds_limit,
+        prefix (of the path under root), title and heading (substring). sort is a column name,
+        '-' prefixed for descending. refresh forces a re-stat of the tree
+        first (otherwise it is throttled like SearchIndex.refresh).
+        """
+        started = time.perf_counter()
+        refreshed = self.refresh(force=refresh)
+        limit = Config.QUERY_DEFAULT_LIMIT if limit is None else limit
+        limit = max(0, min(int(limit), Config.QUERY_MAX_LIMIT))
+        offset = max(0, int(offset))
+        column = sort.lstrip('-')
+        if column not in SORT_COLUMNS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_COLUMNS)}")
+        facets = list(facets)
+        unknown = [name for name in facets if name not in FACETS]
+        if unknown:
+            raise ValueError(f"unknown facet: {', '.join(unknown)}")
+
+        clause, params = catalog_schema.where(filters or {})
+        where = 'f.root = ?' + (f' AND {clause}' if clause else '')
+        params = [self.key] + params
+        order = f"f.{column} {'DESC' if sort.startswith('-') else 'ASC'}, f.path"
+        lists = ', '.join(
+            f"(SELECT group_concat({col}, '{LIST_SEPARATOR}') FROM {table} WHERE file_id = f.id) AS {table}"
+            for table, col in (('languages', 'language'), ('keywords', 'keyword'), ('related', 'ref_id')))
+
+        with self._lock:
+            total = self._conn.execute(f'SELECT COUNT(*) FROM files f WHERE {where}', params).fetchone()[0]
+            rows = self._conn.execute(
+                f'SELECT f.path, f.title, f.ref_id, f.ref_type, f.category, f.version, f.date, f.purpose, '
+                f'f.line_count, {lists} FROM files f WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?',
+                params + [limit, offset]).fetchall()
+            facet_counts = {
+                name: dict(sorted(self._conn.execute(FACETS[name].format(where), params).fetchall(),
+                                  key=lambda item: (-item[1], item[0])))
+                for name in facets
+            }
+
+        results = [{
+            'path': str(self.root / path),
+            'title': title,
+            'ref_id': ref_id,
+            'ref_type': kind,
+            'category': category,
+            'version': version,
+            'date': date,
+            'purpose': purpose,
+            'line_count': line_count,
+            'exceeds_limit': line_count > Config.MAX_FILE_LINES,
+            'languages': sorted(languages.split(LIST_SEPARATOR)) if languages else [],
+            'keywords': keywords.split(LIST_SEPARATOR) if keywords else [],
+            'related': related.split(LIST_SEPARATOR) if related else []
+        } for (path, title, ref_id, kind, category, version, date, purpose, line_count,
+               languages, keywords, related) in rows]
+        return {
+            'total': total,
+            'offset': offset,
+            'limit': limit,
+            'results': results,
+            'facets': facet_counts,
+            'refreshed': refreshed,
+            'took_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    def validator(self) -> tuple:
+        """Changes whenever catalogued data may have changed (here or by another process)"""
+        with self._lock:
+            return self.changed_at, self._conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def stats(self) -> Dict:
+        """Catalog size"""
+        with self._lock:
+            files = self._conn.execute('SELECT COUNT(*) FROM files WHERE root = ?', (self.key,)).fetchone()[0]
+        return {'root': str(self.root), 'database': str(self.db_file), 'files': files}
+
+
+_CATALOGS = {}
+_CATALOGS_LOCK = threading.Lock()
+
+def get_catalog(root: Path) -> Catalog:
+    """Shared Catalog for a root in Config.CATALOG_FILE (opened on first use)"""
+    key = os.path.abspath(root)
+    with _CATALOGS_LOCK:
+        catalog = _CATALOGS.get(key)
+        if catalog is None:
+            catalog = _CATALOGS[key] = Catalog(Config.CATALOG_FILE, Path(key))
+    return catalog
@@ -0,0 +1,134 @@
+"""
+modules/catalog_schema.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: SQLite catalog schema and the query vocabulary over it (filters, sorts, facets)
+Project: SIMA
+
+ADDED: SCHEMA, filter/facet tables and where() (moved from modules/catalog.py)
+"""
+
+from typing import Dict, List
+
+from modules.config import Config
+
+# Bumped when the schema changes; older catalogs are rebuilt
+CATALOG_FORMAT = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    title TEXT NOT NULL,
+    ref_id TEXT NOT NULL,
+    ref_type TEXT NOT NULL COLLATE NOCASE,
+    category TEXT NOT NULL COLLATE NOCASE,
+    version TEXT NOT NULL,
+    date TEXT NOT NULL,
+    purpose TEXT NOT NULL,
+    line_count INTEGER NOT NULL,
+    UNIQUE (root, path)
+);
+CREATE TABLE IF NOT EXISTS languages (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    language TEXT NOT NULL COLLATE NOCASE
+);
+CREATE TABLE IF NOT EXISTS keywords (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    keyword TEXT NOT NULL COLLATE NOCASE
+);
+CREATE TABLE IF NOT EXISTS related (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    ref_id TEXT NOT NULL COLLATE NOCASE
+);
+CREATE TABLE IF NOT EXISTS sections (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    heading TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_category ON files (root, category);
+CREATE INDEX IF NOT EXISTS files_ref_type ON files (root, ref_type);
+CREATE INDEX IF NOT EXISTS languages_file ON languages (file_id);
+CREATE INDEX IF NOT EXISTS languages_language ON languages (language);
+CREATE INDEX IF NOT EXISTS keywords_file ON keywords (file_id);
+CREATE INDEX IF NOT EXISTS keywords_keyword ON keywords (keyword);
+CREATE INDEX IF NOT EXISTS related_file ON related (file_id);
+CREATE INDEX IF NOT EXISTS related_ref_id ON related (ref_id);
+CREATE INDEX IF NOT EXISTS sections_file ON sections (file_id);
+"""
+
+CHILD_TABLES = ('languages', 'keywords', 'related', 'sections')
+
+def _flag(value) -> bool:
+    if isinstance(value, str):
+        if value.lower() not in ('true', '1', 'yes', 'false', '0', 'no'):
+            raise ValueError(f"not a boolean: {value!r}")
+        return value.lower() in ('true', '1', 'yes')
+    return bool(value)
+
+def _like(text: str) -> str:
+    """Escape LIKE wildcards in user text"""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+# Filters taking one or more values (matched case-insensitively, any value matches)
+LIST_FILTERS = {
+    'category': 'f.category IN ({})',
+    'ref_type': 'f.ref_type IN ({})',
+    'ref_id': 'f.ref_id COLLATE NOCASE IN ({})',
+    'language': 'f.id IN (SELECT file_id FROM languages WHERE language IN ({}))',
+    'keyword': 'f.id IN (SELECT file_id FROM keywords WHERE keyword IN ({}))',
+    'related': 'f.id IN (SELECT file_id FROM related WHERE ref_id IN ({}))',
+}
+
+# Filters taking one value: name -> (condition, value -> parameters)
+VALUE_FILTERS = {
+    'min_lines': ('f.line_count >= ?', lambda v: (int(v),)),
+    'max_lines': ('f.line_count <= ?', lambda v: (int(v),)),
+    'has_ref_id': ("(f.ref_id != '') = ?", lambda v: (_flag(v),)),
+    'exceeds_limit': ('(f.line_count > ?) = ?', lambda v: (Config.MAX_FILE_LINES, _flag(v))),
+    'prefix': ("f.path LIKE ? ESCAPE '\\'", lambda v: (_like(v.strip('/')) + '%',)),
+    'title': ("f.title LIKE ? ESCAPE '\\'", lambda v: ('%' + _like(v) + '%',)),
+    'heading': ("f.id IN (SELECT file_id FROM sections WHERE heading LIKE ? ESCAPE '\\')",
+                lambda v: ('%' + _like(v) + '%',)),
+}
+
+SORT_COLUMNS = ('path', 'title', 'ref_id', 'ref_type', 'category', 'version', 'date', 'line_count', 'size', 'mtime_ns')
+
+# Facet name -> query grouping the filtered files (`{}` is the WHERE clause)
+FACETS = {
+    'category': 'SELECT f.category, COUNT(*) FROM files f WHERE {} GROUP BY f.category',
+    'ref_type': 'SELECT f.ref_type, COUNT(*) FROM files f WHERE {} GROUP BY f.ref_type',
+    'language': ('SELECT l.language, COUNT(DISTINCT f.id) FROM files f JOIN languages l ON l.file_id = f.id '
+                 'WHERE {} GROUP BY l.language'),
+}
+
+LIST_SEPARATOR = '\x1f'
+
+def ref_type(ref_id: str) -> str:
+    """REF-ID prefix: DEC-17 -> DEC, ARCH-LMMS-03 -> ARCH-LMMS"""
+    return ref_id.rsplit('-', 1)[0] if ref_id else ''
+
+def where(filters: Dict[str, List[str]]) -> tuple:
+    """(WHERE clause, parameters) for {filter: [values]}; raises ValueError on unknown filters"""
+    clauses = []
+    params = []
+    for name, values in filters.items():
+        values = [v for v in values if v is not None]
+        if not values:
+            continue
+        if name in LIST_FILTERS:
+            clauses.append(LIST_FILTERS[name].format(', '.join('?' * len(values))))
+            params.extend(str(v) for v in values)
+        elif name in VALUE_FILTERS:
+            condition, convert = VALUE_FILTERS[name]
+            clauses.append(condition)
+            params.extend(convert(values[-1]))
+        else:
+            raise ValueError(f"unknown filter: {name}")
+    return ' AND '.join(clauses), params
@@ -0,0 +1,151 @@
+"""
+modules/changes.py
+
+Version: 1.0.1
+Date: 2026-10-18
+Purpose: Change sources - which markdown files exist or changed, asked of git
+Project: SIMA
+
+ADDED: GitChangeSource (ls-files / diff against the local repository only)
+ADDED: change_source() selection by Config.CHANGE_SOURCE
+MODIFIED: `since` resolved with rev-parse before it reaches git diff (no option injection)
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+import os
+import subprocess
+
+from modules.config import Config
+
+GIT_TIMEOUT_SECONDS = 120
+MD_PATHSPEC = '*.md'
+
+
+class GitChangeSource:
+    """Ask the local git repository which .md files under root exist or changed
+
+    Only local plumbing is run (ls-files, diff, rev-parse): nothing is
+    fetched, so it works offline and never touches a remote. Git answers
+    from its index and stat cache (and fsmonitor, if configured), so
+    callers do Python work only for the files it reports. Untracked files
+    that are not ignored count as changed. Paths are absolute.
+
+    state() captures HEAD plus the files that differed from it at that
+    moment; changes_since(state) later returns everything that may differ
+    from what was seen then, which is what delta exports and sidecar
+    index state store.
+    """
+
+    def __init__(self, root: Path):
+        self.root = os.path.abspath(root)
+
+    @staticmethod
+    def available(root: Path) -> bool:
+        """True if root is inside a git work tree and git can be run"""
+        try:
+            return GitChangeSource(root)._git('rev-parse', '--is-inside-work-tree').strip() == 'true'
+        except (OSError, subprocess.SubprocessError):
+            return False
+
+    def _git(self, *args: str) -> str:
+        result = subprocess.run(['git', '-C', self.root, *args], capture_output=True, check=True,
+                                timeout=GIT_TIMEOUT_SECONDS,
+                                env=dict(os.environ, GIT_OPTIONAL_LOCKS='0', GIT_TERMINAL_PROMPT='0'))
+        return result.stdout.decode('utf-8', 'surrogateescape')
+
+    def _paths(self, output: str) -> List[str]:
+        """Absolute .md paths from NUL-separated output relative to root"""
+        paths = []
+        for rel in output.split('\0'):
+            if rel.endswith('.md'):
+                paths.append(os.path.join(self.root, *rel.split('/')))
+        return paths
+
+    def head(self) -> Optional[str]:
+        """Current commit (None in a repository without commits)"""
+        try:
+            return self._git('rev-parse', '--verify', '--quiet', 'HEAD').strip() or None
+        except subprocess.CalledProcessError:
+            return None
+
+    def resolve(self, rev: str) -> str:
+        """Commit id for a revision given by a caller; ValueError if it names no commit
+
+        Only the resolved id is passed on to other git commands, so a value
+        such as '--output=...' can never be read as an option.
+        """
+        if not rev or rev.startswith('-'):
+            raise ValueError(f"Not a commit: {rev!r}")
+        try:
+            commit = self._git('rev-parse', '--verify', '--quiet', '--end-of-options', f"{rev}^{{commit}}").strip()
+        except subprocess.CalledProcessError:
+            commit = ''
+        if not commit:
+            raise ValueError(f"Not a commit: {rev!r}")
+        return commit
+
+    def untracked(self) -> List[str]:
+        """New .md files that are not ignored"""
+        return self._paths(self._git('ls-files', '-z', '--others', '--exclude-standard', '--', MD_PATHSPEC))
+
+    def files(self) -> List[str]:
+        """Every .md file under root: tracked (minus deleted) plus untracked, sorted"""
+        tracked = self._paths(self._git('ls-files', '-z', '--cached', '--', MD_PATHSPEC))
+        deleted = set(self._paths(self._git('ls-files', '-z', '--deleted', '--', MD_PATHSPEC)))
+        return sorted({p for p in tracked if p not in deleted} | set(self.untracked()))
+
+    def changes(self, since: str = None) -> Dict[str, List[str]]:
+        """{'changed': [...], 'deleted': [...]} between commit `since` (default HEAD) and the work tree
+
+        Raises ValueError if `since` does not name a commit.
+        """
+        since = self.resolve(since) if since else self.head()
+        changed, deleted = set(), set()
+        if since:
+            fields = self._git('diff', '--name-status', '-z', '--no-renames', '--relative',
+                               since, '--', MD_PATHSPEC).split('\0')
+            for status, rel in zip(fields[0::2], fields[1::2]):
+                for path in self._paths(rel):
+                    (deleted if status == 'D' else changed).add(path)
+        else:
+            changed.update(self._paths(self._git('ls-files', '-z', '--cached', '--', MD_PATHSPEC)))
+        changed.update(self.untracked())
+        return {'changed': sorted(changed), 'deleted': sorted(deleted - changed)}
+
+    def state(self) -> Dict:
+        """Snapshot to store with derived data: HEAD and the root-relative paths differing from it"""
+        head = self.head()
+        changes = self.changes(head)
+        dirty = changes['changed'] + changes['deleted']
+        return {'commit': head, 'dirty': sorted(Path(os.path.relpath(p, self.root)).as_posix() for p in dirty)}
+
+    def changes_since(self, state: Dict) -> Optional[Dict[str, List[str]]]:
+        """Files that may differ from a state() snapshot (None if git cannot tell, e.g. unknown commit)"""
+        if not state.get('commit'):
+            return None
+        try:
+            changes = self.changes(state.get('commit'))
+        except (OSError, ValueError, subprocess.SubprocessError) as e:
+            print(f"git cannot diff against {state.get('commit')}: {e}")
+            return None
+        # Files that were dirty at snapshot time may since have been reverted
+        changed = set(changes['changed'])
+        deleted = set(changes['deleted'])
+        for rel in state.get('dirty', []):
+            path = os.path.join(self.root, *rel.split('/'))
+            if path not in changed and path not in deleted:
+                (changed if os.path.exists(path) else deleted).add(path)
+        return {'changed': sorted(changed), 'deleted': sorted(deleted)}
+
+
+def change_source(root: Path, mode: str = None) -> Optional[GitChangeSource]:
+    """GitChangeSource for root when enabled (Config.CHANGE_SOURCE 'git' or 'auto') and usable, else None"""
+    mode = mode or Config.CHANGE_SOURCE
+    if mode == 'walk':
+        return None
+    if GitChangeSource.available(root):
+        return GitChangeSource(root)
+    if mode == 'git':
+        print(f"{root} is not in a usable git work tree; walking instead")
+    return None
@@ -1,26 +1,131 @@
 """
 modules/config.py
 
-Version: 1.0.0
-Date: 2025-11-29
+Version: 1.19.2
+Date: 2026-10-18
 Purpose: Configuration and constants for SIMA Manager
 Project: SIMA
 
 ADDED: Configuration class
 ADDED: Language detection patterns
+ADDED: Parse cache settings
+ADDED: Code fence info-string aliases
+ADDED: Tree paging settings
+ADDED: Parallel export settings
+ADDED: Import worker/fsync settings
+ADDED: Hierarchy rebuild worker setting
+ADDED: Search settings
+ADDED: REF-ID graph settings
+ADDED: Watcher settings
+ADDED: Archive format/compression settings
+ADDED: Archive index footer setting
+ADDED: Change source and validation settings
+ADDED: Metrics switches and latency buckets
+ADDED: Background job settings
+ADDED: Progress event stream settings
+ADDED: Catalog and query settings
+ADDED: Response compression settings
+ADDED: Settings from a JSON/YAML file and SIMA_* environment variables
+ADDED: Development server and shared parse store settings
+ADDED: Batch analysis settings (worker pool, files per request)
+ADDED: Shared metrics settings (METRICS_SHARED, METRICS_DIR, METRICS_FLUSH_SECONDS)
+MODIFIED: v1 archives without index footer stay the export default
 """
 
 from pathlib import Path
+from typing import Dict, Mapping
+import json
+import os
 
 class Config:
-    """Application configuration"""
+    """Application configuration
+
+    Class attributes are the defaults. create_app() overrides them from a
+    settings file, SIMA_* environment variables and explicit settings (see
+    load_settings / apply_settings below).
+    """
+    # ADDED: Development server (python sima_manager.py)
+    HOST = '127.0.0.1'
+    PORT = 5000
+    DEBUG = True
     SIMA_ROOT = Path("./sima")
     EXPORT_DIR = Path("./exports")
     ARCHIVE_DIR = Path("./archives")
     MAX_FILE_LINES = 350
     SUPPORTED_FORMATS = ["md", "json"]
+    # ADDED: Parse cache (LRU bound and on-disk snapshot)
+    PARSE_CACHE_SIZE = 4096
+    PARSE_CACHE_FILE = Path("./cache/parse_cache.json")
+    # ADDED: SQLite parse state shared by worker processes (instead of the JSON snapshot)
+    PARSE_CACHE_SHARED = False
+    PARSE_CACHE_DB = Path("./cache/parse_cache.sqlite3")
+    # ADDED: /api/tree defaults (levels per request, children per page)
+    TREE_DEFAULT_DEPTH = 1
+    TREE_PAGE_SIZE = 500
+    # ADDED: Export process pool (1 = serial, 0 = one worker per CPU)
+    EXPORT_WORKERS = 1
+    EXPORT_CHUNK_SIZE = 64
+    # ADDED: Archive layout (1 = indent=2, 2 = compact: opt-in) and container ('', 'gzip', 'lzma')
+    EXPORT_ARCHIVE_VERSION = 1
+    EXPORT_COMPRESSION = ''
+    # ADDED: Append a record index footer to uncompressed archives (random access; opt-in)
+    EXPORT_INDEXED = False
+    # ADDED: Import thread pool and durability
+    IMPORT_WORKERS = 8
+    IMPORT_CHUNK_SIZE = 32
+    IMPORT_FSYNC = True
+    # ADDED: Hierarchy rebuild process pool (one task per top-level subtree)
+    INDEX_WORKERS = 1
+    # ADDED: Search index re-stats the tree at most this often (seconds)
+    SEARCH_REFRESH_SECONDS = 5
+    SEARCH_DEFAULT_LIMIT = 20
+    # ADDED: REF-ID map refresh interval (seconds) and closure depth bounds
+    REF_REFRESH_SECONDS = 5
+    REF_CLOSURE_DEPTH = 1
+    REF_CLOSURE_MAX_DEPTH = 10
+    # ADDED: Background watcher for SIMA_ROOT (backend: auto, inotify or poll)
+    WATCH_ENABLED = False
+    WATCH_BACKEND = 'auto'
+    WATCH_POLL_INTERVAL = 2.0
+    WATCH_DEBOUNCE_SECONDS = 0.5
+    WATCH_MAX_DELAY_SECONDS = 5.0
+    WATCH_REBUILD_INDEXES = False
+    # ADDED: Where delta exports, index state and validation find changed files
+    # ('walk' = stat the tree, 'git' = ask the local repository, 'auto' = git when available)
+    CHANGE_SOURCE = 'walk'
+    # ADDED: Header fields /api/validate requires
+    REQUIRED_FIELDS = ('version', 'date', 'purpose')
+    # ADDED: Metrics at /metrics (master switch, then the scopes recorded while it is on)
+    METRICS_ENABLED = False
+    METRICS_SCOPES = ('http', 'phases', 'files', 'cache')
+    METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+    # ADDED: Worker snapshots summed by /metrics under multi-worker serving (written every FLUSH_SECONDS)
+    METRICS_SHARED = False
+    METRICS_DIR = Path("./cache/metrics")
+    METRICS_FLUSH_SECONDS = 5.0
+    # ADDED: Background jobs (worker threads, queue bound, records kept on disk)
+    JOB_WORKERS = 2
+    JOB_MAX_QUEUED = 32
+    JOB_DIR = Path("./jobs")
+    JOB_HISTORY = 200
+    JOB_SAVE_INTERVAL = 1.0
+    # ADDED: Job progress event stream (max event rate, heartbeat while idle)
+    SSE_MIN_INTERVAL = 0.25
+    SSE_HEARTBEAT_SECONDS = 15
+    # ADDED: SQLite metadata catalog for /api/query (refresh interval, page sizes)
+    CATALOG_FILE = Path("./cache/catalog.sqlite3")
+    CATALOG_REFRESH_SECONDS = 5
+    QUERY_DEFAULT_LIMIT = 50
+    QUERY_MAX_LIMIT = 1000
+    # ADDED: gzip JSON responses of at least this many bytes (level 1-9)
+    GZIP_MIN_BYTES = 1024
+    GZIP_LEVEL = 6
+    # ADDED: /api/analyze-batch process pool (1 = serial, 0 = one per CPU) and files per request
+    ANALYZE_WORKERS = 1
+    ANALYZE_BATCH_MAX_FILES = 10000
 
 # Language detection patterns for code blocks
+# (reference regexes; parsing uses LANGUAGE_ALIASES via modules/scanner.py)
 LANGUAGE_PATTERNS = {
     'python': r'```python\n',
     'javascript': r'```(?:javascript|js)\n',
@@ -39,3 +144,86 @@ LANGUAGE_PATTERNS = {
     'bash': r'```(?:bash|sh)\n',
     'yaml': r'```ya?ml\n',
 }
+
+# ADDED: Code fence info-string aliases (lowercased) -> language
+LANGUAGE_ALIASES = {
+    'python': 'python', 'py': 'python', 'python3': 'python', 'py3': 'python',
+    'javascript': 'javascript', 'js': 'javascript', 'node': 'javascript', 'jsx': 'javascript',
+    'typescript': 'typescript', 'ts': 'typescript', 'tsx': 'typescript',
+    'java': 'java',
+    'go': 'go', 'golang': 'go',
+    'rust': 'rust', 'rs': 'rust',
+    'c': 'c', 'h': 'c',
+    'cpp': 'cpp', 'c++': 'cpp', 'cxx': 'cpp', 'hpp': 'cpp',
+    'csharp': 'csharp', 'cs': 'csharp', 'c#': 'csharp',
+    'ruby': 'ruby', 'rb': 'ruby',
+    'php': 'php',
+    'swift': 'swift',
+    'kotlin': 'kotlin', 'kt': 'kotlin', 'kts': 'kotlin',
+    'sql': 'sql',
+    'bash': 'bash', 'sh': 'bash', 'shell': 'bash', 'zsh': 'bash',
+    'yaml': 'yaml', 'yml': 'yaml',
+}
+
+# ADDED: Settings layer (file -> environment -> explicit overrides)
+ENV_PREFIX = 'SIMA_'
+CONFIG_FILE_ENV = 'SIMA_CONFIG'
+
+def _convert(name: str, value, default):
+    """Coerce a setting to the type of its default (strings from files or the environment)"""
+    if isinstance(default, tuple):
+        items = value.split(',') if isinstance(value, str) else value
+        sample = default[0] if default else ''
+        return tuple(_convert(name, item.strip() if isinstance(item, str) else item, sample)
+                     for item in items if item != '')
+    if isinstance(default, Path):
+        return Path(value)
+    if not isinstance(value, str):
+        return value
+    if isinstance(default, bool):
+        if value.lower() not in ('true', '1', 'yes', 'on', 'false', '0', 'no', 'off'):
+            raise ValueError(f"{name} must be a boolean, got {value!r}")
+        return value.lower() in ('true', '1', 'yes', 'on')
+    if isinstance(default, (int, float)):
+        try:
+            return type(default)(value)
+        except ValueError:
+            raise ValueError(f"{name} must be a {type(default).__name__}, got {value!r}") from None
+    return value
+
+def read_settings_file(path: Path) -> Dict:
+    """Settings from a JSON or YAML (.yaml/.yml) file"""
+    text = Path(path).read_text(encoding='utf-8')
+    if Path(path).suffix in ('.yaml', '.yml'):
+        import yaml
+        data = yaml.safe_load(text) or {}
+    else:
+        data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: settings must be a mapping")
+    return data
+
+def load_settings(config_file: Path = None, environ: Mapping[str, str] = None) -> Dict:
+    """Settings from config_file (default: $SIMA_CONFIG), then SIMA_<NAME> variables, which win"""
+    environ = os.environ if environ is None else environ
+    settings = {}
+    config_file = config_file or environ.get(CONFIG_FILE_ENV)
+    if config_file:
+        settings.update({key.upper(): value for key, value in read_settings_file(config_file).items()})
+    for key, value in environ.items():
+        name = key[len(ENV_PREFIX):]
+        if key.startswith(ENV_PREFIX) and key != CONFIG_FILE_ENV and name.isupper() and hasattr(Config, name):
+            settings[name] = value
+    return settings
+
+def apply_settings(settings: Mapping) -> Dict:
+    """Set Config attributes (names case-insensitive); all are validated before any is set"""
+    applied = {}
+    for key, value in settings.items():
+        name = str(key).upper()
+        if name.startswith('_') or not hasattr(Config, name) or callable(getattr(Config, name)):
+            raise ValueError(f"Unknown setting: {key}")
+        applied[name] = _convert(name, value, getattr(Config, name))
+    for name, value in applied.items():
+        setattr(Config, name, value)
+    return applied
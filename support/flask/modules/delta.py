@@ -0,0 +1,158 @@
+"""
+modules/delta.py
+
+Version: 1.2.1
+Date: 2026-10-18
+Purpose: Delta exports - per-file content state, change detection, tombstones
+Project: SIMA
+
+ADDED: ChangeTracker (sha1/mtime/size per file, changed-only filter, deleted paths)
+ADDED: Manifest sidecars (<archive>.manifest.json) and load_manifest for delta bases
+ADDED: changed_only tracking (candidates from a change source, rest carried from the base)
+ADDED: Unchanged, vanished and unreadable files counted on a Progress
+MODIFIED: Exported files record the digest of the bytes they were parsed from; no hashing without a base
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Tuple
+import hashlib
+import json
+import os
+
+from modules.archive import ArchiveReader, open_archive
+from modules.archive_index import IndexedArchive
+
+MANIFEST_SUFFIX = '.manifest.json'
+ARCHIVE_SUFFIXES = ('.json.gz', '.json.xz', '.json')
+
+def manifest_path(archive_file: Path) -> Path:
+    """Sidecar manifest written next to an archive (sima_export_X.json.gz -> sima_export_X.manifest.json)"""
+    archive_file = Path(archive_file)
+    name = archive_file.name
+    for suffix in ARCHIVE_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    return archive_file.with_name(name + MANIFEST_SUFFIX)
+
+def save_manifest(archive_file: Path, manifest: Dict) -> Path:
+    """Write the final manifest of an archive to its sidecar"""
+    path = manifest_path(archive_file)
+    path.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    return path
+
+def load_manifest(path: Path) -> Dict:
+    """Final manifest (with checksums) of an archive or a sidecar manifest file
+
+    Sidecars and index footers are read directly; other archives are
+    streamed once to reach the fields written after the records.
+    """
+    path = Path(path)
+    if path.name.endswith(MANIFEST_SUFFIX):
+        return json.loads(path.read_text(encoding='utf-8'))
+    if IndexedArchive.is_indexed(path):
+        with IndexedArchive(path) as archive:
+            return archive.manifest
+    sidecar = manifest_path(path)
+    if sidecar.is_file():
+        return json.loads(sidecar.read_text(encoding='utf-8'))
+    with open_archive(path) as stream:
+        reader = ArchiveReader(stream)
+        for _ in reader.files():
+            pass
+        return reader.manifest
+
+
+class ChangeTracker:
+    """Content state of an export and, against a base manifest, what changed
+
+    filter() passes through only files that are new or whose content
+    differs from the base; the exporter then record()s [sha1, mtime_ns,
+    size] from the bytes it parsed. Files whose (mtime_ns, size) match the
+    base are not opened; only base files whose signature changed are hashed
+    up front, so touched files with the same bytes are not exported.
+    Without a base every file passes through unopened.
+
+    With changed_only=True the pairs are only candidates (e.g. from
+    GitChangeSource.changes_since); every other base file keeps its base
+    state, and candidates that no longer exist become deletions.
+    Files filtered out are counted on `progress` (see modules/progress.py).
+    """
+
+    def __init__(self, base: Dict = None, changed_only: bool = False, progress=None):
+        if base is not None and 'checksums' not in base:
+            raise ValueError("Base manifest has no checksums (archive predates delta exports)")
+        self.base = base
+        self.base_checksums = base['checksums'] if base is not None else {}
+        self.checksums = dict(self.base_checksums) if changed_only else {}
+        self.stats = {'added': 0, 'modified': 0, 'unchanged': 0}
+        self.progress = progress
+
+    def header_fields(self) -> Dict:
+        """Manifest fields known up front (the base this delta applies to)"""
+        if self.base is None:
+            return {}
+        return {'base_id': self.base.get('archive_id', ''), 'base_created': self.base.get('created', '')}
+
+    def filter(self, files: Iterable[Tuple[Path, str]]) -> Iterator[Tuple[Path, str]]:
+        """Yield the pairs that need exporting, recording the state of those that do not"""
+        for file_path, archive_path in files:
+            if self.base is None:
+                self.stats['added'] += 1
+                yield file_path, archive_path
+                continue
+            old = self.base_checksums.get(archive_path)
+            try:
+                st = os.stat(file_path)
+                if old and old[1:] == [st.st_mtime_ns, st.st_size]:
+                    self.checksums[archive_path] = old
+                    self.stats['unchanged'] += 1
+                    self._skipped(archive_path)
+                    continue
+                digest = None
+                if old:
+                    with open(file_path, 'rb') as f:
+                        digest = hashlib.sha1(f.read()).hexdigest()
+            except FileNotFoundError:
+                self.checksums.pop(archive_path, None)
+                self._skipped(archive_path)
+                continue
+            except OSError as e:
+                print(f"Error reading {file_path}: {e}")
+                self.discard(archive_path)
+                self._skipped(archive_path, e)
+                continue
+
+            if old and old[0] == digest:
+                self.checksums[archive_path] = [digest, st.st_mtime_ns, st.st_size]
+                self.stats['unchanged'] += 1
+                self._skipped(archive_path)
+                continue
+            self.stats['modified' if old else 'added'] += 1
+            yield file_path, archive_path
+
+    def _skipped(self, archive_path: str, error=None):
+        if self.progress is not None:
+            self.progress.advance(archive_path, error)
+
+    def record(self, archive_path: str, digest: str, signature: Tuple[int, int]):
+        """State of an exported file: the digest of the bytes its record was built from"""
+        self.checksums[archive_path] = [digest, *signature]
+
+    def discard(self, archive_path: str):
+        """Forget a file that failed to export, so the next delta retries it
+
+        A file the base already had keeps its base state (it is not a deletion).
+        """
+        old = self.base_checksums.get(archive_path)
+        if old:
+            self.checksums[archive_path] = old
+        else:
+            self.checksums.pop(archive_path, None)
+
+    def final_fields(self) -> Dict:
+        """Fields written after the records: checksums and, for deltas, deleted paths"""
+        fields = {'checksums': dict(sorted(self.checksums.items()))}
+        if self.base is not None:
+            fields['deleted'] = sorted(set(self.base_checksums) - set(self.checksums))
+        return fields
@@ -0,0 +1,316 @@
+"""
+modules/hierarchy.py
+
+Version: 1.3.1
+Date: 2026-10-18
+Purpose: Whole-hierarchy rebuild of indexes, routers and master indexes
+Project: SIMA
+
+ADDED: HierarchyBuilder (one walk, one parse per file, bottom-up, parallel subtrees)
+MODIFIED: Directory scans timed as the "walk" metrics phase; parsed files counted
+ADDED: Optional Progress over top-level subtrees
+MODIFIED: Hand-written navigation files kept unless forced; dry_run; new index for unlisted files
+MODIFIED: No new index for the root or under a master index/router; titles from headings
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+import os
+
+from modules.config import Config
+from modules.indexes import (GENERATED_MARKER, IndexGenerator, differs, heading, is_generated,
+                             is_navigation_file, write_if_changed)
+from modules.metrics import METRICS
+from modules.parallel import resolve_workers
+
+MASTER_SUFFIX = 'Master-Index-of-Indexes.md'
+ROUTER_SUFFIX = '-Router.md'
+INDEX_SUFFIX = '-Index.md'
+
+
+def _link(path: str, directory: str) -> str:
+    return os.path.relpath(path, directory).replace(os.sep, '/')
+
+
+def _header(title: str, purpose: str) -> List[str]:
+    return [
+        f"# {title}",
+        "",
+        f"**Version:** 1.0.0",
+        f"**Date:** {datetime.now().strftime('%Y-%m-%d')}",
+        f"**Purpose:** {purpose}",
+        "",
+        "---",
+        ""
+    ]
+
+
+class HierarchyBuilder:
+    """Rebuild every generated navigation file under a knowledge root
+
+    The tree is walked once, bottom-up. Each markdown file is parsed at most
+    once (and not at all when a sidecar state already has it), and every
+    directory's own index, master index and router is rendered from its
+    children's results. Top-level subtrees are independent and are rebuilt
+    in worker processes. Files are only rewritten when their content changed.
+
+    Navigation files written by hand (no GENERATED_MARKER, see
+    indexes.is_generated) are left alone unless forced. A directory whose
+    files no index at or above it lists gets a new '<dir>-Index.md', unless
+    it is the root or a master index or router at or above it covers it.
+    Titles come from each navigation file's own '# ' heading.
+    """
+
+    @staticmethod
+    def own_indexes(directory: str, rel_parts: tuple, candidates: List[str]) -> List[str]:
+        """The directory's own index files among its *-Index.md files
+
+        '<dir>-Index.md' or '<parent>-<dir>-Index.md' (e.g. generic-lessons-Index.md);
+        failing that, a lone index file. Other index files (hand-written
+        special indexes) are left alone.
+        """
+        names = {os.path.basename(directory) + INDEX_SUFFIX}
+        if rel_parts:
+            names.add('-'.join(rel_parts) + INDEX_SUFFIX)
+        own = [c for c in candidates if os.path.basename(c) in names]
+        if not own and len(candidates) == 1:
+            own = candidates
+        return own
+
+    @staticmethod
+    def rebuild(root: Path, workers: int = None, progress=None, force: bool = False,
+                dry_run: bool = False) -> Dict:
+        """Rebuild all indexes, master indexes and routers under root
+
+        Returns a summary: written files (with dry_run, the files that would
+        change; nothing is written), hand-written files skipped, unchanged
+        count, index count and how many files were parsed versus reused
+        from sidecar state. force also replaces hand-written files.
+        `progress`, if given, counts finished top-level subtrees.
+        """
+        root = os.path.abspath(root)
+        workers = resolve_workers(Config.INDEX_WORKERS if workers is None else workers)
+        options = {'force': force, 'dry_run': dry_run}
+        top = HierarchyBuilder._scan(root)
+        known = HierarchyBuilder._load_states(root, top['states'])
+        own = HierarchyBuilder.own_indexes(root, (), top['indexes'])
+        covered = bool(top['masters'] or top['routers'])
+
+        tasks = [(root, sub, {k: v for k, v in known.items() if k.startswith(sub + os.sep)}, bool(own), covered,
+                  options) for sub in top['subdirs']]
+        if progress is not None:
+            progress.start(len(tasks))
+        children = []
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+                for task, child in zip(tasks, executor.map(_build_subtree, tasks)):
+                    children.append(child)
+                    if progress is not None:
+                        progress.advance(os.path.relpath(task[1], root))
+        else:
+            for task in tasks:
+                children.append(_build_subtree(task))
+                if progress is not None:
+                    progress.advance(os.path.relpath(task[1], root))
+
+        summary = HierarchyBuilder._finish(root, top, known, own, children, False, options)['summary']
+        summary['written'].sort()
+        summary['skipped'].sort()
+        summary['dry_run'] = dry_run
+        METRICS.processed('index', summary['parsed'])
+        return summary
+
+    @staticmethod
+    def _new_index(directory: str, found: Dict, keep_records: bool, covered: bool) -> List[str]:
+        """['<dir>-Index.md'] for files no index lists and no master index or router covers, else []"""
+        if keep_records or covered or not found['files']:
+            return []
+        return [str(IndexGenerator.index_path(Path(directory)))]
+
+    @staticmethod
+    def _scan(directory: str) -> Dict:
+        """List one directory: subdirs, markdown files with stat, navigation and state files"""
+        found = {'subdirs': [], 'files': [], 'indexes': [], 'masters': [], 'routers': [], 'states': []}
+        with METRICS.phase('walk'), os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if not name.startswith('.'):
+                        found['subdirs'].append(entry.path)
+                elif name.startswith('.') and name.endswith('.state.json'):
+                    found['states'].append(entry.path)
+                elif name.endswith(MASTER_SUFFIX):
+                    found['masters'].append(entry.path)
+                elif name.endswith(ROUTER_SUFFIX):
+                    found['routers'].append(entry.path)
+                elif name.endswith(INDEX_SUFFIX):
+                    found['indexes'].append(entry.path)
+                elif name.endswith('.md') and not is_navigation_file(name):
+                    found['files'].append((entry.path, entry.stat()))
+        for key in found:
+            found[key].sort()
+        return found
+
+    @staticmethod
+    def _load_states(directory: str, state_files: List[str]) -> Dict:
+        """Sidecar records keyed by absolute path"""
+        known = {}
+        for state_file in state_files:
+            for rel, record in IndexGenerator.load_state(Path(state_file)).items():
+                known[os.path.join(directory, rel)] = record
+        return known
+
+    @staticmethod
+    def _build(root: str, directory: str, known: Dict, keep_records: bool, covered: bool, options: Dict) -> Dict:
+        """Rebuild one directory after its children (depth-first, bottom-up)"""
+        found = HierarchyBuilder._scan(directory)
+        known.update(HierarchyBuilder._load_states(directory, found['states']))
+        rel_parts = Path(os.path.relpath(directory, root)).parts
+        covered = covered or bool(found['masters'] or found['routers'])
+        own = (HierarchyBuilder.own_indexes(directory, rel_parts, found['indexes'])
+               or HierarchyBuilder._new_index(directory, found, keep_records, covered))
+        children = [HierarchyBuilder._build(root, sub, known, keep_records or bool(own), covered, options)
+                    for sub in found['subdirs']]
+        return HierarchyBuilder._finish(directory, found, known, own, children, keep_records, options)
+
+    @staticmethod
+    def _finish(directory: str, found: Dict, known: Dict, own: List[str],
+                children: List[Dict], keep_records: bool, options: Dict) -> Dict:
+        """Render and write this directory's navigation files from file records and child nodes"""
+        summary = {'written': [], 'skipped': [], 'unchanged': 0, 'indexes': 0, 'files': 0, 'parsed': 0,
+                   'reused': 0}
+        records = {}
+        for child in children:
+            records.update(child['records'])
+            for key, value in child['summary'].items():
+                summary[key] += value
+
+        # Files only need a record if some index at or above this directory lists them
+        for file_path, st in found['files'] if own or keep_records else []:
+            try:
+                record, kind = IndexGenerator.record_for(Path(file_path), st, known.get(file_path))
+            except Exception as e:
+                print(f"Error processing {file_path}: {e}")
+                continue
+            records[file_path] = record
+            summary['files'] += 1
+            summary['parsed' if kind == 'parsed' else 'reused'] += 1
+
+        def write(path: str, content: str) -> bool:
+            """Write (or with dry_run, report) a changed generated file; False if left alone"""
+            if not options['force'] and not is_generated(Path(path)):
+                summary['skipped'].append(path)
+                return False
+            if options['dry_run'] and differs(Path(path), content):
+                summary['written'].append(path)
+            elif not options['dry_run'] and write_if_changed(Path(path), content):
+                summary['written'].append(path)
+            else:
+                summary['unchanged'] += 1
+            return not options['dry_run']
+
+        # Every index in the subtree with its entry count (None if not generated)
+        listed = []
+        for child in children:
+            listed.extend(child['listed'])
+
+        titles = {path: heading(Path(path), Path(path).stem) for path in found['indexes'] + found['masters']}
+        for index_file in own:
+            local = {os.path.relpath(p, directory): r for p, r in records.items()}
+            title = titles.setdefault(index_file, f"{os.path.basename(directory)} Index")
+            written = write(index_file, IndexGenerator.render(title, {rel: r['entry'] for rel, r in local.items()}))
+            state_file = IndexGenerator.state_path(Path(index_file))
+            if written and IndexGenerator.load_state(state_file) != local:
+                IndexGenerator.save_state(state_file, local)
+            summary['indexes'] += 1
+        for index_file in sorted(set(found['indexes']) | set(own)):
+            count = len(records) if index_file in own else None
+            categories = sorted({r['entry']['category'] for r in records.values()}) if index_file in own else []
+            listed.append({'path': index_file, 'title': titles[index_file], 'kind': 'index', 'count': count,
+                           'categories': categories})
+
+        for master in found['masters']:
+            write(master, HierarchyBuilder.render_master(master, listed))
+        for master in found['masters']:
+            listed.append({'path': master, 'title': titles[master], 'kind': 'master', 'count': None,
+                           'categories': []})
+        for router in found['routers']:
+            write(router, HierarchyBuilder.render_router(router, listed))
+
+        return {
+            'records': records if keep_records else {},
+            'listed': listed,
+            'summary': summary
+        }
+
+    @staticmethod
+    def render_master(master: str, listed: List[Dict]) -> str:
+        """Master index: every index and master index below this one"""
+        directory = os.path.dirname(master)
+        md_lines = _header(heading(Path(master), Path(master).stem), "Auto-generated master index of indexes")
+
+        masters = [item for item in listed if item['kind'] == 'master']
+        indexes = [item for item in listed if item['kind'] == 'index']
+        total = 0
+        if masters:
+            md_lines.append("## Master Indexes")
+            md_lines.append("")
+            for item in masters:
+                link = _link(item['path'], directory)
+                md_lines.append(f"- [{item['title']}]({link})")
+            md_lines.append("")
+        if indexes:
+            md_lines.append("## Indexes")
+            md_lines.append("")
+            for item in indexes:
+                link = _link(item['path'], directory)
+                count = f" - {item['count']} files" if item['count'] is not None else ""
+                md_lines.append(f"- [{item['title']}]({link}){count}")
+                total += item['count'] or 0
+            md_lines.append("")
+
+        md_lines.append("---")
+        md_lines.append(f"**Total Indexes:** {len(indexes)}")
+        md_lines.append(f"**Total Files:** {total}")
+        md_lines.append(GENERATED_MARKER)
+        return '\n'.join(md_lines)
+
+    @staticmethod
+    def render_router(router: str, listed: List[Dict]) -> str:
+        """Router: master indexes, then generated indexes grouped by the categories they cover"""
+        directory = os.path.dirname(router)
+        md_lines = _header(heading(Path(router), Path(router).stem), "Auto-generated navigation router")
+
+        masters = [item for item in listed if item['kind'] == 'master']
+        if masters:
+            md_lines.append("## Master Indexes")
+            md_lines.append("")
+            for item in masters:
+                link = _link(item['path'], directory)
+                md_lines.append(f"- [{item['title']}]({link})")
+            md_lines.append("")
+
+        grouped = {}
+        for item in listed:
+            for category in item['categories']:
+                grouped.setdefault(category, []).append(item)
+        for category in sorted(grouped):
+            md_lines.append(f"## {category}")
+            md_lines.append("")
+            for item in grouped[category]:
+                link = _link(item['path'], directory)
+                md_lines.append(f"- [{item['title']}]({link})")
+            md_lines.append("")
+
+        md_lines.append("---")
+        md_lines.append(f"**Total Categories:** {len(grouped)}")
+        md_lines.append(GENERATED_MARKER)
+        return '\n'.join(md_lines)
+
+
+def _build_subtree(task: tuple) -> Dict:
+    """Worker: rebuild one top-level subtree"""
+    root, directory, known, keep_records, covered, options = task
+    return HierarchyBuilder._build(root, directory, known, keep_records, covered, options)
@@ -0,0 +1,98 @@
+"""
+modules/http_cache.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Conditional responses and compression for API and UI payloads
+Project: SIMA
+
+ADDED: etag_for/cached_json (ETag and Last-Modified from filesystem state, 304 for GET/HEAD)
+ADDED: compress_app() gzip for JSON responses when the client accepts it
+ADDED: StaticPage (pre-rendered, precompressed HTML)
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+import gzip
+import hashlib
+
+from flask import Response, jsonify, request
+from werkzeug.http import is_resource_modified
+
+from modules.config import Config
+
+def etag_for(*parts) -> str:
+    """ETag value for request parameters plus state such as (path, mtime_ns, size) tuples"""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(repr(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()[:32]
+
+def _http_date(mtime_ns: Optional[int]) -> Optional[datetime]:
+    return datetime.fromtimestamp(mtime_ns / 1e9, timezone.utc) if mtime_ns else None
+
+def accepts_gzip() -> bool:
+    return request.accept_encodings['gzip'] > 0
+
+def with_validators(response: Response, etag: str, mtime_ns: int = None) -> Response:
+    """Set a weak ETag (valid for identity and gzip bodies) and Last-Modified; clients must revalidate"""
+    response.set_etag(etag, weak=True)
+    if mtime_ns:
+        response.last_modified = _http_date(mtime_ns)
+    response.cache_control.no_cache = True
+    response.vary.add('Accept-Encoding')
+    return response
+
+def not_modified(etag: str, mtime_ns: int = None) -> Optional[Response]:
+    """304 when a GET/HEAD request's If-None-Match (or If-Modified-Since) still matches, else None"""
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    if is_resource_modified(request.environ, etag=etag, last_modified=_http_date(mtime_ns)):
+        return None
+    return with_validators(Response(status=304), etag, mtime_ns)
+
+def cached_json(etag: str, mtime_ns: Optional[int], build: Callable[[], Any]) -> Response:
+    """jsonify(build()) with validators, or 304 without calling build()"""
+    response = not_modified(etag, mtime_ns)
+    if response is None:
+        response = with_validators(jsonify(build()), etag, mtime_ns)
+    return response
+
+
+def compress_app(app):
+    """gzip JSON responses of at least Config.GZIP_MIN_BYTES for clients that accept it
+
+    File downloads (direct passthrough, Range-capable) and streams are left alone.
+    """
+
+    @app.after_request
+    def _gzip(response):
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers):
+            return response
+        response.vary.add('Accept-Encoding')
+        if not accepts_gzip() or (response.content_length or 0) < Config.GZIP_MIN_BYTES:
+            return response
+        response.set_data(gzip.compress(response.get_data(), Config.GZIP_LEVEL))
+        response.headers['Content-Encoding'] = 'gzip'
+        return response
+
+
+class StaticPage:
+    """HTML rendered once, served with a content ETag from memory (gzip precompressed)"""
+
+    def __init__(self, html: str):
+        self.body = html.encode('utf-8')
+        self.gzipped = gzip.compress(self.body, 9)
+        self.etag = etag_for(self.body)
+
+    def response(self) -> Response:
+        cached = not_modified(self.etag)
+        if cached is not None:
+            return cached
+        compressed = accepts_gzip()
+        response = Response(self.gzipped if compressed else self.body, mimetype='text/html')
+        if compressed:
+            response.headers['Content-Encoding'] = 'gzip'
+        return with_validators(response, self.etag)
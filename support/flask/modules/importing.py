@@ -0,0 +1,100 @@
+"""
+modules/importing.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Import internals - record writing through a transaction, target paths, chain reading
+Project: SIMA
+
+ADDED: write_records, import_chunk, target_path and chain_records (moved from ExportManager)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+import os
+
+from modules.archive import ArchiveReader, open_archive
+from modules.archive_index import IndexedArchive
+from modules.config import Config
+from modules.knowledge import JSONToMD
+from modules.metrics import METRICS
+from modules.parallel import chunked, ordered_map
+from modules.transaction import ImportTransaction
+
+def target_path(target_dir: Path, archive_path: str, flatten: bool = False) -> Path:
+    """Where an archive path lands under target_dir; ValueError if absolute or outside it"""
+    rel_path = Path(archive_path)
+    if flatten:
+        rel_path = Path(rel_path.name)
+    if rel_path.is_absolute() or rel_path.anchor:
+        raise ValueError(f"absolute path not allowed: {archive_path}")
+    root = os.path.realpath(target_dir)
+    resolved = os.path.realpath(os.path.join(root, rel_path))
+    if resolved == root or os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"path outside target: {archive_path}")
+    return target_dir / rel_path
+
+def import_chunk(txn: ImportTransaction, target_dir: Path, flatten: bool,
+                 chunk: List[Dict]) -> List[Tuple[str, str]]:
+    """Worker: convert records and write them through the transaction
+
+    Records whose path is absolute or leaves target_dir fail alone
+    (a per-file error); nothing is written for them.
+    """
+    results = []
+    for file_data in chunk:
+        try:
+            file_path = target_path(target_dir, file_data['path'], flatten)
+            with METRICS.phase('serialise'):
+                md_content = JSONToMD.convert(file_data)
+        except Exception as e:
+            results.append((file_data.get('path', 'unknown'), str(e)))
+            continue
+        txn.write(file_path, md_content)
+        results.append((str(file_path), None))
+    return results
+
+def write_records(txn: ImportTransaction, records: Iterable[Dict], target_dir: Path,
+                  flatten: bool, workers: int = None, progress=None) -> List[str]:
+    """Convert and write records through a transaction with a thread pool"""
+    workers = Config.IMPORT_WORKERS if workers is None else max(1, workers)
+    imported = []
+    convert = partial(import_chunk, txn, target_dir, flatten)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        chunks = chunked(records, Config.IMPORT_CHUNK_SIZE)
+        for results in ordered_map(pool, convert, chunks, window=workers * 2):
+            for path, error in results:
+                if error:
+                    print(f"Error importing {path}: {error}")
+                else:
+                    imported.append(path)
+                if progress is not None:
+                    progress.bytes_written = txn.bytes_written
+                    progress.advance(path, error)
+    return imported
+
+def chain_records(archive_file: Path, settled: Set[str], manifests: List[Dict], i: int) -> Iterator[Dict]:
+    """Records of one chain archive whose path no newer archive has settled
+
+    Stores the archive's manifest in manifests[i] (known once its records
+    are read); indexed archives skip settled records without decoding them.
+    """
+    if IndexedArchive.is_indexed(archive_file):
+        with IndexedArchive(archive_file) as archive:
+            manifests[i] = archive.manifest
+            for j, entry in enumerate(archive.entries):
+                if entry[0] not in settled:
+                    settled.add(entry[0])
+                    yield archive.record(j)
+        return
+
+    with open_archive(archive_file) as stream:
+        reader = ArchiveReader(stream)
+        for record in reader.files():
+            path = record.get('path', '')
+            if path not in settled:
+                settled.add(path)
+                yield record
+        manifests[i] = reader.manifest
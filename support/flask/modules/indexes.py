@@ -0,0 +1,296 @@
+"""
+modules/indexes.py
+
+Version: 1.5.2
+Date: 2026-10-18
+Purpose: Index file generation with incremental sidecar state
+Project: SIMA
+
+ADDED: IndexGenerator (moved from managers.py, re-exported there)
+ADDED: Sidecar state (.<name>-Index.md.state.json) with per-file digest and entry
+ADDED: record_for, write_if_changed; routers/master indexes excluded from entries
+ADDED: Git snapshot in sidecar state; collect() visits only git-reported changes
+MODIFIED: Walk/write metrics phases; files read for an index counted
+ADDED: Optional Progress for generate/write_index
+ADDED: GENERATED_MARKER / is_generated(); hand-written indexes are not replaced unless forced
+MODIFIED: record_for() decodes with decode_source (CRLF files)
+MODIFIED: Entries link by each file title (STATE_FORMAT 2); heading() helper
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Tuple
+import hashlib
+import json
+import os
+import re
+
+from modules.cache import PARSE_CACHE
+from modules.changes import change_source
+from modules.knowledge import KnowledgeFile, decode_source
+from modules.metrics import METRICS
+
+# 2: entries carry the file's title
+STATE_FORMAT = 2
+
+# Generated navigation files are never listed as index entries
+NAVIGATION_SUFFIXES = ('-Index.md', '-Router.md', 'Master-Index-of-Indexes.md')
+
+DATE_LINE = re.compile(r'^\*\*Date:\*\* .*$', re.MULTILINE)
+
+# Last line of every generated navigation file; files without it (or the
+# "Auto-generated" purpose of earlier versions, or a sidecar state) were
+# written by hand and are only overwritten on request
+GENERATED_MARKER = '<!-- Generated by SIMA Manager: edits are overwritten on rebuild -->'
+AUTO_PURPOSE = re.compile(r'^\*\*Purpose:\*\* Auto-generated', re.MULTILINE)
+
+def is_navigation_file(name: str) -> bool:
+    """True for index, router and master index files"""
+    return name.endswith(NAVIGATION_SUFFIXES)
+
+def atomic_write(path: Path, text: str):
+    """Write text via a temp file and os.replace"""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with METRICS.phase('write'):
+        tmp_path.write_text(text, encoding='utf-8')
+        os.replace(tmp_path, path)
+
+def differs(path: Path, text: str) -> bool:
+    """True unless the file already has text (ignoring the Date line)"""
+    try:
+        old = path.read_text(encoding='utf-8')
+    except OSError:
+        return True
+    return DATE_LINE.sub('', old, 1) != DATE_LINE.sub('', text, 1)
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """Write text unless the file already has it (ignoring the Date line)"""
+    if not differs(path, text):
+        return False
+    atomic_write(path, text)
+    return True
+
+def heading(path: Path, default: str) -> str:
+    """Title from a file's first '# ' heading (default if missing or unreadable)"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('# ') and line[2:].strip():
+                    return line[2:].strip()
+    except (OSError, UnicodeDecodeError):
+        pass
+    return default
+
+def is_generated(path: Path) -> bool:
+    """True if a navigation file does not exist yet or was generated (see GENERATED_MARKER)"""
+    try:
+        text = path.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        return True
+    except (OSError, UnicodeDecodeError):
+        return False
+    return (GENERATED_MARKER in text or AUTO_PURPOSE.search(text) is not None
+            or IndexGenerator.state_path(path).exists())
+
+
+class IndexGenerator:
+    """Generate index files"""
+
+    @staticmethod
+    def index_path(directory: Path) -> Path:
+        """Default index file for a directory"""
+        return directory / f"{directory.name}-Index.md"
+
+    @staticmethod
+    def state_path(index_file: Path) -> Path:
+        """Sidecar state file stored next to an index file"""
+        return index_file.with_name(f".{index_file.name}.state.json")
+
+    @staticmethod
+    def generate(directory: Path, title: str = "Index", state_file: Path = None, progress=None) -> str:
+        """Generate index MD file for directory
+
+        With a state_file, only new or changed files are read and parsed;
+        unchanged files reuse the entry stored in the sidecar state, which
+        is rewritten afterwards. When a git change source is enabled
+        (Config.CHANGE_SOURCE) the state also stores a git snapshot, and the
+        next run visits only the files git reports as changed since then.
+        Files visited are counted on `progress`, if given.
+        """
+        data = IndexGenerator.read_state(state_file) if state_file else {}
+        source = change_source(directory) if state_file else None
+        snapshot = source.state() if source else None
+        changes = source.changes_since(data['git']) if source and data.get('git') else None
+        records, stats = IndexGenerator.collect(directory, data.get('files', {}), changes, progress)
+        METRICS.processed('index', stats['parsed'] + stats['touched'])
+        if state_file:
+            IndexGenerator.save_state(state_file, records, snapshot)
+        return IndexGenerator.render(title, {rel: r['entry'] for rel, r in records.items()})
+
+    @staticmethod
+    def write_index(directory: Path, title: str = "Index", progress=None, force: bool = False) -> Tuple[Path, str]:
+        """Regenerate a directory's index and sidecar state (index written only if changed)
+
+        Raises FileExistsError if the index was written by hand, unless force.
+        """
+        index_file = IndexGenerator.index_path(directory)
+        if not force and not is_generated(index_file):
+            raise FileExistsError(f"{index_file.name} was written by hand; pass force to replace it")
+        content = IndexGenerator.generate(directory, title, IndexGenerator.state_path(index_file), progress)
+        write_if_changed(index_file, content)
+        return index_file, content
+
+    @staticmethod
+    def entry_for(kf: KnowledgeFile) -> Dict:
+        """Index entry extracted from a parsed file"""
+        return {
+            'title': kf.title or '',
+            'category': kf.metadata.get('category', 'Uncategorized'),
+            'ref_id': kf.metadata.get('ref_id', ''),
+            'purpose': kf.metadata.get('purpose', ''),
+            'languages': ', '.join(sorted(kf.languages)) if kf.languages else ''
+        }
+
+    @staticmethod
+    def collect(directory: Path, state: Dict, changes: Dict = None, progress=None) -> Tuple[Dict, Dict]:
+        """Build {rel_path: {sig, digest, entry}} reusing unchanged state records
+
+        Files whose (mtime_ns, size) match are not opened; files whose bytes
+        hash to the stored digest are not parsed. Deleted files drop out.
+        With `changes` ({'changed': [...], 'deleted': [...]} absolute paths
+        from a change source) the tree is not walked: state records are kept
+        for every other file. Returns (records, stats).
+        """
+        if changes is not None:
+            return IndexGenerator._collect_changes(directory, state, changes, progress)
+        records = {}
+        stats = {'unchanged': 0, 'touched': 0, 'parsed': 0, 'removed': 0}
+        for dirpath, dirnames, filenames in METRICS.timed('walk', os.walk(directory)):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+            for name in filenames:
+                if not name.endswith('.md') or is_navigation_file(name):
+                    continue
+                file_path = Path(dirpath) / name
+                rel = str(file_path.relative_to(directory))
+                error = None
+                try:
+                    records[rel], kind = IndexGenerator.record_for(file_path, file_path.stat(), state.get(rel))
+                    stats[kind] += 1
+                except Exception as e:
+                    print(f"Error processing {file_path}: {e}")
+                    error = e
+                if progress is not None:
+                    progress.advance(rel, error)
+
+        stats['removed'] = len(set(state) - set(records))
+        return records, stats
+
+    @staticmethod
+    def _collect_changes(directory: Path, state: Dict, changes: Dict, progress=None) -> Tuple[Dict, Dict]:
+        """collect() over a change list instead of a tree walk"""
+        prefix = os.path.abspath(directory) + os.sep
+        changed = {os.path.relpath(p, directory): Path(p) for p in changes['changed']
+                   if p.startswith(prefix) and not is_navigation_file(os.path.basename(p))}
+        changed = {rel: p for rel, p in changed.items()
+                   if not any(part.startswith('.') for part in Path(rel).parts)}
+        deleted = {os.path.relpath(p, directory) for p in changes['deleted'] if p.startswith(prefix)}
+
+        records = {rel: record for rel, record in state.items() if rel not in changed and rel not in deleted}
+        stats = {'unchanged': len(records), 'touched': 0, 'parsed': 0, 'removed': 0}
+        if progress is not None:
+            progress.start(len(changed))
+        for rel, file_path in sorted(changed.items()):
+            error = None
+            try:
+                records[rel], kind = IndexGenerator.record_for(file_path, file_path.stat(), state.get(rel))
+                stats[kind] += 1
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"Error processing {file_path}: {e}")
+                error = e
+            if progress is not None:
+                progress.advance(rel, error)
+
+        stats['removed'] = len(set(state) - set(records))
+        return records, stats
+
+    @staticmethod
+    def record_for(file_path: Path, st: os.stat_result, old: Dict = None) -> Tuple[Dict, str]:
+        """State record {sig, digest, entry} for one file, reusing `old` when unchanged
+
+        Returns (record, kind) where kind is 'unchanged' (not opened),
+        'touched' (same bytes, new mtime) or 'parsed'.
+        """
+        sig = [st.st_mtime_ns, st.st_size]
+        if old and old['sig'] == sig:
+            return old, 'unchanged'
+
+        data = file_path.read_bytes()
+        digest = hashlib.sha1(data).hexdigest()
+        if old and old['digest'] == digest:
+            return dict(old, sig=sig), 'touched'
+
+        kf = KnowledgeFile(file_path, decode_source(data), digest)
+        PARSE_CACHE.put(os.path.abspath(file_path), tuple(sig), kf.state())
+        return {'sig': sig, 'digest': digest, 'entry': IndexGenerator.entry_for(kf)}, 'parsed'
+
+    @staticmethod
+    def render(title: str, entries: Dict[str, Dict]) -> str:
+        """Render index markdown from {rel_path: entry}"""
+        md_lines = [
+            f"# {title}",
+            "",
+            f"**Version:** 1.0.0",
+            f"**Date:** {datetime.now().strftime('%Y-%m-%d')}",
+            f"**Purpose:** Auto-generated index",
+            "",
+            "---",
+            ""
+        ]
+
+        # Group by category (paths in sorted order)
+        grouped = {}
+        for rel in sorted(entries, key=lambda r: Path(r).parts):
+            entry = entries[rel]
+            grouped.setdefault(entry['category'], []).append((Path(rel), entry))
+
+        # Write entries
+        for category in sorted(grouped.keys()):
+            md_lines.append(f"## {category}")
+            md_lines.append("")
+
+            for path, entry in grouped[category]:
+                ref_id = f"[{entry['ref_id']}] " if entry['ref_id'] else ""
+                langs = f" `{entry['languages']}`" if entry['languages'] else ""
+                md_lines.append(f"- {ref_id}[{entry.get('title') or path.stem}]({path}){langs} - {entry['purpose']}")
+
+            md_lines.append("")
+
+        md_lines.append("---")
+        md_lines.append(f"**Total Files:** {len(entries)}")
+        md_lines.append(GENERATED_MARKER)
+
+        return '\n'.join(md_lines)
+
+    @staticmethod
+    def read_state(state_file: Path) -> Dict:
+        """Whole sidecar {'format', 'files', 'git'?}; {} if missing, unreadable or another format"""
+        try:
+            data = json.loads(state_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+        return data if data.get('format') == STATE_FORMAT else {}
+
+    @staticmethod
+    def load_state(state_file: Path) -> Dict:
+        """Read sidecar records; missing or unreadable state means full rebuild"""
+        return IndexGenerator.read_state(state_file).get('files', {})
+
+    @staticmethod
+    def save_state(state_file: Path, records: Dict, git: Dict = None):
+        """Write sidecar state atomically (with a GitChangeSource.state() snapshot if given)"""
+        data = {'format': STATE_FORMAT, 'files': records}
+        if git:
+            data['git'] = git
+        atomic_write(state_file, json.dumps(data))
@@ -0,0 +1,53 @@
+"""
+modules/job_events.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Server-Sent Events streams of background job progress
+Project: SIMA
+
+ADDED: sse() and job_events() (moved from modules/jobs.py)
+"""
+
+from typing import Callable, Dict, Iterator, Optional
+import json
+import time
+
+from modules.config import Config
+from modules.jobs import FINISHED, Job
+
+def sse(event: str, data: Dict, event_id: int) -> str:
+    """One Server-Sent Events message"""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+def job_events(job: Job, errors_sent: int = 0, reload: Callable[[], Optional[Job]] = None) -> Iterator[str]:
+    """Server-Sent Events for a job until it finishes
+
+    'progress' carries the state, current file, running counts, bytes
+    written and throughput (at most every Config.SSE_MIN_INTERVAL seconds,
+    and at least every SSE_HEARTBEAT_SECONDS); 'file-error' carries each
+    per-file error once; 'done' carries the final status. Event ids count
+    the errors sent, so a reconnecting client (Last-Event-ID) is not sent
+    them again. Another worker's job is followed through reload(), which
+    re-reads its record every Config.JOB_SAVE_INTERVAL seconds.
+    """
+    seen = -1
+    while True:
+        status = job.status()
+        progress = status['progress']
+        new = progress['errors'] - errors_sent
+        if new > 0:
+            for entry in progress['recent_errors'][-new:]:
+                yield sse('file-error', entry, progress['errors'])
+            errors_sent = progress['errors']
+        if status['state'] in FINISHED:
+            yield sse('done', status, errors_sent)
+            return
+        counts = {k: v for k, v in progress.items() if k != 'recent_errors'}
+        yield sse('progress', dict(counts, state=status['state']), errors_sent)
+        if reload is None:
+            seen = job.progress.wait(seen, Config.SSE_HEARTBEAT_SECONDS)
+            time.sleep(Config.SSE_MIN_INTERVAL)
+        else:
+            time.sleep(max(Config.JOB_SAVE_INTERVAL, Config.SSE_MIN_INTERVAL))
+            job = reload() or job
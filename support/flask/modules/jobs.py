@@ -0,0 +1,332 @@
+"""
+modules/jobs.py
+
+Version: 1.2.2
+Date: 2026-10-18
+Purpose: Background jobs for long-running export, import and index operations
+Project: SIMA
+
+ADDED: Job (state, progress counters, result) and JobQueue (bounded worker pool)
+ADDED: Job records persisted as JSON under Config.JOB_DIR
+ADDED: get_job_queue() process-wide queue (started on first use)
+ADDED: job_events() Server-Sent Events stream
+ADDED: Multi-worker job_dir (owner pid, records of other workers, cancel markers)
+MODIFIED: job_events() moved to modules/job_events.py
+MODIFIED: Job cleanup() runs when a job is cancelled while queued or rejected by a full queue
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+
+from modules.config import Config
+from modules.progress import Cancelled, Progress
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+def _now() -> str:
+    return time.strftime('%Y-%m-%dT%H:%M:%S')
+
+def _alive(pid: Optional[int]) -> bool:
+    """Whether another process with this pid is running (jobs of live workers are left alone)"""
+    if not pid or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class QueueFull(Exception):
+    """Raised by submit() when Config.JOB_MAX_QUEUED jobs are already waiting"""
+
+
+class Job:
+    """One background operation: parameters, state, live progress and result
+
+    run(progress) does the work and returns a JSON-ready result; it is
+    dropped once the job finishes. cleanup() releases what run holds
+    (e.g. a reserved output name) when the job is cancelled or rejected
+    before it runs. Jobs loaded from disk have neither.
+    """
+
+    def __init__(self, kind: str, params: Dict, run: Callable[[Progress], Dict] = None,
+                 cleanup: Callable[[], None] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.run = run
+        self.cleanup = cleanup
+        self.state = QUEUED
+        self.created = _now()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.progress = Progress()
+        self.snapshot = None  # final progress of finished or loaded jobs
+        self.owner = os.getpid()  # worker process running the job
+
+    def status(self) -> Dict:
+        """State and progress counters (everything but the result)"""
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'state': self.state,
+            'params': self.params,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'error': self.error,
+            'progress': self.snapshot or self.progress.snapshot(),
+            'has_result': self.result is not None,
+            'pid': self.owner
+        }
+
+    def record(self) -> Dict:
+        """Persisted form: status plus result"""
+        return dict(self.status(), result=self.result)
+
+    @classmethod
+    def from_record(cls, record: Dict) -> 'Job':
+        job = cls(record['kind'], record.get('params', {}))
+        job.id = record['job_id']
+        for key in ('state', 'created', 'started', 'finished', 'error', 'result'):
+            setattr(job, key, record.get(key))
+        job.snapshot = record.get('progress')
+        job.owner = record.get('pid')
+        return job
+
+
+class JobQueue:
+    """Run submitted operations on a bounded pool of worker threads
+
+    submit() returns at once; at most `workers` jobs run concurrently and
+    at most Config.JOB_MAX_QUEUED wait. Each job's record (state, progress,
+    result) is written to job_dir on every state change and at most every
+    Config.JOB_SAVE_INTERVAL seconds while it runs, so status and results
+    survive client disconnects and server restarts. Jobs that were queued
+    or running when the server stopped are marked failed on load. Only the
+    newest Config.JOB_HISTORY finished jobs are kept.
+
+    Several worker processes may share job_dir: each runs the jobs it was
+    given, answers for the others' jobs from their records and cancels them
+    through a <id>.cancel marker file that the owner checks.
+    """
+
+    def __init__(self, job_dir: Path, workers: int = None):
+        self.job_dir = Path(job_dir)
+        self.workers = max(1, Config.JOB_WORKERS if workers is None else workers)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._threads = []
+        self.load()
+
+    def load(self) -> int:
+        """Adopt job records from job_dir (oldest first) except live workers'; returns how many"""
+        if not self.job_dir.is_dir():
+            return 0
+        jobs = []
+        for path in self.job_dir.glob('*.json'):
+            try:
+                job = Job.from_record(json.loads(path.read_text(encoding='utf-8')))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Error loading job record {path}: {e}")
+                continue
+            if not _alive(job.owner):
+                jobs.append(job)
+        for job in sorted(jobs, key=lambda j: j.created or ''):
+            if job.state not in FINISHED:
+                job.state = FAILED
+                job.error = 'Interrupted by server restart'
+                job.finished = _now()
+                self._save(job)
+            self._jobs[job.id] = job
+        return len(jobs)
+
+    def submit(self, kind: str, params: Dict, run: Callable[[Progress], Dict],
+               cleanup: Callable[[], None] = None) -> Job:
+        """Queue run(progress) as a new job; cleanup() runs if it never does"""
+        job = Job(kind, params, run, cleanup)
+        job.progress.on_change = self._throttled_save(job)
+        with self._lock:
+            full = sum(1 for j in self._jobs.values() if j.state == QUEUED) >= Config.JOB_MAX_QUEUED
+            if not full:
+                self._jobs[job.id] = job
+                self._start_workers()
+        if full:
+            self._drop(job)
+            raise QueueFull(f"{Config.JOB_MAX_QUEUED} jobs are already queued")
+        self._save(job)
+        self._prune()
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """A job of this process, else another worker's as last saved (None if unknown)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job if job is not None else self._read(job_id)
+
+    def is_local(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._jobs
+
+    def list(self) -> List[Dict]:
+        """Status of every known job (including other workers'), newest first"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        local = {job.id for job in jobs}
+        if self.job_dir.is_dir():
+            for path in self.job_dir.glob('*.json'):
+                if path.stem not in local:
+                    job = self._read(path.stem)
+                    if job is not None:
+                        jobs.append(job)
+        jobs.sort(key=lambda j: j.created or '')
+        return [job.status() for job in reversed(jobs)]
+
+    def _read(self, job_id: str) -> Optional[Job]:
+        if not job_id.isalnum():
+            return None
+        try:
+            job = Job.from_record(json.loads(self._path(job_id).read_text(encoding='utf-8')))
+        except (OSError, ValueError, KeyError):
+            return None
+        if job.state not in FINISHED and not _alive(job.owner):
+            job.state = FAILED
+            job.error = 'Interrupted by server restart'
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued job, or ask a running one to stop at its next file"""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if not self.is_local(job_id):
+            if job.state not in FINISHED:
+                # The owning worker sees the marker at its next save
+                self._cancel_marker(job_id).touch()
+            return job
+        with self._lock:
+            if job.state == QUEUED:
+                job.state = CANCELLED
+                job.finished = _now()
+            elif job.state == RUNNING:
+                job.progress.cancel()
+        if job.state == CANCELLED:
+            self._drop(job)
+            self._save(job)
+            self._cancel_marker(job_id).unlink(missing_ok=True)
+            job.progress.notify()
+        return job
+
+    @staticmethod
+    def _drop(job: Job):
+        """Forget run; release what it held if it never ran"""
+        cleanup, job.run, job.cleanup = job.cleanup, None, None
+        if cleanup is not None:
+            cleanup()
+
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f'sima-job-{len(self._threads)}', daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if self._cancel_marker(job.id).exists():
+                self.cancel(job.id)
+            with self._lock:
+                if job.state != QUEUED:
+                    continue
+                job.state = RUNNING
+                job.started = _now()
+            self._save(job)
+            try:
+                job.result = job.run(job.progress)
+                job.state = SUCCEEDED
+            except Cancelled as e:
+                job.state = CANCELLED
+                job.error = str(e)
+            except Exception as e:
+                print(f"Job {job.id} ({job.kind}) failed: {e}")
+                job.state = FAILED
+                job.error = str(e)
+            job.finished = _now()
+            job.snapshot = job.progress.snapshot()
+            self._drop(job)
+            self._save(job)
+            self._cancel_marker(job.id).unlink(missing_ok=True)
+            job.progress.notify()
+
+    def _throttled_save(self, job: Job) -> Callable[[Progress], None]:
+        last = [time.monotonic()]
+
+        def on_change(progress: Progress):
+            now = time.monotonic()
+            if now - last[0] >= Config.JOB_SAVE_INTERVAL:
+                last[0] = now
+                if self._cancel_marker(job.id).exists():
+                    progress.cancel()
+                self._save(job)
+        return on_change
+
+    def _path(self, job_id: str) -> Path:
+        return self.job_dir / f"{job_id}.json"
+
+    def _cancel_marker(self, job_id: str) -> Path:
+        return self.job_dir / f"{job_id}.cancel"
+
+    def _save(self, job: Job):
+        """Write the job record atomically"""
+        try:
+            self.job_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(job.id)
+            tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(json.dumps(job.record()), encoding='utf-8')
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error saving job {job.id}: {e}")
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond Config.JOB_HISTORY"""
+        with self._lock:
+            finished = [j for j in self._jobs.values() if j.state in FINISHED]
+            stale = finished[:max(0, len(finished) - Config.JOB_HISTORY)]
+            for job in stale:
+                del self._jobs[job.id]
+        for job in stale:
+            try:
+                self._path(job.id).unlink()
+            except OSError:
+                pass
+
+
+_QUEUE = None
+_QUEUE_LOCK = threading.Lock()
+
+def get_job_queue() -> JobQueue:
+    """Process-wide JobQueue over Config.JOB_DIR (records loaded on first use)"""
+    global _QUEUE
+    with _QUEUE_LOCK:
+        if _QUEUE is None:
+            _QUEUE = JobQueue(Config.JOB_DIR)
+    return _QUEUE
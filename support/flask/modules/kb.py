@@ -0,0 +1,241 @@
+"""
+modules/kb.py
+
+Version: 1.1.3
+Date: 2026-10-18
+Purpose: Library API for SIMA operations without the web app
+Project: SIMA
+
+ADDED: KnowledgeBase (analyze, tree, export, import, index, validate)
+ADDED: analysis() summary shared with /api/analyze
+ADDED: Process-pool analyze/validate for jobs > 1
+ADDED: files() (directory + glob) and unordered analyze_files for streaming
+MODIFIED: index() takes force and dry_run
+MODIFIED: tree() and files() use modules/browser.py
+MODIFIED: analyze/validate default to Config.ANALYZE_WORKERS when jobs is None
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Union
+
+from modules.config import Config
+
+# Heavier modules (managers, archive, process pools) are imported where used,
+# so importing this module - and starting the CLI - stays fast.
+
+PathLike = Union[str, Path]
+
+def analysis(file_path: Path, kf) -> Dict:
+    """JSON-ready summary of a parsed KnowledgeFile"""
+    return {
+        'path': str(file_path),
+        'ref_id': kf.metadata.get('ref_id', ''),
+        'languages': sorted(list(kf.languages)),
+        'line_count': kf.line_count,
+        'exceeds_limit': kf.line_count > Config.MAX_FILE_LINES,
+        'metadata': kf.metadata
+    }
+
+def analyze_file(file_path: Path) -> Dict:
+    """analysis() of one file, or {path, error} if it cannot be read"""
+    from modules.cache import PARSE_CACHE
+    try:
+        return analysis(file_path, PARSE_CACHE.get(file_path))
+    except (OSError, UnicodeDecodeError) as e:
+        return {'path': str(file_path), 'error': str(e)}
+
+def _analyze_chunk(paths: List[str]) -> List[Dict]:
+    """Worker: analyze_file for each path"""
+    return [analyze_file(Path(p)) for p in paths]
+
+def _check_chunk(paths: List[str]) -> List[List[str]]:
+    """Worker: Validator.check for each path"""
+    from modules.validation import Validator
+    return [Validator.check(Path(p)) for p in paths]
+
+
+class KnowledgeBase:
+    """The web app's operations as plain calls over a SIMA tree
+
+    Paths default to root (Config.SIMA_ROOT); relative paths are taken
+    from the working directory, as the API routes do. Results have the
+    same shape as the matching /api responses. jobs is the parallelism of
+    file parsing (1 = serial, 0 = one process per CPU, None = the Config
+    defaults): exports and hierarchy rebuilds use it as their worker count
+    (else EXPORT_WORKERS, INDEX_WORKERS), analyze_many and validate spread
+    file chunks over a process pool (else ANALYZE_WORKERS).
+    Long operations take an optional Progress (modules/progress.py).
+    """
+
+    def __init__(self, root: PathLike = None, jobs: int = None):
+        self.root = Path(root) if root is not None else Config.SIMA_ROOT
+        self.jobs = jobs
+
+    def _path(self, path: PathLike = None) -> Path:
+        return Path(path) if path else self.root
+
+    def _workers(self) -> int:
+        from modules.parallel import resolve_workers
+        return resolve_workers(Config.ANALYZE_WORKERS if self.jobs is None else self.jobs)
+
+    def _map_files(self, fn, paths: List[str], ordered: bool = True) -> Iterator:
+        """(path, fn result) per path; chunks go to a process pool when jobs > 1
+
+        Results keep input order unless ordered=False, which yields each
+        chunk as soon as it finishes. Serial runs yield file by file.
+        """
+        from modules.parallel import chunked, ordered_map, unordered_map
+        workers = self._workers()
+        chunks = list(chunked(paths, Config.EXPORT_CHUNK_SIZE))
+        if workers > 1 and len(chunks) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                if ordered:
+                    finished = zip(chunks, ordered_map(pool, fn, chunks, window=workers * 2))
+                else:
+                    finished = unordered_map(pool, fn, chunks, window=workers * 2)
+                for chunk, results in finished:
+                    yield from zip(chunk, results)
+        else:
+            for path in paths:
+                yield path, fn([path])[0]
+
+    # Read-only
+
+    def analyze(self, path: PathLike) -> Dict:
+        """Languages, line count and header metadata of one file (raises OSError if unreadable)"""
+        from modules.cache import PARSE_CACHE
+        file_path = Path(path)
+        return analysis(file_path, PARSE_CACHE.get(file_path))
+
+    def files(self, paths: Iterable[PathLike], pattern: str = None) -> List[str]:
+        """Files named by paths: directories expand to their .md files, or to those matching a glob pattern"""
+        from modules.browser import FileBrowser
+        files = []
+        for path in paths:
+            path = Path(path)
+            if not path.is_dir():
+                files.append(str(path))
+            elif pattern:
+                files.extend(str(p) for p in sorted(path.glob(pattern)) if p.is_file())
+            else:
+                files.extend(str(p) for p in FileBrowser.walk_markdown(path))
+        return files
+
+    def analyze_many(self, paths: Iterable[PathLike], progress=None, pattern: str = None,
+                     ordered: bool = True) -> Iterator[Dict]:
+        """analysis() per file of files(paths, pattern); see analyze_files"""
+        return self.analyze_files(self.files(paths, pattern), progress, ordered)
+
+    def analyze_files(self, files: List[str], progress=None, ordered: bool = True) -> Iterator[Dict]:
+        """analysis() per file, in order or (ordered=False) as soon as each is ready
+
+        Unreadable files yield {path, error} instead of stopping the run.
+        """
+        if progress is not None:
+            progress.start(len(files))
+        for path, result in self._map_files(_analyze_chunk, files, ordered):
+            if progress is not None:
+                progress.advance(path, result.get('error'))
+            yield result
+
+    def tree(self, path: PathLike = None, depth: int = None, offset: int = 0, limit: int = None,
+             metadata: bool = False) -> Dict:
+        """Directory tree as /api/tree returns it (depth < 0 walks everything)"""
+        from modules.browser import FileBrowser
+        depth = Config.TREE_DEFAULT_DEPTH if depth is None else depth
+        return FileBrowser.get_tree(self._path(path), depth=depth, offset=offset, limit=limit, metadata=metadata)
+
+    def validate(self, path: PathLike = None, changed_only: bool = True, since: str = None,
+                 progress=None) -> Dict:
+        """Check files against the SIMA rules: {status, source, checked, failed: [{path, problems}]}"""
+        from modules.metrics import METRICS
+        from modules.validation import Validator
+        found = Validator.candidates(self._path(path), changed_only, since)
+        if progress is not None:
+            progress.start(len(found['paths']))
+        failed = []
+        for file_path, problems in self._map_files(_check_chunk, found['paths']):
+            if problems:
+                failed.append({'path': file_path, 'problems': problems})
+            if progress is not None:
+                progress.advance(file_path)
+        METRICS.processed('validate', len(found['paths']))
+        return {'status': 'failed' if failed else 'success', 'source': found['source'],
+                'checked': len(found['paths']), 'failed': failed}
+
+    # Writing
+
+    def export(self, output_file: PathLike = None, path: PathLike = None, files: Iterable[PathLike] = None,
+               archive_version: int = None, compression: str = None, base: PathLike = None,
+               progress=None) -> Dict:
+        """Export a directory (or the listed files) to an archive
+
+        output_file defaults to a timestamped name in Config.EXPORT_DIR.
+        With base (an earlier archive or .manifest.json) only changes are
+        exported. A failed or cancelled export leaves no partial archive.
+        """
+        from modules.managers import ExportManager
+        from modules.operations import export_result, export_target, partial_output
+        if output_file is None:
+            output_file = export_target({} if compression is None else {'compression': compression})[0]
+        output_file = Path(output_file)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        base = Path(base) if base else None
+        workers = self.jobs
+        with partial_output(output_file):
+            if files is None:
+                manifest = ExportManager.export_to_json(self._path(path), output_file, workers, archive_version,
+                                                        compression, base=base, progress=progress)
+            else:
+                files = [Path(f) for f in files]
+                if progress is not None:
+                    progress.start(len(files))
+                manifest = ExportManager.export_files(((f, str(f)) for f in files), output_file, workers,
+                                                      archive_version, compression, base=base, progress=progress)
+        return export_result(manifest, output_file)
+
+    def import_archive(self, archive: PathLike, target: PathLike, flatten: bool = False,
+                       paths: Iterable[str] = None, update_indexes: bool = False, progress=None) -> Dict:
+        """Import one archive into target as a single transaction (rolled back on error)"""
+        from modules.managers import ExportManager
+        from modules.operations import update_index
+        target_dir = Path(target)
+        imported = ExportManager.import_from_json(Path(archive), target_dir, flatten=flatten, paths=paths,
+                                                  progress=progress)
+        return {
+            'status': 'success',
+            'imported_count': len(imported),
+            'files': imported,
+            'target': str(target_dir),
+            'indexes_updated': bool(update_indexes and imported) and update_index(target_dir)
+        }
+
+    def import_chain(self, archives: Iterable[PathLike], target: PathLike, update_indexes: bool = False,
+                     progress=None) -> Dict:
+        """Apply a base archive and its deltas (oldest first) into target as one transaction"""
+        from modules.managers import ExportManager
+        from modules.operations import update_index
+        target_dir = Path(target)
+        result = ExportManager.import_chain([Path(a) for a in archives], target_dir, progress=progress)
+        changed = result['imported'] or result['deleted']
+        return {
+            'status': 'success',
+            'imported_count': len(result['imported']),
+            'deleted_count': len(result['deleted']),
+            'files': result['imported'],
+            'deleted': result['deleted'],
+            'target': str(target_dir),
+            'indexes_updated': bool(update_indexes and changed) and update_index(target_dir)
+        }
+
+    def index(self, path: PathLike = None, title: str = 'Index', rebuild_all: bool = False,
+              force: bool = False, dry_run: bool = False, progress=None) -> Dict:
+        """Write one directory's index, or rebuild every index, master and router under path
+
+        Hand-written navigation files are kept unless force; dry_run (with
+        rebuild_all) only lists the files that would change.
+        """
+        from modules.operations import prepare_index
+        return prepare_index({'path': str(self._path(path)), 'title': title, 'all': rebuild_all,
+                              'force': force, 'dry_run': dry_run, 'workers': self.jobs})(progress)
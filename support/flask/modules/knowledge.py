@@ -1,82 +1,129 @@
 """
 modules/knowledge.py
 
-Version: 1.0.0
-Date: 2025-11-29
+Version: 1.4.2
+Date: 2026-10-18
 Purpose: Knowledge file parsing and conversion
 Project: SIMA
 
 ADDED: KnowledgeFile parser
 ADDED: JSONToMD converter
+MODIFIED: Parse title/keywords/related/line count once; cacheable state
+MODIFIED: Single-pass parsing via modules/scanner.py
+ADDED: to_compact (archive v2 record)
+MODIFIED: Parse time recorded as the "parse" metrics phase
+MODIFIED: sha1 digest of the bytes read kept with the parse state
+ADDED: decode_source() shared by every parser of raw file bytes
 """
 
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, List, Set, Tuple
 from datetime import datetime
-import re
+import hashlib
 
-from modules.config import Config, LANGUAGE_PATTERNS
+from modules.config import Config
+from modules.metrics import METRICS
+from modules.scanner import scan_markdown
+
+def decode_source(data: bytes) -> str:
+    """File bytes as read_text() returns them (UTF-8, CRLF and CR line endings as LF)
+
+    Parse state is cached by path and offsets into this text, so every
+    reader that parses raw bytes must decode them here.
+    """
+    text = data.decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+def read_source(path: Path) -> Tuple[str, str]:
+    """(text, sha1 of the bytes read) - the text as read_text() returns it"""
+    data = path.read_bytes()
+    return decode_source(data), hashlib.sha1(data).hexdigest()
 
 class KnowledgeFile:
-    """Parse and analyze SIMA knowledge files"""
+    """Parse and analyze SIMA knowledge files
     
-    def __init__(self, path: Path):
+    digest is the sha1 of the bytes the content came from (None when the
+    content was passed in without one); delta exports record it.
+    """
+    
+    def __init__(self, path: Path, content: str = None, digest: str = None):
         self.path = path
-        self.content = path.read_text(encoding='utf-8')
+        if content is None:
+            content, digest = read_source(path)
+        self._content = content
+        self.digest = digest
         self.metadata = {}
         self.languages = set()
+        self.title = path.stem
+        self.keywords = []
+        self.related = []
+        self.sections = []
+        self.line_count = 0
         self.parse()
     
+    # ADDED: Restore from cached parse state without reading the file
+    @classmethod
+    def from_state(cls, path: Path, state: Dict) -> 'KnowledgeFile':
+        """Build instance from cached parse state (content loaded lazily)"""
+        kf = cls.__new__(cls)
+        kf.path = path
+        kf._content = None
+        kf.digest = state.get('digest')
+        kf.metadata = dict(state['metadata'])
+        kf.languages = set(state['languages'])
+        kf.title = state['title']
+        kf.keywords = list(state['keywords'])
+        kf.related = list(state['related'])
+        kf.sections = list(state['sections'])
+        kf.line_count = state['line_count']
+        return kf
+    
+    @property
+    def content(self) -> str:
+        """File content, read on first access for cache-restored instances"""
+        if self._content is None:
+            self._content, self.digest = read_source(self.path)
+        return self._content
+    
+    def state(self) -> Dict:
+        """Serializable parse results (everything except content)"""
+        return {
+            'metadata': self.metadata,
+            'languages': sorted(self.languages),
+            'title': self.title,
+            'keywords': self.keywords,
+            'related': self.related,
+            'sections': self.sections,
+            'line_count': self.line_count,
+            'digest': self.digest
+        }
+    
     def parse(self):
         """Parse MD file and extract metadata"""
-        lines = self.content.split('\n')
-        
-        # Extract metadata from header
-        for line in lines[:20]:
-            if line.startswith('**Version:**'):
-                self.metadata['version'] = line.split('**Version:**')[1].strip()
-            elif line.startswith('**Date:**'):
-                self.metadata['date'] = line.split('**Date:**')[1].strip()
-            elif line.startswith('**Purpose:**'):
-                self.metadata['purpose'] = line.split('**Purpose:**')[1].strip()
-            elif line.startswith('**Category:**'):
-                self.metadata['category'] = line.split('**Category:**')[1].strip()
-            elif line.startswith('**REF-ID:**'):
-                self.metadata['ref_id'] = line.split('**REF-ID:**')[1].strip()
-        
-        # Detect languages
-        self.languages = self.detect_languages()
+        # MODIFIED: One fence-aware pass instead of per-field regex scans
+        content = self.content
+        with METRICS.phase('parse'):
+            result = scan_markdown(content)
+        self.metadata = result['metadata']
+        self.languages = result['languages']
+        self.title = result['title'] or self.path.stem
+        self.keywords = result['keywords']
+        self.related = result['related']
+        self.sections = result['sections']
+        self.line_count = result['line_count']
     
     def detect_languages(self) -> Set[str]:
-        """Detect programming languages from code blocks"""
-        detected = set()
-        for lang, pattern in LANGUAGE_PATTERNS.items():
-            if re.search(pattern, self.content):
-                detected.add(lang)
-        return detected
+        """Detect programming languages from code fence info strings"""
+        return set(self.languages)
     
     def to_json(self) -> Dict:
         """Convert to JSON format"""
-        # Extract title from first heading
-        title_match = re.search(r'^# (.+)$', self.content, re.MULTILINE)
-        title = title_match.group(1) if title_match else self.path.stem
-        
-        # Extract keywords if present
-        keywords_match = re.search(r'\*\*Keywords:\*\* (.+)$', self.content, re.MULTILINE)
-        keywords = []
-        if keywords_match:
-            keywords = [k.strip() for k in keywords_match.group(1).split(',')]
-        
-        # Extract related refs
-        related_match = re.search(r'\*\*Related:\*\* (.+)$', self.content, re.MULTILINE)
-        related = []
-        if related_match:
-            related = [r.strip() for r in related_match.group(1).split(',')]
-        
         return {
             "format_version": "1.0.0",
             "sima_version": "4.2.2",
-            "title": title,
+            "title": self.title,
             "ref_id": self.metadata.get('ref_id', ''),
             "metadata": {
                 "version": self.metadata.get('version', '1.0.0'),
@@ -87,44 +134,44 @@ class KnowledgeFile:
                 "modified": datetime.now().isoformat()
             },
             "languages": sorted(list(self.languages)),
-            "keywords": keywords,
-            "related": related,
+            "keywords": self.keywords,
+            "related": self.related,
             "content": {
                 "markdown": self.content,
                 "sections": self.extract_sections()
             },
             "flags": {
                 "has_code": len(self.languages) > 0,
-                "line_count": len(self.content.split('\n')),
-                "exceeds_limit": len(self.content.split('\n')) > Config.MAX_FILE_LINES
+                "line_count": self.line_count,
+                "exceeds_limit": self.line_count > Config.MAX_FILE_LINES
             }
         }
     
+    # ADDED: Archive v2 record (see modules/archive_writer.py CompactArchiveWriter)
+    def to_compact(self) -> Dict:
+        """Compact record: one copy of the body, sections as offsets into it"""
+        return {
+            "title": self.title,
+            "ref_id": self.metadata.get('ref_id', ''),
+            "version": self.metadata.get('version', '1.0.0'),
+            "date": self.metadata.get('date', datetime.now().strftime('%Y-%m-%d')),
+            "purpose": self.metadata.get('purpose', ''),
+            "category": self.metadata.get('category', ''),
+            "languages": sorted(self.languages),
+            "keywords": self.keywords,
+            "related": self.related,
+            "markdown": self.content,
+            "sections": [[s['heading'], s['start'], s['end']] for s in self.sections],
+            "line_count": self.line_count
+        }
+    
     def extract_sections(self) -> List[Dict]:
         """Extract markdown sections"""
-        sections = []
-        current_section = None
-        current_content = []
-        
-        for line in self.content.split('\n'):
-            if line.startswith('## '):
-                if current_section:
-                    sections.append({
-                        "heading": current_section,
-                        "content": '\n'.join(current_content)
-                    })
-                current_section = line[3:].strip()
-                current_content = []
-            elif current_section:
-                current_content.append(line)
-        
-        if current_section:
-            sections.append({
-                "heading": current_section,
-                "content": '\n'.join(current_content)
-            })
-        
-        return sections
+        content = self.content
+        return [
+            {"heading": section['heading'], "content": content[section['start']:section['end']]}
+            for section in self.sections
+        ]
 
 
 class JSONToMD:
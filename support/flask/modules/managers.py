@@ -1,170 +1,306 @@
 """
 modules/managers.py
 
-Version: 1.0.0
-Date: 2025-11-29
+Version: 1.15.4
+Date: 2026-10-18
 Purpose: Export/import managers and utilities
 Project: SIMA
 
 ADDED: ExportManager
 ADDED: IndexGenerator
 ADDED: FileBrowser
+MODIFIED: Parse through shared PARSE_CACHE
+MODIFIED: FileBrowser uses os.scandir with depth limit and pagination
+MODIFIED: Exports stream through ArchiveWriter
+MODIFIED: Imports stream through ArchiveReader
+ADDED: Process-pool export mode, deterministic walk_markdown
+MODIFIED: get_tree lists directories through LISTING_CACHE
+ADDED: Compact v2 archives and gzip/lzma containers
+ADDED: Indexed archives: list_archive, selective import_from_json
+ADDED: Delta exports against a base (checksums, tombstones) and import_chain
+MODIFIED: Delta exports take their candidates from git when a change source is enabled
+MODIFIED: Walk/serialise metrics phases; exported and imported files counted
+ADDED: Optional Progress (counts, bytes written, cancellation) for exports and imports
+ADDED: get_tree stamps (filesystem validator for conditional responses)
+MODIFIED: Import paths must stay inside the target (absolute and ../ paths are per-file errors)
+MODIFIED: Checksums come from the parse that built each record (no separate hashing pass)
+MODIFIED: FileBrowser moved to modules/browser.py, import internals to modules/importing.py
+MODIFIED: Git deltas of a relative source_dir take archive paths from the absolute root
 """
 
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Dict, List
-from datetime import datetime
-import json
+from typing import Dict, Iterable, Iterator, List, Tuple
+import os
 
 from modules.config import Config
-from modules.knowledge import KnowledgeFile, JSONToMD
+from modules.cache import PARSE_CACHE
+from modules.archive import ArchiveReader, new_manifest, open_archive, open_archive_output
+from modules.archive_index import IndexedArchive
+from modules.archive_writer import ArchiveWriter, open_writer
+from modules.changes import change_source
+from modules.delta import ChangeTracker, load_manifest, save_manifest
+from modules.metrics import METRICS
+from modules.importing import chain_records, target_path, write_records
+from modules.parallel import chunked, export_chunk, ordered_map, resolve_workers
+from modules.transaction import ImportTransaction
+from modules.browser import FileBrowser  # re-exported (moved to modules/browser.py)
+from modules.indexes import IndexGenerator  # re-exported (moved to modules/indexes.py)
 
 class ExportManager:
     """Manage export operations"""
     
     @staticmethod
-    def export_to_json(source_dir: Path, output_file: Path):
-        """Export knowledge files to JSON archive"""
-        export_data = {
-            "manifest": {
-                "version": "1.0.0",
-                "sima_version": "4.2.2",
-                "created": datetime.now().isoformat(),
-                "source": str(source_dir),
-                "file_count": 0
-            },
-            "files": []
-        }
+    def export_to_json(source_dir: Path, output_file: Path, workers: int = None,
+                       archive_version: int = None, compression: str = None, base: Path = None,
+                       progress=None):
+        """Export knowledge files to JSON archive (sorted by path)
         
-        for file_path in source_dir.rglob("*.md"):
-            try:
-                kf = KnowledgeFile(file_path)
-                json_data = kf.to_json()
-                json_data['path'] = str(file_path.relative_to(source_dir))
-                export_data['files'].append(json_data)
-            except Exception as e:
-                print(f"Error exporting {file_path}: {e}")
+        With `base` (an earlier archive or its .manifest.json), only files
+        added or modified since then are exported - see export_files. When
+        source_dir is in a git work tree and Config.CHANGE_SOURCE allows it,
+        the manifest stores a git snapshot, and a delta against such a base
+        examines only the files git reports as changed instead of walking.
+        With a Progress (modules/progress.py), the file list is collected
+        first so the total is known.
+        """
+        base_manifest = load_manifest(base) if base else None
+        source = change_source(source_dir)
+        fields = {'source': str(source_dir)}
+        changes = None
+        if source:
+            fields['git'] = source.state()
+            if base_manifest and base_manifest.get('git'):
+                changes = source.changes_since(base_manifest['git'])
         
-        export_data['manifest']['file_count'] = len(export_data['files'])
-        
-        output_file.write_text(json.dumps(export_data, indent=2), encoding='utf-8')
-        return export_data['manifest']
+        if changes is None:
+            root = source_dir
+            paths = FileBrowser.walk_markdown(source_dir)
+        else:
+            # Git reports absolute paths, while source_dir may be relative (./sima)
+            root = Path(source.root)
+            paths = (Path(p) for p in sorted(changes['changed'] + changes['deleted']))
+        if progress is not None:
+            paths = list(paths)
+            progress.start(len(paths))
+        files = ((p, str(p.relative_to(root))) for p in paths)
+        return ExportManager.export_files(files, output_file, workers, archive_version, compression,
+                                          base=base_manifest, changed_only=changes is not None,
+                                          progress=progress, **fields)
     
+    # ADDED: Streaming export shared by /api/export and /api/export-selected
     @staticmethod
-    def import_from_json(json_file: Path, target_dir: Path):
-        """Import JSON archive to MD files"""
-        data = json.loads(json_file.read_text(encoding='utf-8'))
+    def export_files(files: Iterable[Tuple[Path, str]], output_file: Path, workers: int = None,
+                     archive_version: int = None, compression: str = None, base=None,
+                     changed_only: bool = False, progress=None, **manifest_fields) -> Dict:
+        """Stream (file_path, archive_path) pairs into a JSON archive
         
-        imported = []
-        for file_data in data['files']:
-            try:
-                md_content = JSONToMD.convert(file_data)
-                target_path = target_dir / file_data['path']
-                target_path.parent.mkdir(parents=True, exist_ok=True)
-                target_path.write_text(md_content, encoding='utf-8')
-                imported.append(str(target_path))
-            except Exception as e:
-                print(f"Error importing {file_data.get('path', 'unknown')}: {e}")
+        Records are written one at a time, so memory stays flat regardless
+        of archive size. With workers > 1 (default Config.EXPORT_WORKERS)
+        parsing and serialization run in a process pool; records keep input
+        order. archive_version 2 (default Config.EXPORT_ARCHIVE_VERSION) writes
+        the compact layout; compression '' / 'gzip' / 'lzma' (default
+        Config.EXPORT_COMPRESSION) picks the container. Uncompressed archives
+        end with an index footer (Config.EXPORT_INDEXED) for random access.
         
-        return imported
-
-
-class IndexGenerator:
-    """Generate index files"""
+        The final manifest records [sha1, mtime_ns, size] per archive path
+        ("checksums"; the sha1 of the bytes each record was built from) and is also saved as <archive>.manifest.json. With a
+        `base` archive or manifest (a path, or a manifest already loaded),
+        the export is a delta: only added or modified files are written,
+        "base_id" names the base and "deleted" lists base paths that no
+        longer exist. changed_only=True means `files` lists only the paths
+        that may have changed since the base; all others keep their base state.
+        Every input file is counted on `progress`, if given (cancelling it
+        stops the export with Cancelled). Returns the final manifest.
+        """
+        workers = resolve_workers(Config.EXPORT_WORKERS if workers is None else workers)
+        if archive_version is None:
+            archive_version = Config.EXPORT_ARCHIVE_VERSION
+        if compression is None:
+            compression = Config.EXPORT_COMPRESSION
+        if base is not None and not isinstance(base, dict):
+            base = load_manifest(base)
+        tracker = ChangeTracker(base, changed_only, progress)
+        files = tracker.filter(files)
+        manifest = new_manifest(**manifest_fields, **tracker.header_fields())
+        
+        with open_archive_output(output_file, compression) as stream:
+            with open_writer(stream, manifest, archive_version,
+                             compressed=bool(compression), indexed=Config.EXPORT_INDEXED) as writer:
+                if workers > 1:
+                    ExportManager._export_parallel(files, writer, workers, archive_version, tracker, progress)
+                else:
+                    for file_path, archive_path in files:
+                        error = None
+                        try:
+                            st = os.stat(file_path)
+                            kf = PARSE_CACHE.get(file_path, st)
+                            with METRICS.phase('serialise'):
+                                record = kf.to_compact() if archive_version == 2 else kf.to_json()
+                            record['path'] = archive_path
+                            writer.write_file(record)
+                            tracker.record(archive_path, kf.digest, (st.st_mtime_ns, st.st_size))
+                        except Exception as e:
+                            print(f"Error exporting {file_path}: {e}")
+                            tracker.discard(archive_path)
+                            error = e
+                        if progress is not None:
+                            progress.bytes_written = writer.bytes_written
+                            progress.advance(archive_path, error)
+                manifest = writer.close(**tracker.final_fields())
+        save_manifest(output_file, manifest)
+        METRICS.processed('export', manifest['file_count'])
+        return manifest
     
     @staticmethod
-    def generate(directory: Path, title: str = "Index") -> str:
-        """Generate index MD file for directory"""
-        md_lines = [
-            f"# {title}",
-            "",
-            f"**Version:** 1.0.0",
-            f"**Date:** {datetime.now().strftime('%Y-%m-%d')}",
-            f"**Purpose:** Auto-generated index",
-            "",
-            "---",
-            ""
-        ]
+    def _export_parallel(files: Iterable[Tuple[Path, str]], writer: ArchiveWriter, workers: int,
+                         archive_version: int = 1, tracker: ChangeTracker = None, progress=None):
+        """Fan chunks out to a process pool and write results in input order"""
+        chunks = chunked(((str(p), a) for p, a in files), Config.EXPORT_CHUNK_SIZE)
+        work = partial(export_chunk, archive_version=archive_version)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for results in ordered_map(pool, work, chunks, window=workers * 2):
+                for file_path, archive_path, payload, cache_entry, error in results:
+                    if error:
+                        print(f"Error exporting {file_path}: {error}")
+                        if tracker:
+                            tracker.discard(archive_path)
+                    else:
+                        if archive_version == 2:
+                            writer.write_file(payload)
+                        else:
+                            writer.write_encoded(payload, archive_path, cache_entry[2]['metadata'].get('ref_id', ''))
+                        PARSE_CACHE.put(*cache_entry)
+                        if tracker:
+                            tracker.record(archive_path, cache_entry[2]['digest'], cache_entry[1])
+                    if progress is not None:
+                        progress.bytes_written = writer.bytes_written
+                        progress.advance(archive_path, error)
+    
+    @staticmethod
+    def import_from_json(json_file: Path, target_dir: Path, flatten: bool = False,
+                         paths: Iterable[str] = None, progress=None):
+        """Import JSON archive to MD files
         
-        # Group by category
-        entries = {}
-        for file_path in sorted(directory.rglob("*.md")):
-            if file_path.name.endswith('-Index.md'):
-                continue
-            
-            try:
-                kf = KnowledgeFile(file_path)
-                category = kf.metadata.get('category', 'Uncategorized')
-                
-                if category not in entries:
-                    entries[category] = []
-                
-                rel_path = file_path.relative_to(directory)
-                ref_id = kf.metadata.get('ref_id', '')
-                purpose = kf.metadata.get('purpose', '')
-                langs = ', '.join(sorted(kf.languages)) if kf.languages else ''
-                
-                entry = {
-                    'path': rel_path,
-                    'ref_id': ref_id,
-                    'purpose': purpose,
-                    'languages': langs
-                }
-                entries[category].append(entry)
-            except Exception as e:
-                print(f"Error processing {file_path}: {e}")
+        The archive (v1 or v2, plain or gzip/xz) is decoded incrementally;
+        each file is written as soon as its record is read. flatten=True drops
+        archive directories and keeps only the file name. With `paths`, only
+        those archive paths are imported; indexed archives then decode just
+        the selected records. The total on `progress` comes from the index
+        or the header file_count (unknown for compressed archives).
+        """
+        if IndexedArchive.is_indexed(json_file):
+            with IndexedArchive(json_file) as archive:
+                if paths is not None:
+                    paths = list(paths)
+                if progress is not None:
+                    progress.start(len(archive) if paths is None else len(paths))
+                return ExportManager.import_records(archive.records(paths), target_dir, flatten,
+                                                    progress=progress)
         
-        # Write entries
-        for category in sorted(entries.keys()):
-            md_lines.append(f"## {category}")
-            md_lines.append("")
-            
-            for entry in entries[category]:
-                ref_id = f"[{entry['ref_id']}] " if entry['ref_id'] else ""
-                langs = f" `{entry['languages']}`" if entry['languages'] else ""
-                md_lines.append(f"- {ref_id}[{entry['path'].stem}]({entry['path']}){langs} - {entry['purpose']}")
-            
-            md_lines.append("")
+        with open_archive(json_file) as stream:
+            reader = ArchiveReader(stream)
+            records = reader.files()
+            if paths is not None:
+                wanted = set(paths)
+                records = (r for r in records if r.get('path') in wanted)
+            elif progress is not None:
+                records = ExportManager._counted(records, reader, progress)
+            return ExportManager.import_records(records, target_dir, flatten, progress=progress)
+    
+    @staticmethod
+    def _counted(records: Iterator[Dict], reader: ArchiveReader, progress) -> Iterator[Dict]:
+        """Pass records through, starting `progress` from the header file_count at the first one"""
+        for i, record in enumerate(records):
+            if i == 0:
+                progress.start(reader.manifest.get('file_count') or None)
+            yield record
+    
+    # ADDED: Archive preview without decoding file bodies where possible
+    @staticmethod
+    def list_archive(json_file: Path, offset: int = 0, limit: int = None) -> Dict:
+        """Manifest and one page of [{path, ref_id, size}] entries
         
-        md_lines.append("---")
-        md_lines.append(f"**Total Files:** {sum(len(e) for e in entries.values())}")
+        Indexed archives are listed from the footer alone; others are
+        streamed once (bounded memory) to build the page.
+        """
+        if IndexedArchive.is_indexed(json_file):
+            with IndexedArchive(json_file) as archive:
+                return {'manifest': archive.manifest, 'indexed': True, 'total': len(archive),
+                        'offset': offset, 'files': archive.listing(offset, limit)}
         
-        return '\n'.join(md_lines)
-
-
-class FileBrowser:
-    """Browse file system for UI"""
+        files = []
+        total = 0
+        with open_archive(json_file) as stream:
+            reader = ArchiveReader(stream)
+            for record in reader.files():
+                if total >= offset and (limit is None or len(files) < limit):
+                    files.append({'path': record.get('path', ''), 'ref_id': record.get('ref_id', ''),
+                                  'size': len(record.get('content', {}).get('markdown', ''))})
+                total += 1
+            manifest = reader.manifest
+        return {'manifest': manifest, 'indexed': False, 'total': total, 'offset': offset, 'files': files}
     
+    # ADDED: Shared by file and request-body imports
     @staticmethod
-    def get_tree(root_path: Path) -> Dict:
-        """Get directory tree structure"""
-        def build_tree(path: Path) -> Dict:
-            item = {
-                'name': path.name,
-                'path': str(path),
-                'type': 'directory' if path.is_dir() else 'file'
-            }
-            
-            if path.is_dir():
-                children = []
-                try:
-                    for child in sorted(path.iterdir()):
-                        if child.name.startswith('.'):
-                            continue
-                        children.append(build_tree(child))
-                    item['children'] = children
-                except PermissionError:
-                    item['error'] = 'Permission denied'
-            else:
-                item['size'] = path.stat().st_size
-                if path.suffix == '.md':
-                    try:
-                        kf = KnowledgeFile(path)
-                        item['languages'] = sorted(list(kf.languages))
-                        item['ref_id'] = kf.metadata.get('ref_id', '')
-                    except:
-                        pass
-            
-            return item
+    def import_records(records: Iterable[Dict], target_dir: Path, flatten: bool = False,
+                       workers: int = None, progress=None) -> List[str]:
+        """Convert and write file records as one atomic transaction
+        
+        Records are converted and written by a thread pool (default
+        Config.IMPORT_WORKERS); each file lands via temp file + os.replace.
+        Records that fail to convert are reported and skipped; a write error
+        or a malformed archive rolls back every file written so far and
+        re-raises. Leftovers from crashed imports are rolled back first.
+        Each record is counted on `progress`; cancelling it rolls back.
+        """
+        ImportTransaction.recover(target_dir)
+        with ImportTransaction(target_dir) as txn:
+            imported = write_records(txn, records, target_dir, flatten, workers, progress)
+        METRICS.processed('import', len(imported))
+        return imported
+    
+    # ADDED: Delta chains
+    @staticmethod
+    def import_chain(archives: List[Path], target_dir: Path, workers: int = None, progress=None) -> Dict:
+        """Apply a base archive and the deltas exported on top of it, as one transaction
+        
+        `archives` are given oldest first; the first may be a full export
+        or a delta whose base is already in target_dir. They are read newest
+        first, so each path is written once, from the newest archive that
+        has it, and paths deleted later (and not re-added) are removed.
+        Indexed archives skip superseded records without decoding them. A
+        delta whose base_id does not match the previous archive rolls the
+        whole import back. Returns {'imported': [...], 'deleted': [...]}.
+        """
+        archives = [Path(a) for a in archives]
+        settled = set()
+        tombstones = []
+        manifests = [None] * len(archives)
         
-        return build_tree(root_path)
+        def records() -> Iterator[Dict]:
+            for i in reversed(range(len(archives))):
+                yield from chain_records(archives[i], settled, manifests, i)
+                if i + 1 < len(archives) and manifests[i + 1].get('base_id') != manifests[i].get('archive_id'):
+                    raise ValueError(f"{archives[i + 1].name} is not a delta of {archives[i].name}")
+                for path in manifests[i].get('deleted', []):
+                    if path not in settled:
+                        settled.add(path)
+                        tombstones.append(path)
+        
+        ImportTransaction.recover(target_dir)
+        with ImportTransaction(target_dir) as txn:
+            imported = write_records(txn, records(), target_dir, False, workers, progress)
+            for path in tombstones:
+                try:
+                    file_path = target_path(target_dir, path)
+                except ValueError as e:
+                    print(f"Skipping deletion: {e}")
+                    continue
+                txn.delete(file_path)
+                if progress is not None:
+                    progress.advance(path)
+            deleted = list(txn.deleted)
+        METRICS.processed('import', len(imported))
+        return {'imported': imported, 'deleted': deleted}
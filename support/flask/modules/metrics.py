@@ -0,0 +1,350 @@
+"""
+modules/metrics.py
+
+Version: 1.1.1
+Date: 2026-10-18
+Purpose: Built-in instrumentation exposed in Prometheus text format
+Project: SIMA
+
+ADDED: Metrics registry (counters, histograms, scrape-time collectors)
+ADDED: Master/scope switches (Config.METRICS_ENABLED, Config.METRICS_SCOPES)
+ADDED: phase() timer and timed() iterator for walk/parse/serialise/write
+ADDED: instrument_app() request hooks (latency histogram, request/response bytes)
+MODIFIED: configure() also applies Config.METRICS_LATENCY_BUCKETS
+MODIFIED: Workers aggregate through snapshots in Config.METRICS_DIR (Config.METRICS_SHARED)
+"""
+
+from contextlib import nullcontext, suppress
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+import atexit
+import json
+import os
+import threading
+import time
+
+from modules.config import Config
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+SCOPES = ('http', 'phases', 'files', 'cache')
+
+# name -> (type, help); every sample rendered must be declared here
+DEFINITIONS = {
+    'sima_http_requests_total': ('counter', 'HTTP requests by route, method and status'),
+    'sima_http_request_duration_seconds': ('histogram', 'HTTP request latency by route and method'),
+    'sima_http_request_bytes_total': ('counter', 'HTTP request body bytes by route'),
+    'sima_http_response_bytes_total': ('counter', 'HTTP response body bytes by route (streamed bodies excluded)'),
+    'sima_phase_seconds_total': ('counter', 'Time spent in internal phases (walk, parse, serialise, write)'),
+    'sima_phase_calls_total': ('counter', 'Timed sections per internal phase'),
+    'sima_files_processed_total': ('counter', 'Knowledge files processed by operation'),
+    'sima_cache_hits_total': ('counter', 'Cache hits by cache'),
+    'sima_cache_misses_total': ('counter', 'Cache misses by cache'),
+    'sima_cache_entries': ('gauge', 'Entries currently held by cache'),
+    'sima_process_start_time_seconds': ('gauge', 'Start time of the process since the epoch'),
+}
+
+# Shared no-op returned by phase() while phase timing is off
+NULL_PHASE = nullcontext()
+
+START_TIME = time.time()
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _labels(labels: Dict) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _running(pid: int) -> bool:
+    """Whether a process with this pid still exists (gauges of exited workers are dropped)"""
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+def _format(name: str, labels: Labels, value) -> str:
+    if labels:
+        name += '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+    if isinstance(value, float):
+        value = repr(value) if value != float('inf') else '+Inf'
+    return f"{name} {value}"
+
+
+class PhaseTimer:
+    """Context manager adding its elapsed time to one phase"""
+
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics: 'Metrics', name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.add_phase(self.name, time.perf_counter() - self.start)
+
+
+class Metrics:
+    """Process-wide counters and histograms, rendered in Prometheus text format
+
+    Switched like the debug system: Config.METRICS_ENABLED is the master
+    switch and Config.METRICS_SCOPES names the scopes recorded while it is
+    on ('http', 'phases', 'files', 'cache'). Each scope is a plain boolean
+    attribute, so instrumented code pays one attribute check when it is
+    off; phase() then returns a shared no-op context manager. Cache
+    counters are read from the caches at scrape time by collectors.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}      # (name, labels) -> value
+        self._histograms = {}    # (name, labels) -> [bucket counts..., sum, count]
+        self._collectors = []
+        self._flusher = None
+        self.shared_dir = None
+        self.buckets = tuple(Config.METRICS_LATENCY_BUCKETS)
+        self.configure()
+
+    def configure(self, enabled: bool = None, scopes: Iterable[str] = None):
+        """Set the master switch, enabled scopes and latency buckets (defaults from Config)"""
+        buckets = tuple(Config.METRICS_LATENCY_BUCKETS)
+        if buckets != self.buckets:
+            with self._lock:
+                self._histograms.clear()
+                self.buckets = buckets
+        self.enabled = Config.METRICS_ENABLED if enabled is None else enabled
+        scopes = set(Config.METRICS_SCOPES if scopes is None else scopes)
+        for scope in SCOPES:
+            setattr(self, scope, bool(self.enabled) and scope in scopes)
+        self.shared_dir = Path(Config.METRICS_DIR) if self.enabled and Config.METRICS_SHARED else None
+        if self.shared_dir:
+            self.shared_dir.mkdir(parents=True, exist_ok=True)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+                self._flusher.start()
+                atexit.register(self.flush)
+
+    def reset(self):
+        """Drop all recorded values"""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Add to a counter"""
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """Record one histogram observation"""
+        key = (name, _labels(labels))
+        slot = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                slot = i
+                break
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [0] * (len(self.buckets) + 3)
+            hist[slot] += 1
+            hist[-2] += value
+            hist[-1] += 1
+
+    def add_phase(self, name: str, seconds: float, calls: int = 1):
+        """Account time spent in an internal phase"""
+        key = (('phase', name),)
+        with self._lock:
+            seconds_key = ('sima_phase_seconds_total', key)
+            calls_key = ('sima_phase_calls_total', key)
+            self._counters[seconds_key] = self._counters.get(seconds_key, 0.0) + seconds
+            self._counters[calls_key] = self._counters.get(calls_key, 0) + calls
+
+    def phase(self, name: str):
+        """Context manager timing one phase (no-op while phase timing is off)"""
+        if not self.phases:
+            return NULL_PHASE
+        return PhaseTimer(self, name)
+
+    def timed(self, name: str, iterable: Iterable) -> Iterable:
+        """Iterate, accounting time spent producing items (e.g. os.walk) to a phase
+
+        Time the consumer spends between items is not counted. Returns the
+        iterable unchanged while phase timing is off.
+        """
+        if not self.phases:
+            return iterable
+        return self._timed(name, iterable)
+
+    def _timed(self, name: str, iterable: Iterable) -> Iterator:
+        it = iter(iterable)
+        seconds = 0.0
+        steps = 0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+                finally:
+                    seconds += time.perf_counter() - start
+                    steps += 1
+                yield item
+        finally:
+            if steps:
+                self.add_phase(name, seconds)
+
+    def processed(self, operation: str, count: int):
+        """Count knowledge files processed by an operation (export, import, index, ...)"""
+        if self.files and count:
+            self.inc('sima_files_processed_total', count, operation=operation)
+
+    def collector(self, collect: Callable[[], List[Tuple[str, Dict, float]]]):
+        """Register a function returning [(name, labels, value)] sampled at scrape time"""
+        self._collectors.append(collect)
+        return collect
+
+    def snapshot(self) -> Dict:
+        """This process's values (collector samples included) as a JSON-serialisable dict"""
+        with self._lock:
+            counters = [[name, labels, value] for (name, labels), value in self._counters.items()]
+            histograms = [[name, labels, list(hist)] for (name, labels), hist in self._histograms.items()]
+        collected = [[name, _labels(labels), value] for collect in (self._collectors if self.cache else ())
+                     for name, labels, value in collect()]
+        collected.append(['sima_process_start_time_seconds', (), START_TIME])
+        return {'pid': os.getpid(), 'buckets': list(self.buckets), 'counters': counters,
+                'histograms': histograms, 'collected': collected}
+
+    def flush(self):
+        """Write this process's snapshot to Config.METRICS_DIR (no-op unless shared)"""
+        if not self.shared_dir:
+            return
+        snapshot = self.snapshot()
+        path = self.shared_dir / f"metrics-{snapshot['pid']}.json"
+        tmp_path = path.with_name(f'.{path.name}.tmp')
+        tmp_path.write_text(json.dumps(snapshot), encoding='utf-8')
+        os.replace(tmp_path, path)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(Config.METRICS_FLUSH_SECONDS)
+            with suppress(OSError):
+                self.flush()
+
+    def snapshots(self) -> List[Dict]:
+        """Snapshots of every worker (shared) or just this process"""
+        if not self.shared_dir:
+            return [self.snapshot()]
+        self.flush()
+        snapshots = []
+        for path in sorted(self.shared_dir.glob('metrics-*.json')):
+            try:
+                snapshots.append(json.loads(path.read_text(encoding='utf-8')))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def render(self) -> str:
+        """All samples in Prometheus text exposition format
+
+        With Config.METRICS_SHARED, counters and histograms are summed over
+        the snapshots every worker writes to Config.METRICS_DIR (each one at
+        most METRICS_FLUSH_SECONDS old, the scraped worker's current), and
+        gauges are reported per running worker with a pid label.
+        """
+        counters = {}
+        histograms = {}
+        gauges = []
+        for snapshot in self.snapshots():
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            if tuple(snapshot['buckets']) == self.buckets:
+                for name, labels, hist in snapshot['histograms']:
+                    key = (name, tuple(map(tuple, labels)))
+                    histograms[key] = [a + b for a, b in zip(histograms.get(key, [0] * len(hist)), hist)]
+            for name, labels, value in snapshot['collected']:
+                labels = tuple(map(tuple, labels))
+                if DEFINITIONS[name][0] == 'counter':
+                    counters[(name, labels)] = counters.get((name, labels), 0) + value
+                elif not self.shared_dir:
+                    gauges.append((name, labels, value))
+                elif _running(snapshot['pid']):
+                    gauges.append((name, tuple(sorted(labels + (('pid', str(snapshot['pid'])),))), value))
+
+        samples = {}
+        for (name, labels), value in counters.items():
+            samples.setdefault(name, []).append(_format(name, labels, value))
+        for (name, labels), hist in sorted(histograms.items()):
+            lines = samples.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), hist):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                lines.append(_format(f"{name}_bucket", labels + (('le', le),), cumulative))
+            lines.append(_format(f"{name}_sum", labels, float(hist[-2])))
+            lines.append(_format(f"{name}_count", labels, hist[-1]))
+        for name, labels, value in gauges:
+            samples.setdefault(name, []).append(_format(name, labels, value))
+
+        out = []
+        for name in DEFINITIONS:
+            if name not in samples:
+                continue
+            kind, help_text = DEFINITIONS[name]
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(sorted(samples[name]) if kind != 'histogram' else samples[name])
+        return '\n'.join(out) + '\n'
+
+
+METRICS = Metrics()
+
+def clear_snapshots(directory: Path) -> int:
+    """Remove worker snapshots left by an earlier server run (called by the gunicorn master)"""
+    removed = 0
+    for path in Path(directory).glob('metrics-*.json'):
+        path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+def instrument_app(app):
+    """Record latency and body bytes per route for every request (while the http scope is on)
+
+    Routes are labelled by their rule (e.g. /api/ref/<ref_id>), so label
+    cardinality stays bounded by the number of routes.
+    """
+    from flask import g, request
+
+    @app.before_request
+    def _metrics_start():
+        if METRICS.http:
+            g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _metrics_record(response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+        route = request.url_rule.rule if request.url_rule else '<unmatched>'
+        METRICS.observe('sima_http_request_duration_seconds', time.perf_counter() - start,
+                        route=route, method=request.method)
+        METRICS.inc('sima_http_requests_total', route=route, method=request.method,
+                    status=response.status_code)
+        if request.content_length:
+            METRICS.inc('sima_http_request_bytes_total', request.content_length, route=route)
+        if not response.is_streamed and response.content_length:
+            METRICS.inc('sima_http_response_bytes_total', response.content_length, route=route)
+        return response
@@ -0,0 +1,244 @@
+"""
+modules/operations.py
+
+Version: 1.0.3
+Date: 2026-10-18
+Purpose: Long-running operations shared by synchronous routes and background jobs
+Project: SIMA
+
+ADDED: prepare_* functions (validate a request, return run(progress=None) -> result)
+ADDED: OPERATIONS registry of job kinds
+MODIFIED: export_target/export_base moved here from routes.py
+MODIFIED: index operations take "force" and "dry_run"
+MODIFIED: Reserved export names are released when the export finishes or fails
+MODIFIED: Export runs carry cleanup() to release their name if the job never runs
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+import json
+import threading
+
+from werkzeug.utils import secure_filename
+
+from modules.config import Config
+from modules.archive import archive_filename, archive_records
+from modules.delta import manifest_path
+from modules.hierarchy import HierarchyBuilder
+from modules.managers import ExportManager, IndexGenerator
+
+_RESERVED = set()
+_RESERVED_LOCK = threading.Lock()
+
+def flag(value) -> bool:
+    """Boolean from JSON (true) or form fields ('true', '1')"""
+    if isinstance(value, str):
+        return value.lower() in ('true', '1', 'yes', 'on')
+    return bool(value)
+
+def optional_int(value):
+    return None if value is None else int(value)
+
+def export_target(data: Dict) -> Tuple[Path, int, str]:
+    """Output file, archive version and compression for an export request"""
+    archive_version = int(data.get('format', Config.EXPORT_ARCHIVE_VERSION))
+    if archive_version not in (1, 2):
+        raise ValueError('format must be 1 or 2')
+    compression = data.get('compression', Config.EXPORT_COMPRESSION) or ''
+    stem = f"sima_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    # Queued jobs reserve their name before the file exists
+    with _RESERVED_LOCK:
+        output_file = Config.EXPORT_DIR / archive_filename(stem, compression)
+        n = 1
+        # Archives of every compression share the stem's .manifest.json sidecar
+        while manifest_path(output_file) in _RESERVED or manifest_path(output_file).exists():
+            n += 1
+            output_file = Config.EXPORT_DIR / archive_filename(f"{stem}_{n}", compression)
+        _RESERVED.add(manifest_path(output_file))
+    return output_file, archive_version, compression
+
+def export_base(data: Dict) -> Path:
+    """Base archive or .manifest.json in EXPORT_DIR for a delta export (None for a full export)"""
+    if not data.get('base'):
+        return None
+    base = Config.EXPORT_DIR / secure_filename(data['base'])
+    if not base.is_file():
+        raise FileNotFoundError(f"Base not found: {base.name}")
+    return base
+
+def saved_archive(name: str) -> Path:
+    """An archive already in EXPORT_DIR"""
+    json_file = Config.EXPORT_DIR / secure_filename(name or '')
+    if not json_file.is_file():
+        raise FileNotFoundError(f"Archive not found: {json_file.name}")
+    return json_file
+
+def export_result(manifest: Dict, output_file: Path) -> Dict:
+    """Result of a finished (full or delta) export"""
+    return {
+        'status': 'success',
+        'file_count': manifest['file_count'],
+        'delta': 'base_id' in manifest,
+        'deleted_count': len(manifest.get('deleted', [])),
+        'output_file': str(output_file),
+        'filename': output_file.name,
+        'manifest_file': manifest_path(output_file).name
+    }
+
+def release_target(output_file: Path):
+    """Free the name export_target reserved for output_file"""
+    with _RESERVED_LOCK:
+        _RESERVED.discard(manifest_path(output_file))
+
+@contextmanager
+def partial_output(output_file: Path):
+    """Remove a half-written archive if the export fails or is cancelled
+
+    Either way the name export_target reserved is released: the finished
+    export's .manifest.json now keeps it taken, a failed one frees it.
+    """
+    try:
+        yield
+    except BaseException:
+        output_file.unlink(missing_ok=True)
+        raise
+    finally:
+        release_target(output_file)
+
+def update_index(target_dir: Path) -> bool:
+    """Rewrite target_dir's index after an import; False (reported) on error"""
+    try:
+        IndexGenerator.write_index(target_dir, f"{target_dir.name} Index")
+        return True
+    except Exception as e:
+        print(f"Error updating index: {e}")
+        return False
+
+
+def prepare_export(data: Dict) -> Callable:
+    """Export a directory: {path, format, compression, base, workers}"""
+    source_dir = Path(data['path'])
+    base = export_base(data)
+    workers = optional_int(data.get('workers'))
+    output_file, archive_version, compression = export_target(data)
+
+    def run(progress=None) -> Dict:
+        with partial_output(output_file):
+            manifest = ExportManager.export_to_json(source_dir, output_file, workers, archive_version,
+                                                    compression, base=base, progress=progress)
+        return export_result(manifest, output_file)
+    run.cleanup = lambda: release_target(output_file)
+    return run
+
+def prepare_export_selected(data: Dict) -> Callable:
+    """Export listed files: {paths[], format, compression, base, workers}"""
+    paths = [Path(p) for p in data['paths']]
+    base = export_base(data)
+    workers = optional_int(data.get('workers'))
+    output_file, archive_version, compression = export_target(data)
+
+    def run(progress=None) -> Dict:
+        if progress is not None:
+            progress.start(len(paths))
+        with partial_output(output_file):
+            manifest = ExportManager.export_files(((p, str(p)) for p in paths), output_file, workers,
+                                                  archive_version, compression, base=base, progress=progress)
+        return export_result(manifest, output_file)
+    run.cleanup = lambda: release_target(output_file)
+    return run
+
+def prepare_import_to_target(data: Dict) -> Callable:
+    """Import into target: {target, update_indexes} and an archive
+
+    The archive is either parsed in 'data' or the 'filename' of an archive
+    in EXPORT_DIR, optionally with 'paths' (a list, or a JSON list string).
+    """
+    target_dir = Path(data['target'])
+    update_indexes = flag(data.get('update_indexes', False))
+    archive = data.get('data')
+    json_file = None if archive is not None else saved_archive(data.get('filename'))
+    paths = data.get('paths')
+    if isinstance(paths, str):
+        paths = json.loads(paths) if paths else None
+
+    def run(progress=None) -> Dict:
+        if archive is not None:
+            if progress is not None:
+                progress.start(len(archive.get('files', [])))
+            imported = ExportManager.import_records(archive_records(archive), target_dir, flatten=True,
+                                                    progress=progress)
+        else:
+            imported = ExportManager.import_from_json(json_file, target_dir, flatten=True, paths=paths,
+                                                      progress=progress)
+        return {
+            'status': 'success',
+            'imported_count': len(imported),
+            'files': imported,
+            'target': str(target_dir),
+            'indexes_updated': bool(update_indexes and imported) and update_index(target_dir)
+        }
+    return run
+
+def prepare_import_chain(data: Dict) -> Callable:
+    """Apply archives in EXPORT_DIR (base first, then deltas): {archives[], target, update_indexes}"""
+    target_dir = Path(data['target'])
+    names = data.get('archives', [])
+    if not names:
+        raise ValueError('archives must list at least one archive')
+    archives = [Config.EXPORT_DIR / secure_filename(name) for name in names]
+    missing = [a.name for a in archives if not a.is_file()]
+    if missing:
+        raise FileNotFoundError(f"Archive not found: {', '.join(missing)}")
+
+    def run(progress=None) -> Dict:
+        result = ExportManager.import_chain(archives, target_dir, progress=progress)
+        changed = result['imported'] or result['deleted']
+        return {
+            'status': 'success',
+            'imported_count': len(result['imported']),
+            'deleted_count': len(result['deleted']),
+            'files': result['imported'],
+            'deleted': result['deleted'],
+            'target': str(target_dir),
+            'indexes_updated': bool(flag(data.get('update_indexes')) and changed) and update_index(target_dir)
+        }
+    return run
+
+def prepare_index(data: Dict) -> Callable:
+    """Generate one index {path, title}, or rebuild the hierarchy under path with "all": true
+
+    Hand-written navigation files are replaced only with "force": true;
+    "dry_run": true (with "all") lists the files a rebuild would change.
+    """
+    directory = Path(data['path'])
+    title = data.get('title', 'Index')
+    workers = optional_int(data.get('workers'))
+    rebuild_all = flag(data.get('all', False))
+    force = flag(data.get('force', False))
+    dry_run = flag(data.get('dry_run', False))
+    if dry_run and not rebuild_all:
+        raise ValueError('dry_run needs "all": true')
+
+    def run(progress=None) -> Dict:
+        if rebuild_all:
+            return {'status': 'success', **HierarchyBuilder.rebuild(directory, workers, progress, force, dry_run)}
+        output_file, index_content = IndexGenerator.write_index(directory, title, progress, force)
+        return {
+            'status': 'success',
+            'output_file': str(output_file),
+            'entry_count': index_content.count('\n- ')
+        }
+    return run
+
+
+# Job kind -> prepare(request data); prepare raises FileNotFoundError (404) or ValueError (400).
+# A run that holds resources until it runs has run.cleanup(), called if it never does.
+OPERATIONS = {
+    'export': prepare_export,
+    'export-selected': prepare_export_selected,
+    'import-to-target': prepare_import_to_target,
+    'import-chain': prepare_import_chain,
+    'index': prepare_index,
+}
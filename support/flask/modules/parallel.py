@@ -0,0 +1,105 @@
+"""
+modules/parallel.py
+
+Version: 1.2.1
+Date: 2026-10-18
+Purpose: Process-pool helpers for parallel export
+Project: SIMA
+
+ADDED: resolve_workers, chunked, ordered_map
+ADDED: export_chunk worker (parse + to_json + encode in the worker)
+MODIFIED: export_chunk can produce compact (v2) records
+ADDED: unordered_map (results as they complete)
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Tuple
+import os
+
+from modules.archive_writer import ArchiveWriter
+from modules.knowledge import KnowledgeFile
+
+def resolve_workers(workers: int) -> int:
+    """Worker count: 0 or less means one per CPU"""
+    if workers is None or workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    """Split an iterable into lists of at most `size` items"""
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def ordered_map(executor: Executor, fn: Callable, chunks: Iterable, window: int) -> Iterator:
+    """Like executor.map, but submits lazily with at most `window` chunks in flight
+
+    Results come back in submission order, so output stays deterministic while
+    memory is bounded by the window rather than the whole input.
+    """
+    pending = deque()
+    try:
+        for chunk in chunks:
+            pending.append(executor.submit(fn, chunk))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+def unordered_map(executor: Executor, fn: Callable, chunks: Iterable, window: int) -> Iterator[Tuple]:
+    """(chunk, fn(chunk)) as each finishes, with at most `window` chunks in flight
+
+    For streaming results to a client as soon as they are ready; use
+    ordered_map when output order matters.
+    """
+    pending = {}
+    chunks = iter(chunks)
+    try:
+        while True:
+            for chunk in islice(chunks, window - len(pending)):
+                pending[executor.submit(fn, chunk)] = chunk
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+def export_chunk(chunk: List[Tuple[str, str]], archive_version: int = 1) -> List[Tuple]:
+    """Worker: parse and serialize (file_path, archive_path) pairs
+
+    Returns (file_path, archive_path, payload, cache_entry, error) per file, where
+    cache_entry is (key, signature, state) for the parent's PARSE_CACHE; the
+    state's digest is the sha1 of the bytes the payload was built from.
+    payload is the encoded v1 record, or for archive_version 2 the compact
+    record dict (strings are interned in the parent, in archive order).
+    """
+    results = []
+    for file_path, archive_path in chunk:
+        try:
+            path = Path(file_path)
+            st = path.stat()
+            kf = KnowledgeFile(path)
+            if archive_version == 2:
+                payload = kf.to_compact()
+                payload['path'] = archive_path
+            else:
+                record = kf.to_json()
+                record['path'] = archive_path
+                payload = ArchiveWriter.encode_record(record)
+            cache_entry = (os.path.abspath(path), (st.st_mtime_ns, st.st_size), kf.state())
+            results.append((file_path, archive_path, payload, cache_entry, None))
+        except Exception as e:
+            results.append((file_path, archive_path, None, None, str(e)))
+    return results
@@ -0,0 +1,103 @@
+"""
+modules/progress.py
+
+Version: 1.1.0
+Date: 2026-10-18
+Purpose: Progress reporting and cooperative cancellation for long operations
+Project: SIMA
+
+ADDED: Progress (files done/total, bytes written, current file, recent errors)
+ADDED: Cancelled (raised at the next file boundary after cancel())
+ADDED: wait()/notify() for streaming readers
+"""
+
+from collections import deque
+from typing import Callable, Dict
+import threading
+import time
+
+# Recent per-file errors kept for status responses
+ERROR_LOG_SIZE = 50
+
+
+class Cancelled(Exception):
+    """Raised inside an operation whose progress was cancelled"""
+
+
+class Progress:
+    """Running counts of one export, import or index operation
+
+    The operation calls start(total) once it knows how many items it will
+    handle, advance() once per item (with the error if it failed) and
+    keeps bytes_written current. Any other thread may read snapshot() or
+    call cancel(); the next advance() then raises Cancelled, so the
+    operation stops at a file boundary and its normal cleanup runs
+    (import transactions roll back). on_change, if set, is called after
+    every update from the operation's thread; wait() blocks readers (e.g.
+    an event stream) until the next update.
+    """
+
+    def __init__(self, on_change: Callable[['Progress'], None] = None):
+        self.total = None
+        self.done = 0
+        self.bytes_written = 0
+        self.current = ''
+        self.errors = 0
+        self.recent_errors = deque(maxlen=ERROR_LOG_SIZE)
+        self.started = time.time()
+        self.cancelled = False
+        self.on_change = on_change
+        self.version = 0
+        self._cond = threading.Condition()
+
+    def start(self, total: int = None):
+        """Set the expected item count (None if unknown)"""
+        self.total = total
+        self.changed()
+
+    def advance(self, item: str = '', error=None, count: int = 1):
+        """Count `count` items finished, the last being `item` (failed if `error`)"""
+        self.done += count
+        self.current = str(item)
+        if error is not None:
+            self.errors += 1
+            self.recent_errors.append({'path': str(item), 'error': str(error)})
+        self.changed()
+        if self.cancelled:
+            raise Cancelled(f"Cancelled after {self.done} items")
+
+    def changed(self):
+        if self.on_change is not None:
+            self.on_change(self)
+        self.notify()
+
+    def notify(self):
+        """Wake threads blocked in wait()"""
+        with self._cond:
+            self.version += 1
+            self._cond.notify_all()
+
+    def wait(self, seen: int, timeout: float) -> int:
+        """Block until the version differs from `seen` (or timeout); returns the current version"""
+        with self._cond:
+            if self.version == seen:
+                self._cond.wait(timeout)
+            return self.version
+
+    def cancel(self):
+        """Ask the operation to stop at its next advance()"""
+        self.cancelled = True
+
+    def snapshot(self) -> Dict:
+        """JSON-ready counts, elapsed time and throughput"""
+        elapsed = time.time() - self.started
+        return {
+            'done': self.done,
+            'total': self.total,
+            'bytes_written': self.bytes_written,
+            'current': self.current,
+            'errors': self.errors,
+            'recent_errors': list(self.recent_errors),
+            'elapsed': round(elapsed, 3),
+            'items_per_sec': round(self.done / elapsed, 1) if elapsed > 0 else 0.0
+        }
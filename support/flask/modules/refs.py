@@ -0,0 +1,244 @@
+"""
+modules/refs.py
+
+Version: 1.1.0
+Date: 2026-10-18
+Purpose: REF-ID resolution and Related-graph traversal
+Project: SIMA
+
+ADDED: RefIndex (REF-ID -> path map, forward/reverse Related adjacency, closure bundles)
+ADDED: get_ref_index registry (one index per root)
+MODIFIED: No tree walk on queries while a watcher feeds update_file()
+"""
+
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional
+import os
+import re
+import threading
+import time
+
+from modules.cache import PARSE_CACHE
+from modules.config import Config
+
+# DEC-17, AP-28, LESS-01, ARCH-01, TMPL-02 ...
+REF_ID_RE = re.compile(r'\b([A-Z]{2,}(?:-[A-Z]+)*-\d+)\b')
+
+def file_ref_id(kf) -> str:
+    """REF-ID from the header field, else a leading ID in the file name (AP-28-Relative-Imports.md)"""
+    match = REF_ID_RE.match(kf.metadata.get('ref_id', '')) or REF_ID_RE.match(kf.path.stem)
+    return match.group(1) if match else ''
+
+def related_ids(related: List[str]) -> List[str]:
+    """REF-IDs mentioned in a Related footer, in order, without duplicates"""
+    ids = []
+    for item in related:
+        ids.extend(REF_ID_RE.findall(item))
+    return list(dict.fromkeys(ids))
+
+
+class RefIndex:
+    """REF-ID map and Related graph over the markdown files under a root
+
+    refresh() re-stats the tree and re-reads only files whose (mtime_ns, size)
+    changed, so lookups stay O(1) dict accesses. A REF-ID used by several
+    files resolves to the first path in sorted order; the others are
+    reported as duplicates. Safe for use from multiple threads.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.files = {}      # abspath -> {'signature', 'ref_id', 'related', 'title', 'category'}
+        self.paths = {}      # ref_id -> set of abspaths
+        self.reverse = {}    # ref_id -> set of ref_ids whose Related lists it
+        self.refreshed_at = 0.0
+        self.watched = False   # set by modules/watcher.py: changes arrive via update_file()
+        self._lock = threading.RLock()
+
+    def refresh(self, force: bool = False) -> Dict:
+        """Re-read changed files, drop deleted ones (throttled; skipped while watched unless forced)"""
+        stats = {'added': 0, 'updated': 0, 'removed': 0}
+        with self._lock:
+            if not force and (self.watched or time.monotonic() - self.refreshed_at < Config.REF_REFRESH_SECONDS):
+                return stats
+            seen = set()
+            for dirpath, dirnames, filenames in os.walk(self.root):
+                dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+                for name in filenames:
+                    if not name.endswith('.md'):
+                        continue
+                    path = os.path.abspath(os.path.join(dirpath, name))
+                    seen.add(path)
+                    try:
+                        kind = self._update(path, os.stat(path))
+                    except (OSError, UnicodeDecodeError) as e:
+                        print(f"Error reading {path}: {e}")
+                        continue
+                    if kind:
+                        stats[kind] += 1
+            for path in set(self.files) - seen:
+                self.remove(path)
+                stats['removed'] += 1
+            self.refreshed_at = time.monotonic()
+        return stats
+
+    def update_file(self, path: Path) -> Optional[str]:
+        """Re-read one file (removes it if it no longer exists)"""
+        path = os.path.abspath(path)
+        with self._lock:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                self.remove(path)
+                return 'removed'
+            return self._update(path, st)
+
+    def _update(self, path: str, st: os.stat_result) -> Optional[str]:
+        signature = (st.st_mtime_ns, st.st_size)
+        old = self.files.get(path)
+        if old is not None and old['signature'] == signature:
+            return None
+        if old is not None:
+            self.remove(path)
+
+        kf = PARSE_CACHE.get(Path(path), st)
+        ref_id = file_ref_id(kf)
+        info = {
+            'signature': signature,
+            'ref_id': ref_id,
+            'related': related_ids(kf.related),
+            'title': kf.title,
+            'category': kf.metadata.get('category', '')
+        }
+        self.files[path] = info
+        if ref_id:
+            self.paths.setdefault(ref_id, set()).add(path)
+            for target in info['related']:
+                self.reverse.setdefault(target, set()).add(ref_id)
+        return 'added' if old is None else 'updated'
+
+    def remove_tree(self, path: Path):
+        """Drop every file under a directory that was deleted or moved away"""
+        prefix = os.path.abspath(path) + os.sep
+        with self._lock:
+            for other in [p for p in self.files if p.startswith(prefix)]:
+                self.remove(other)
+
+    def remove(self, path: Path):
+        """Drop a file from the map and graph"""
+        with self._lock:
+            info = self.files.pop(os.path.abspath(path), None)
+            if info is None or not info['ref_id']:
+                return
+            ref_id = info['ref_id']
+            self.paths[ref_id].discard(os.path.abspath(path))
+            if not self.paths[ref_id]:
+                del self.paths[ref_id]
+            # Another file may still carry this REF-ID and list the same targets
+            still_listed = set()
+            for other in self.paths.get(ref_id, ()):
+                still_listed.update(self.files[other]['related'])
+            for target in info['related']:
+                if target not in still_listed and target in self.reverse:
+                    self.reverse[target].discard(ref_id)
+                    if not self.reverse[target]:
+                        del self.reverse[target]
+
+    def _primary(self, ref_id: str) -> Optional[str]:
+        paths = self.paths.get(ref_id)
+        return min(paths) if paths else None
+
+    def forward(self, ref_id: str) -> List[str]:
+        """REF-IDs listed in Related by the file(s) carrying ref_id"""
+        related = []
+        for path in sorted(self.paths.get(ref_id, ())):
+            related.extend(self.files[path]['related'])
+        return list(dict.fromkeys(related))
+
+    def resolve(self, ref_id: str) -> Optional[Dict]:
+        """Entry for a REF-ID, or None if no file carries it"""
+        self.refresh()
+        with self._lock:
+            return self._entry(ref_id.upper())
+
+    def _entry(self, ref_id: str) -> Optional[Dict]:
+        path = self._primary(ref_id)
+        if path is None:
+            return None
+        info = self.files[path]
+        return {
+            'ref_id': ref_id,
+            'path': path,
+            'title': info['title'],
+            'category': info['category'],
+            'related': self.forward(ref_id),
+            'related_by': sorted(self.reverse.get(ref_id, ())),
+            'duplicates': sorted(self.paths[ref_id] - {path})
+        }
+
+    def closure(self, ref_id: str, depth: int = 1, reverse: bool = False,
+                content: bool = True) -> Optional[Dict]:
+        """Breadth-first Related closure up to `depth` hops, as one bundle
+
+        With reverse=True, files whose Related lists an entry are followed
+        too. Each entry carries its hop distance and (optionally) its
+        markdown; REF-IDs that no file carries are listed under "missing".
+        """
+        self.refresh()
+        ref_id = ref_id.upper()
+        with self._lock:
+            if ref_id not in self.paths:
+                return None
+            distance = {ref_id: 0}
+            missing = []
+            queue = deque([ref_id])
+            while queue:
+                current = queue.popleft()
+                if distance[current] >= depth:
+                    continue
+                neighbours = self.forward(current)
+                if reverse:
+                    neighbours += sorted(self.reverse.get(current, ()))
+                for neighbour in neighbours:
+                    if neighbour in distance:
+                        continue
+                    distance[neighbour] = distance[current] + 1
+                    if neighbour in self.paths:
+                        queue.append(neighbour)
+                    else:
+                        missing.append(neighbour)
+            entries = []
+            for node, hops in distance.items():
+                entry = self._entry(node)
+                if entry is not None:
+                    entry['depth'] = hops
+                    entries.append(entry)
+
+        if content:
+            for entry in entries:
+                try:
+                    entry['content'] = Path(entry['path']).read_text(encoding='utf-8')
+                except (OSError, UnicodeDecodeError) as e:
+                    entry['content'] = None
+                    entry['error'] = str(e)
+        return {'root': ref_id, 'depth': depth, 'entries': entries, 'missing': missing}
+
+    def stats(self) -> Dict:
+        """Map and graph size"""
+        with self._lock:
+            edges = sum(len(info['related']) for info in self.files.values() if info['ref_id'])
+            return {'root': str(self.root), 'files': len(self.files), 'ref_ids': len(self.paths), 'edges': edges}
+
+
+_INDEXES = {}
+_INDEXES_LOCK = threading.Lock()
+
+def get_ref_index(root: Path) -> RefIndex:
+    """Shared RefIndex for a root (built on first use)"""
+    key = os.path.abspath(root)
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(key)
+        if index is None:
+            index = _INDEXES[key] = RefIndex(Path(key))
+    return index
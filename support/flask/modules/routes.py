@@ -1,198 +1,251 @@
 """
 modules/routes.py
 
-Version: 1.0.0
-Date: 2025-11-29
+Version: 1.23.3
+Date: 2026-10-18
 Purpose: Flask routes for SIMA Manager
 Project: SIMA
 
 ADDED: All Flask routes
 ADDED: HTML template
+MODIFIED: Export-selected and analyze use shared PARSE_CACHE
+MODIFIED: /api/tree accepts depth, offset, limit and metadata
+MODIFIED: /api/export-selected streams through ExportManager.export_files
+MODIFIED: Imports read uploaded archives incrementally from disk
+MODIFIED: Export endpoints accept optional worker count
+MODIFIED: Failed imports roll back and report an error
+MODIFIED: Index writes go through incremental IndexGenerator.write_index
+MODIFIED: /api/index rebuilds the whole hierarchy with "all": true
+ADDED: /api/search (BM25 full-text search)
+ADDED: /api/ref/<id> and /api/ref/<id>/closure (REF-ID graph)
+ADDED: /api/watcher status
+MODIFIED: Exports accept format (1/2) and compression; imports read v2
+ADDED: /api/archive/preview; selective import of saved archives
+ADDED: Delta exports ("base") and /api/import-chain
+ADDED: /api/validate (all files, or only git changes)
+ADDED: /metrics (Prometheus) and request instrumentation
+ADDED: Background jobs ("async" on export/import/index, /api/jobs); operations moved to modules/operations.py
+ADDED: /api/jobs/<id>/events (Server-Sent Events progress stream)
+ADDED: /api/query (SQLite catalog: filters, sort, pages, facets)
+ADDED: ETag/Last-Modified and 304 for tree, analyze and query (GET); gzip JSON; precompressed dashboard; Range downloads
+MODIFIED: Job event streams follow jobs run by other worker processes
+MODIFIED: /api/analyze summary shared with the library API (modules/kb.py)
+ADDED: /api/analyze-batch (worker pool, streamed NDJSON)
+MODIFIED: /api/validate answers 400 for a `since` that names no commit
+MODIFIED: /api/index answers 409 instead of replacing a hand-written index
+MODIFIED: Archive and job routes moved to modules/routes_archive.py and modules/routes_jobs.py
 """
 
-from flask import request, jsonify, render_template_string, send_file
+from flask import Response, request, jsonify, send_from_directory, stream_with_context
 from pathlib import Path
-from datetime import datetime
 import json
+import subprocess
+import time
 
 from modules.config import Config
-from modules.knowledge import KnowledgeFile, JSONToMD
-from modules.managers import ExportManager, IndexGenerator, FileBrowser
+from modules.browser import FileBrowser
+from modules.cache import PARSE_CACHE
+from modules.search import get_search_index
+from modules.refs import get_ref_index
+from modules.catalog import get_catalog
+from modules.catalog_schema import FACETS, LIST_FILTERS, VALUE_FILTERS
+from modules import watcher
+from modules.validation import Validator
+from modules.metrics import CONTENT_TYPE, METRICS, instrument_app
+from modules.operations import flag, optional_int
+from modules.http_cache import StaticPage, cached_json, compress_app, etag_for
+from modules.kb import KnowledgeBase, analysis
+from modules.routes_archive import register_archive_routes
+from modules.routes_jobs import register_job_routes
 from modules.templates import HTML_TEMPLATE
 
 def register_routes(app):
-    """Register all Flask routes"""
+    """Register all Flask routes (archive and job routes in their own modules)"""
+    
+    # ADDED: Request latency/byte metrics (no-op unless Config.METRICS_ENABLED)
+    instrument_app(app)
+    # ADDED: gzip JSON responses for clients that accept it
+    compress_app(app)
+    
+    # MODIFIED: Dashboard rendered and compressed once
+    dashboard = StaticPage(app.jinja_env.from_string(HTML_TEMPLATE).render())
+    
+    register_archive_routes(app)
+    register_job_routes(app)
     
     @app.route('/')
     def index():
         """Main dashboard"""
-        return render_template_string(HTML_TEMPLATE)
+        return dashboard.response()
     
-    @app.route('/api/tree', methods=['POST'])
+    @app.route('/api/tree', methods=['GET', 'POST'])
     def api_tree():
-        """Get directory tree"""
-        data = request.json
+        """Get directory tree (one page, depth-limited); GET answers 304 while nothing listed changed"""
+        data = request.json if request.method == 'POST' else request.args
         root_path = Path(data['path'])
         
         if not root_path.exists():
             return jsonify({'error': 'Path does not exist'}), 404
         
-        tree = FileBrowser.get_tree(root_path)
-        return jsonify(tree)
+        try:
+            depth = int(data.get('depth', Config.TREE_DEFAULT_DEPTH))
+            offset = max(0, int(data.get('offset', 0)))
+            limit = max(1, int(data.get('limit', Config.TREE_PAGE_SIZE)))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'depth, offset and limit must be integers'}), 400
+        
+        metadata = flag(data.get('metadata', False))
+        stamps = []
+        tree = FileBrowser.get_tree(root_path, depth=depth, offset=offset, limit=limit,
+                                    metadata=metadata, stamps=stamps)
+        etag = etag_for(str(root_path), depth, offset, limit, metadata, stamps)
+        return cached_json(etag, max(s[1] for s in stamps) if stamps else None, lambda: tree)
     
-    @app.route('/api/export-selected', methods=['POST'])
-    def api_export_selected():
-        """Export selected files to JSON"""
-        data = request.json
-        paths = [Path(p) for p in data['paths']]
-        
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_file = Config.EXPORT_DIR / f"sima_export_{timestamp}.json"
-        
-        export_data = {
-            "manifest": {
-                "version": "1.0.0",
-                "sima_version": "4.2.2",
-                "created": datetime.now().isoformat(),
-                "file_count": 0
-            },
-            "files": []
-        }
-        
-        for file_path in paths:
-            try:
-                kf = KnowledgeFile(file_path)
-                json_data = kf.to_json()
-                json_data['path'] = str(file_path)
-                export_data['files'].append(json_data)
-            except Exception as e:
-                print(f"Error exporting {file_path}: {e}")
-        
-        export_data['manifest']['file_count'] = len(export_data['files'])
-        
-        output_file.write_text(json.dumps(export_data, indent=2), encoding='utf-8')
+    @app.route('/api/search')
+    def api_search():
+        """Full-text search: ?q=...&path=<root>&limit=N"""
+        query = request.args.get('q', '').strip()
+        root = Path(request.args.get('path', str(Config.SIMA_ROOT)))
+        if not query:
+            return jsonify({'error': 'q is required'}), 400
+        if not root.is_dir():
+            return jsonify({'error': 'Path does not exist'}), 404
+        try:
+            limit = max(1, int(request.args.get('limit', Config.SEARCH_DEFAULT_LIMIT)))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
         
-        return jsonify({
-            'status': 'success',
-            'file_count': export_data['manifest']['file_count'],
-            'output_file': str(output_file),
-            'filename': output_file.name
-        })
+        return jsonify(get_search_index(root).search(query, limit))
     
-    @app.route('/api/import-to-target', methods=['POST'])
-    def api_import_to_target():
-        """Import JSON data to target directory"""
-        data = request.json
-        import_data = data['data']
-        target_dir = Path(data['target'])
-        update_indexes = data.get('update_indexes', False)
-        
-        imported = []
-        for file_data in import_data['files']:
-            try:
-                md_content = JSONToMD.convert(file_data)
-                
-                # Use filename from path
-                filename = Path(file_data['path']).name
-                target_path = target_dir / filename
-                target_path.parent.mkdir(parents=True, exist_ok=True)
-                target_path.write_text(md_content, encoding='utf-8')
-                imported.append(str(target_path))
-            except Exception as e:
-                print(f"Error importing {file_data.get('path', 'unknown')}: {e}")
-        
-        # Update indexes if requested
-        indexes_updated = False
-        if update_indexes and imported:
-            try:
-                index_content = IndexGenerator.generate(target_dir, f"{target_dir.name} Index")
-                index_file = target_dir / f"{target_dir.name}-Index.md"
-                index_file.write_text(index_content, encoding='utf-8')
-                indexes_updated = True
-            except Exception as e:
-                print(f"Error updating index: {e}")
-        
-        return jsonify({
-            'status': 'success',
-            'imported_count': len(imported),
-            'files': imported,
-            'target': str(target_dir),
-            'indexes_updated': indexes_updated
-        })
+    @app.route('/api/query')
+    def api_query():
+        """Catalog query: ?<filter>=...&sort=[-]col&limit=N&offset=N&facets=a,b&path=<root>&refresh=1"""
+        args = request.args
+        root = Path(args.get('path', str(Config.SIMA_ROOT)))
+        if not root.is_dir():
+            return jsonify({'error': 'Path does not exist'}), 404
+        filters = {name: args.getlist(name) for name in (*LIST_FILTERS, *VALUE_FILTERS) if name in args}
+        facets = args.get('facets')
+        catalog = get_catalog(root)
+        try:
+            refreshed = catalog.refresh(force=flag(args.get('refresh', False)))
+            changed_at, data_version = catalog.validator()
+            etag = etag_for(catalog.key, changed_at, data_version, sorted(args.items(multi=True)))
+            return cached_json(etag, int(changed_at * 1e9), lambda: dict(
+                catalog.query(filters, args.get('sort', 'path'), args.get('limit'), args.get('offset', 0),
+                              facets.split(',') if facets else FACETS), refreshed=refreshed))
+        except ValueError as e:
+            return jsonify({'error': f"Invalid query: {e}"}), 400
     
-    @app.route('/api/export', methods=['POST'])
-    def api_export():
-        """Export directory to JSON"""
-        data = request.json
-        source_dir = Path(data['path'])
-        
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_file = Config.EXPORT_DIR / f"sima_export_{timestamp}.json"
-        
-        manifest = ExportManager.export_to_json(source_dir, output_file)
+    @app.route('/api/ref/<ref_id>')
+    def api_ref(ref_id):
+        """Resolve a REF-ID: ?path=<root>"""
+        root = Path(request.args.get('path', str(Config.SIMA_ROOT)))
+        if not root.is_dir():
+            return jsonify({'error': 'Path does not exist'}), 404
         
-        return jsonify({
-            'status': 'success',
-            'file_count': manifest['file_count'],
-            'output_file': str(output_file),
-            'filename': output_file.name
-        })
+        entry = get_ref_index(root).resolve(ref_id)
+        if entry is None:
+            return jsonify({'error': f'Unknown REF-ID: {ref_id}'}), 404
+        return jsonify(entry)
     
-    @app.route('/api/import', methods=['POST'])
-    def api_import():
-        """Import JSON file"""
-        file = request.files['file']
-        target = Path(request.form['target'])
-        
-        json_file = Config.EXPORT_DIR / file.filename
-        file.save(json_file)
-        
-        imported = ExportManager.import_from_json(json_file, target)
-        
-        return jsonify({
-            'status': 'success',
-            'imported_count': len(imported),
-            'files': imported
-        })
+    @app.route('/api/ref/<ref_id>/closure')
+    def api_ref_closure(ref_id):
+        """Transitive Related bundle: ?depth=N&reverse=1&content=0&path=<root>"""
+        root = Path(request.args.get('path', str(Config.SIMA_ROOT)))
+        if not root.is_dir():
+            return jsonify({'error': 'Path does not exist'}), 404
+        try:
+            depth = int(request.args.get('depth', Config.REF_CLOSURE_DEPTH))
+        except ValueError:
+            return jsonify({'error': 'depth must be an integer'}), 400
+        depth = max(0, min(depth, Config.REF_CLOSURE_MAX_DEPTH))
+        
+        bundle = get_ref_index(root).closure(
+            ref_id, depth,
+            reverse=request.args.get('reverse', '0') in ('1', 'true'),
+            content=request.args.get('content', '1') not in ('0', 'false'))
+        if bundle is None:
+            return jsonify({'error': f'Unknown REF-ID: {ref_id}'}), 404
+        return jsonify(bundle)
     
-    @app.route('/api/index', methods=['POST'])
-    def api_index():
-        """Generate index"""
-        data = request.json
-        directory = Path(data['path'])
-        title = data.get('title', 'Index')
-        
-        index_content = IndexGenerator.generate(directory, title)
-        output_file = directory / f"{directory.name}-Index.md"
-        output_file.write_text(index_content, encoding='utf-8')
-        
-        entry_count = index_content.count('\n- ')
-        
-        return jsonify({
-            'status': 'success',
-            'output_file': str(output_file),
-            'entry_count': entry_count
-        })
+    @app.route('/api/watcher')
+    def api_watcher():
+        """Background watcher status"""
+        if watcher.WATCHER is None:
+            return jsonify({'running': False})
+        return jsonify(watcher.WATCHER.stats())
     
-    @app.route('/api/analyze', methods=['POST'])
+    @app.route('/api/analyze', methods=['GET', 'POST'])
     def api_analyze():
-        """Analyze file"""
-        data = request.json
+        """Analyze file (GET ?path=... answers 304 while the file is unchanged)"""
+        data = request.json if request.method == 'POST' else request.args
         file_path = Path(data['path'])
+        try:
+            st = file_path.stat()
+        except FileNotFoundError:
+            return jsonify({'error': 'Path does not exist'}), 404
         
-        kf = KnowledgeFile(file_path)
-        
-        return jsonify({
-            'path': str(file_path),
-            'ref_id': kf.metadata.get('ref_id', ''),
-            'languages': sorted(list(kf.languages)),
-            'line_count': len(kf.content.split('\n')),
-            'exceeds_limit': len(kf.content.split('\n')) > Config.MAX_FILE_LINES,
-            'metadata': kf.metadata
-        })
+        etag = etag_for(str(file_path), st.st_mtime_ns, st.st_size, Config.MAX_FILE_LINES)
+        return cached_json(etag, st.st_mtime_ns, lambda: analysis(file_path, PARSE_CACHE.get(file_path, st)))
+    
+    @app.route('/api/analyze-batch', methods=['POST'])
+    def api_analyze_batch():
+        """Analyze {paths[]} or {path, glob}: NDJSON lines as files finish, then a {"done": true} summary"""
+        data = request.json
+        if data.get('path'):
+            root = Path(data['path'])
+            if not root.is_dir():
+                return jsonify({'error': 'Path is not a directory'}), 404
+            names = [root]
+        elif isinstance(data.get('paths'), list):
+            names = data['paths']
+        else:
+            return jsonify({'error': 'paths (a list) or path (a directory) is required'}), 400
+        
+        try:
+            kb = KnowledgeBase(jobs=optional_int(data.get('workers', Config.ANALYZE_WORKERS)))
+            files = kb.files(names, data.get('glob'))
+        except (TypeError, ValueError, NotImplementedError) as e:
+            return jsonify({'error': f"Invalid request: {e}"}), 400
+        if len(files) > Config.ANALYZE_BATCH_MAX_FILES:
+            return jsonify({'error': f"{len(files)} files match (limit {Config.ANALYZE_BATCH_MAX_FILES})"}), 400
+        
+        def lines():
+            started = time.monotonic()
+            errors = 0
+            for result in kb.analyze_files(files, ordered=flag(data.get('ordered', False))):
+                errors += 'error' in result
+                yield json.dumps(result) + '\n'
+            yield json.dumps({'done': True, 'files': len(files), 'errors': errors,
+                              'elapsed': round(time.monotonic() - started, 3)}) + '\n'
+        return Response(stream_with_context(lines()), mimetype='application/x-ndjson',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    
+    @app.route('/api/validate', methods=['POST'])
+    def api_validate():
+        """Check files under path (only changed ones when a git change source is enabled, unless "all")"""
+        data = request.json
+        root = Path(data['path'])
+        if not root.is_dir():
+            return jsonify({'error': 'Path is not a directory'}), 404
+        
+        try:
+            result = Validator.validate(root, changed_only=not data.get('all', False), since=data.get('since'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        except subprocess.CalledProcessError as e:
+            return jsonify({'error': f"git failed: {e.stderr.decode('utf-8', 'replace').strip()}"}), 400
+        return jsonify({'status': 'success' if not result['failed'] else 'failed', **result})
+    
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus text exposition (404 while metrics are disabled)"""
+        if not METRICS.enabled:
+            return jsonify({'error': 'Metrics are disabled (Config.METRICS_ENABLED)'}), 404
+        return Response(METRICS.render(), content_type=CONTENT_TYPE)
     
     @app.route('/download/<filename>')
     def download(filename):
-        """Download exported file"""
-        file_path = Config.EXPORT_DIR / filename
-        return send_file(file_path, as_attachment=True)
+        """Download exported file (ETag/Last-Modified, 304 and Range requests via send_file)"""
+        return send_from_directory(Config.EXPORT_DIR.resolve(), filename, as_attachment=True, conditional=True)
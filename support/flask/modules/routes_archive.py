@@ -0,0 +1,159 @@
+"""
+modules/routes_archive.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Flask routes for exports, imports, archives and index writes
+Project: SIMA
+
+ADDED: Export, import, archive preview, import-chain and index routes (moved from modules/routes.py)
+"""
+
+from flask import request, jsonify
+from werkzeug.utils import secure_filename
+from pathlib import Path
+
+from modules.config import Config
+from modules.managers import ExportManager
+from modules.operations import (prepare_export, prepare_export_selected, prepare_import_chain,
+                                prepare_import_to_target, prepare_index, saved_archive)
+from modules.routes_jobs import prepared, submit_job
+
+def save_upload(file) -> Path:
+    """Save an uploaded archive into EXPORT_DIR (streamed to disk in chunks)"""
+    json_file = Config.EXPORT_DIR / secure_filename(file.filename or 'upload.json')
+    file.save(json_file)
+    return json_file
+
+def archive_source(form) -> Path:
+    """Archive for a multipart request: a new upload ('file') or one already in EXPORT_DIR ('filename')"""
+    if 'file' in request.files:
+        return save_upload(request.files['file'])
+    return saved_archive(form.get('filename', ''))
+
+def import_failed(error: Exception):
+    """Response for an import that was rolled back"""
+    print(f"Import rolled back: {error}")
+    return jsonify({'status': 'error', 'error': str(error), 'rolled_back': True}), 500
+
+def register_archive_routes(app):
+    """Register the export, import, archive and index routes"""
+    
+    @app.route('/api/export-selected', methods=['POST'])
+    def api_export_selected():
+        """Export selected files to JSON (as a background job with "async": true)"""
+        data = request.json
+        run, error = prepared(prepare_export_selected, data)
+        if error:
+            return error
+        if data.get('async'):
+            return submit_job('export-selected', data, run)
+        try:
+            return jsonify(run())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
+    @app.route('/api/import-to-target', methods=['POST'])
+    def api_import_to_target():
+        """Import JSON data to target directory
+        
+        Preferred: multipart form (file or filename of an archive already
+        uploaded via /api/archive/preview, target, update_indexes, optional
+        paths as a JSON list); the archive is imported record by record. A
+        JSON body with the parsed archive in 'data' is still accepted.
+        With "async" the import runs as a background job.
+        """
+        if request.is_json:
+            data = request.json
+        else:
+            data = request.form.to_dict()
+            if 'file' in request.files:
+                data['filename'] = save_upload(request.files['file']).name
+        run, error = prepared(prepare_import_to_target, data)
+        if error:
+            return error
+        if data.get('async') in (True, 'true'):
+            return submit_job('import-to-target', data, run)
+        try:
+            return jsonify(run())
+        except (OSError, ValueError) as e:
+            return import_failed(e)
+    
+    @app.route('/api/archive/preview', methods=['POST'])
+    def api_archive_preview():
+        """List an archive (multipart file or filename; offset, limit) without importing it"""
+        try:
+            json_file = archive_source(request.form)
+            offset = max(0, int(request.form.get('offset', 0)))
+            limit = max(1, int(request.form.get('limit', Config.TREE_PAGE_SIZE)))
+        except FileNotFoundError as e:
+            return jsonify({'error': str(e)}), 404
+        except ValueError:
+            return jsonify({'error': 'offset and limit must be integers'}), 400
+        
+        try:
+            listing = ExportManager.list_archive(json_file, offset, limit)
+        except (OSError, ValueError) as e:
+            return jsonify({'error': f'Unreadable archive: {e}'}), 400
+        listing['filename'] = json_file.name
+        listing['manifest'].pop('checksums', None)
+        return jsonify(listing)
+    
+    @app.route('/api/import-chain', methods=['POST'])
+    def api_import_chain():
+        """Apply archives in EXPORT_DIR (base first, then deltas) to target as one transaction"""
+        data = request.json
+        run, error = prepared(prepare_import_chain, data)
+        if error:
+            return error
+        if data.get('async'):
+            return submit_job('import-chain', data, run)
+        try:
+            return jsonify(run())
+        except (OSError, ValueError) as e:
+            return import_failed(e)
+    
+    @app.route('/api/export', methods=['POST'])
+    def api_export():
+        """Export directory to JSON (a delta against "base" if given; a background job with "async")"""
+        data = request.json
+        run, error = prepared(prepare_export, data)
+        if error:
+            return error
+        if data.get('async'):
+            return submit_job('export', data, run)
+        try:
+            return jsonify(run())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
+    @app.route('/api/import', methods=['POST'])
+    def api_import():
+        """Import JSON file"""
+        target = Path(request.form['target'])
+        json_file = save_upload(request.files['file'])
+        
+        try:
+            imported = ExportManager.import_from_json(json_file, target)
+        except (OSError, ValueError) as e:
+            return import_failed(e)
+        
+        return jsonify({
+            'status': 'success',
+            'imported_count': len(imported),
+            'files': imported
+        })
+    
+    @app.route('/api/index', methods=['POST'])
+    def api_index():
+        """Generate index (or, with "all": true, rebuild the whole hierarchy under path)"""
+        data = request.json
+        run, error = prepared(prepare_index, data)
+        if error:
+            return error
+        if data.get('async'):
+            return submit_job('index', data, run)
+        try:
+            return jsonify(run())
+        except FileExistsError as e:
+            return jsonify({'status': 'error', 'error': str(e)}), 409
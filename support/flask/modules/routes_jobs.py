@@ -0,0 +1,98 @@
+"""
+modules/routes_jobs.py
+
+Version: 1.0.1
+Date: 2026-10-18
+Purpose: Flask routes for background jobs (/api/jobs)
+Project: SIMA
+
+ADDED: Job submit/list/status/events/cancel/result routes (moved from modules/routes.py)
+MODIFIED: submit_job passes the prepared run.cleanup to the queue
+"""
+
+from flask import Response, request, jsonify, stream_with_context
+from typing import Callable, Dict
+
+from modules.jobs import FINISHED, SUCCEEDED, QueueFull, get_job_queue
+from modules.job_events import job_events
+from modules.operations import OPERATIONS
+
+def submit_job(kind: str, data: Dict, run: Callable):
+    """Queue a prepared operation; 202 with the job status"""
+    params = {k: v for k, v in data.items() if k not in ('data', 'async')}
+    try:
+        job = get_job_queue().submit(kind, params, run, getattr(run, 'cleanup', None))
+    except QueueFull as e:
+        return jsonify({'error': str(e)}), 503
+    return jsonify(dict(job.status(), status_url=f"/api/jobs/{job.id}",
+                        events_url=f"/api/jobs/{job.id}/events")), 202
+
+def prepared(prepare: Callable, data: Dict):
+    """(run, None) for a valid request, else (None, error response)"""
+    try:
+        return prepare(data), None
+    except FileNotFoundError as e:
+        return None, (jsonify({'status': 'error', 'error': str(e)}), 404)
+    except (KeyError, TypeError, ValueError) as e:
+        return None, (jsonify({'status': 'error', 'error': f"Invalid request: {e}"}), 400)
+
+def register_job_routes(app):
+    """Register the /api/jobs routes"""
+    
+    @app.route('/api/jobs', methods=['GET', 'POST'])
+    def api_jobs():
+        """List jobs, or submit one: {"kind": "export"|"export-selected"|"import-to-target"|"import-chain"|"index", ...}"""
+        if request.method == 'GET':
+            return jsonify({'jobs': get_job_queue().list()})
+        data = request.json
+        prepare = OPERATIONS.get(data.get('kind'))
+        if prepare is None:
+            return jsonify({'error': f"kind must be one of {', '.join(OPERATIONS)}"}), 400
+        run, error = prepared(prepare, data)
+        if error:
+            return error
+        return submit_job(data['kind'], {k: v for k, v in data.items() if k != 'kind'}, run)
+    
+    @app.route('/api/jobs/<job_id>')
+    def api_job_status(job_id):
+        """State and progress of a job"""
+        job = get_job_queue().get(job_id)
+        if job is None:
+            return jsonify({'error': f'Unknown job: {job_id}'}), 404
+        return jsonify(job.status())
+    
+    @app.route('/api/jobs/<job_id>/events')
+    def api_job_events(job_id):
+        """Server-Sent Events: progress, file-error and done"""
+        queue = get_job_queue()
+        job = queue.get(job_id)
+        if job is None:
+            return jsonify({'error': f'Unknown job: {job_id}'}), 404
+        try:
+            errors_sent = int(request.headers.get('Last-Event-ID', 0))
+        except ValueError:
+            errors_sent = 0
+        # Another worker's job is followed through its saved record
+        reload = None if queue.is_local(job_id) else (lambda: queue.get(job_id))
+        return Response(stream_with_context(job_events(job, errors_sent, reload)), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    
+    @app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+    def api_job_cancel(job_id):
+        """Cancel a queued job or stop a running one at its next file"""
+        job = get_job_queue().cancel(job_id)
+        if job is None:
+            return jsonify({'error': f'Unknown job: {job_id}'}), 404
+        return jsonify(job.status())
+    
+    @app.route('/api/jobs/<job_id>/result')
+    def api_job_result(job_id):
+        """Result of a succeeded job (202 while it runs, 409 if it failed or was cancelled)"""
+        job = get_job_queue().get(job_id)
+        if job is None:
+            return jsonify({'error': f'Unknown job: {job_id}'}), 404
+        if job.state not in FINISHED:
+            return jsonify(job.status()), 202
+        if job.state != SUCCEEDED:
+            return jsonify(job.status()), 409
+        return jsonify(job.result)
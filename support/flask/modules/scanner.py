@@ -0,0 +1,141 @@
+"""
+modules/scanner.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Single-pass, fence-aware markdown scanner for knowledge files
+Project: SIMA
+
+ADDED: scan_markdown (header, title, keywords, related, languages, sections)
+"""
+
+from bisect import bisect_right
+from typing import Dict, List
+import re
+
+from modules.config import LANGUAGE_ALIASES
+
+HEADER_LINES = 20
+
+HEADER_FIELDS = {
+    'Version': 'version',
+    'Date': 'date',
+    'Purpose': 'purpose',
+    'Category': 'category',
+    'REF-ID': 'ref_id',
+}
+
+KEYWORDS_MARKER = '**Keywords:** '
+RELATED_MARKER = '**Related:** '
+
+# Line-start tokens. Anchoring on a literal '\n' lets the regex engine skip
+# ahead with a fast character search instead of trying every position.
+LINE_TOKEN = (
+    r'(?:(?P<fence> {0,3}(?:`{3,}|~{3,}))(?P<info>[^\n]*)'
+    r'|(?P<heading>##?) (?P<text>[^\n]*)'
+    r'|\*\*(?P<field>Version|Date|Purpose|Category|REF-ID):\*\*(?P<value>[^\n]*))'
+)
+FIRST_LINE_RE = re.compile(LINE_TOKEN)
+TOKEN_RE = re.compile(r'\n' + LINE_TOKEN)
+
+def fence_language(info: str) -> str:
+    """Map a code fence info string (e.g. 'py', 'Python', '{.python}') to a language"""
+    info = info.strip()
+    if not info:
+        return ''
+    word = info.split(None, 1)[0].strip('{}.').lower()
+    return LANGUAGE_ALIASES.get(word, '')
+
+def _header_end(text: str) -> int:
+    """Offset just past the last header line"""
+    pos = -1
+    for _ in range(HEADER_LINES):
+        pos = text.find('\n', pos + 1)
+        if pos < 0:
+            return len(text)
+    return pos
+
+def _tokens(text: str):
+    """Yield (line_start, match) for every line-start token"""
+    first = FIRST_LINE_RE.match(text)
+    if first:
+        yield 0, first
+    for m in TOKEN_RE.finditer(text):
+        yield m.start() + 1, m
+
+def _find_footer(text: str, marker: str, fences: List) -> List[str]:
+    """First non-empty footer field outside code fences, split on commas"""
+    pos = text.find(marker)
+    while pos >= 0:
+        eol = text.find('\n', pos)
+        if eol < 0:
+            eol = len(text)
+        value = text[pos + len(marker):eol]
+        i = bisect_right(fences, (pos, float('inf'))) - 1
+        inside = i >= 0 and fences[i][0] <= pos < fences[i][1]
+        if value and not inside:
+            return [v.strip() for v in value.split(',')]
+        pos = text.find(marker, eol)
+    return []
+
+def scan_markdown(text: str) -> Dict:
+    """Scan markdown once and return everything KnowledgeFile needs
+
+    Headings and footer fields inside fenced code blocks are ignored.
+    Sections are returned as character offsets into text:
+    {'heading', 'start', 'end'} where text[start:end] is the section body.
+    """
+    metadata = {}
+    languages = set()
+    sections = []
+    fences = []  # (start, end) offsets of fenced blocks
+    title = None
+    header_end = _header_end(text)
+    text_len = len(text)
+    fence = None  # opening marker of the open fence, e.g. '```'
+    fence_start = 0
+
+    for line_start, m in _tokens(text):
+        marker = m.group('fence')
+        if marker is not None:
+            marker = marker.lstrip(' ')
+            if fence is None:
+                fence, fence_start = marker, line_start
+                lang = fence_language(m.group('info'))
+                if lang:
+                    languages.add(lang)
+            elif marker.startswith(fence) and not m.group('info').strip():
+                fences.append((fence_start, m.end()))
+                fence = None
+            continue
+        if fence is not None:
+            continue
+
+        heading = m.group('heading')
+        if heading == '##':
+            if sections:
+                sections[-1]['end'] = line_start - 1
+            sections.append({'heading': m.group('text').strip(), 'start': m.end() + 1, 'end': None})
+        elif heading == '#':
+            if title is None and m.group('text'):
+                title = m.group('text')
+        elif m.group('field') and line_start < header_end:
+            metadata[HEADER_FIELDS[m.group('field')]] = m.group('value').strip()
+
+    if fence is not None:
+        fences.append((fence_start, text_len))
+    if sections:
+        sections[-1]['end'] = text_len
+    for section in sections:
+        section['start'] = min(section['start'], text_len)
+        section['end'] = max(section['end'], section['start'])
+
+    return {
+        'metadata': metadata,
+        'title': title,
+        'keywords': _find_footer(text, KEYWORDS_MARKER, fences),
+        'related': _find_footer(text, RELATED_MARKER, fences),
+        'languages': languages,
+        'sections': sections,
+        'line_count': text.count('\n') + 1
+    }
@@ -0,0 +1,235 @@
+"""
+modules/search.py
+
+Version: 1.1.0
+Date: 2026-10-18
+Purpose: Full-text search over knowledge files (inverted index, BM25)
+Project: SIMA
+
+ADDED: SearchIndex (incremental inverted index with BM25 ranking and section snippets)
+ADDED: get_search_index registry (one index per root)
+MODIFIED: No tree walk on queries while a watcher feeds update_file()
+"""
+
+from pathlib import Path
+from typing import Dict, List
+import heapq
+import math
+import os
+import re
+import threading
+import time
+
+from modules.cache import PARSE_CACHE
+from modules.config import Config
+
+WORD_RE = re.compile(r'[a-z0-9]+(?:-[a-z0-9]+)*')
+
+# Term-frequency weight per field (title and keywords matter most)
+FIELD_WEIGHTS = {'title': 3, 'keywords': 2, 'purpose': 2, 'body': 1}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+SNIPPET_CHARS = 160
+SNIPPET_SECTIONS = 3
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase terms; hyphenated words (e.g. REF-IDs like dec-17) also yield their parts"""
+    terms = []
+    for word in WORD_RE.findall(text.lower()):
+        terms.append(word)
+        if '-' in word:
+            terms.extend(word.split('-'))
+    return terms
+
+
+class SearchIndex:
+    """In-memory inverted index over the markdown files under a root
+
+    Each file is one document; its title, keywords, purpose and section
+    content are tokenized with field weights. refresh() re-stats the tree and
+    re-indexes only files whose (mtime_ns, size) changed, so the index tracks
+    edits without rebuilding. Safe for use from multiple threads.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.postings = {}     # term -> {doc_id: weighted tf}
+        self.docs = {}         # doc_id -> {'path', 'signature', 'length', 'terms', 'title', 'ref_id'}
+        self.doc_ids = {}      # abspath -> doc_id
+        self.total_length = 0
+        self.refreshed_at = 0.0
+        self.watched = False   # set by modules/watcher.py: changes arrive via update_file()
+        self._next_id = 0
+        self._lock = threading.RLock()
+
+    def refresh(self, force: bool = False) -> Dict:
+        """Re-index changed files, drop deleted ones (throttled; skipped while watched unless forced)"""
+        stats = {'added': 0, 'updated': 0, 'removed': 0}
+        with self._lock:
+            if not force and (self.watched or time.monotonic() - self.refreshed_at < Config.SEARCH_REFRESH_SECONDS):
+                return stats
+            seen = set()
+            for dirpath, dirnames, filenames in os.walk(self.root):
+                dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+                for name in filenames:
+                    if not name.endswith('.md'):
+                        continue
+                    path = os.path.abspath(os.path.join(dirpath, name))
+                    seen.add(path)
+                    try:
+                        kind = self._update(path, os.stat(path))
+                    except (OSError, UnicodeDecodeError) as e:
+                        print(f"Error indexing {path}: {e}")
+                        continue
+                    if kind:
+                        stats[kind] += 1
+            for path in set(self.doc_ids) - seen:
+                self.remove(path)
+                stats['removed'] += 1
+            self.refreshed_at = time.monotonic()
+        return stats
+
+    def update_file(self, path: Path) -> str:
+        """Index or re-index one file (removes it if it no longer exists)"""
+        path = os.path.abspath(path)
+        with self._lock:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                self.remove(path)
+                return 'removed'
+            return self._update(path, st)
+
+    def _update(self, path: str, st: os.stat_result) -> str:
+        signature = (st.st_mtime_ns, st.st_size)
+        doc_id = self.doc_ids.get(path)
+        if doc_id is not None and self.docs[doc_id]['signature'] == signature:
+            return None
+        kind = 'added' if doc_id is None else 'updated'
+        if doc_id is not None:
+            self.remove(path)
+        self._add(path, signature, PARSE_CACHE.get(Path(path), st))
+        return kind
+
+    def _add(self, path: str, signature: tuple, kf):
+        fields = {
+            'title': kf.title,
+            'keywords': ' '.join(kf.keywords),
+            'purpose': kf.metadata.get('purpose', ''),
+            'body': '\n'.join(s['content'] for s in kf.extract_sections()) if kf.sections else kf.content
+        }
+        terms = {}
+        length = 0
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for term in tokenize(text):
+                terms[term] = terms.get(term, 0) + weight
+                length += weight
+
+        doc_id = self._next_id
+        self._next_id += 1
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+        self.docs[doc_id] = {
+            'path': path, 'signature': signature, 'length': length, 'terms': list(terms),
+            'title': kf.title, 'ref_id': kf.metadata.get('ref_id', '')
+        }
+        self.doc_ids[path] = doc_id
+        self.total_length += length
+
+    def remove_tree(self, path: Path):
+        """Drop every file under a directory that was deleted or moved away"""
+        prefix = os.path.abspath(path) + os.sep
+        with self._lock:
+            for other in [p for p in self.doc_ids if p.startswith(prefix)]:
+                self.remove(other)
+
+    def remove(self, path: Path):
+        """Drop a file from the index"""
+        with self._lock:
+            doc_id = self.doc_ids.pop(os.path.abspath(path), None)
+            if doc_id is None:
+                return
+            doc = self.docs.pop(doc_id)
+            for term in doc['terms']:
+                posting = self.postings[term]
+                del posting[doc_id]
+                if not posting:
+                    del self.postings[term]
+            self.total_length -= doc['length']
+
+    def search(self, query: str, limit: int = 20, snippets: bool = True) -> Dict:
+        """BM25-ranked results: [{path, title, ref_id, score, sections}]"""
+        started = time.perf_counter()
+        self.refresh()
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            n_docs = len(self.docs)
+            avg_length = self.total_length / n_docs if n_docs else 0
+            scores = {}
+            for term in terms:
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, tf in posting.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.docs[doc_id]['length'] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            results = [{
+                'path': self.docs[doc_id]['path'],
+                'title': self.docs[doc_id]['title'],
+                'ref_id': self.docs[doc_id]['ref_id'],
+                'score': round(score, 4)
+            } for doc_id, score in top]
+
+        if snippets:
+            for result in results:
+                result['sections'] = self.snippets(Path(result['path']), terms)
+        return {
+            'query': query,
+            'total': len(scores),
+            'results': results,
+            'took_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    @staticmethod
+    def snippets(path: Path, terms: List[str]) -> List[Dict]:
+        """Sections containing query terms, best first, with a snippet around the first hit"""
+        try:
+            kf = PARSE_CACHE.get(path)
+            sections = kf.extract_sections() or [{'heading': kf.title, 'content': kf.content}]
+        except (OSError, UnicodeDecodeError):
+            return []
+        alternatives = '|'.join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+        pattern = re.compile(rf'\b(?:{alternatives})\b', re.IGNORECASE) if terms else None
+        hits = []
+        for section in sections:
+            matches = list(pattern.finditer(section['content'])) if pattern else []
+            if not matches:
+                continue
+            start = max(0, matches[0].start() - SNIPPET_CHARS // 2)
+            snippet = ' '.join(section['content'][start:start + SNIPPET_CHARS].split())
+            hits.append({'heading': section['heading'], 'hits': len(matches),
+                         'snippet': ('…' if start else '') + snippet})
+        hits.sort(key=lambda h: -h['hits'])
+        return hits[:SNIPPET_SECTIONS]
+
+    def stats(self) -> Dict:
+        """Index size"""
+        with self._lock:
+            return {'root': str(self.root), 'documents': len(self.docs), 'terms': len(self.postings)}
+
+
+_INDEXES = {}
+_INDEXES_LOCK = threading.Lock()
+
+def get_search_index(root: Path) -> SearchIndex:
+    """Shared SearchIndex for a root (built on first use)"""
+    key = os.path.abspath(root)
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(key)
+        if index is None:
+            index = _INDEXES[key] = SearchIndex(Path(key))
+    return index
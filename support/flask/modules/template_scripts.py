@@ -0,0 +1,350 @@
+"""
+modules/template_scripts.py
+
+Version: 1.7.2
+Date: 2026-10-18
+Purpose: Client-side script for the SIMA Manager dashboard
+Project: SIMA
+
+ADDED: APP_SCRIPT (split from templates.py to comply with 350-line limit)
+ADDED: Lazy, paged tree rendering
+MODIFIED: Import uploads the archive file instead of re-sending parsed JSON
+MODIFIED: Show rolled-back import errors
+MODIFIED: Preview reads v2 archives; compressed archives skip preview
+MODIFIED: Preview lists archives server-side; selective import by path
+ADDED: Export, import and index run as jobs with a live progress bar (Server-Sent Events)
+MODIFIED: Tree and analyze requests use GET (browser revalidation)
+ADDED: Analyze a folder (streamed /api/analyze-batch results)
+MODIFIED: Rebuild result shows hand-written files kept
+"""
+
+APP_SCRIPT = '''
+        let exportSelection = new Set();
+        let importPreviewData = null;
+        let importTargetPath = null;
+        
+        function showTab(tab) {
+            document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
+            document.querySelectorAll('.tab-content').forEach(t => t.classList.remove('active'));
+            event.target.classList.add('active');
+            document.getElementById(tab + '-tab').classList.add('active');
+        }
+        
+        async function fetchTree(path, offset = 0) {
+            // GET, so the browser cache revalidates unchanged listings (304)
+            const query = new URLSearchParams({path: path, depth: 1, offset: offset, metadata: true});
+            const response = await fetch(`/api/tree?${query}`);
+            return await response.json();
+        }
+        
+        async function loadExportTree() {
+            const path = document.getElementById('export-root').value;
+            renderTree(await fetchTree(path), 'export-tree', true);
+        }
+        
+        async function loadImportTree() {
+            const path = document.getElementById('import-root').value;
+            renderTree(await fetchTree(path), 'import-tree', false);
+        }
+        
+        async function loadImportPreview() {
+            // The server lists the archive (from its index footer when present),
+            // so the browser never parses the whole file
+            const form = new FormData();
+            form.append('file', document.getElementById('import-file').files[0]);
+            const response = await fetch('/api/archive/preview', {method: 'POST', body: form});
+            const result = await response.json();
+            const div = document.getElementById('import-preview');
+            if (result.error) {
+                importPreviewData = null;
+                div.innerHTML = `<div class="stats">❌ ${escapeHtml(result.error)}</div>`;
+                return;
+            }
+            importPreviewData = result;
+            const shown = result.files.length < result.total ? ` (showing ${result.files.length})` : '';
+            div.innerHTML = `
+                <div class="stats">
+                    <strong>Files:</strong> ${result.total}${shown}<br>
+                    <strong>Version:</strong> ${escapeHtml(result.manifest.sima_version)}<br>
+                    <strong>Created:</strong> ${new Date(result.manifest.created).toLocaleString()}
+                </div>
+                <div style="max-height: 400px; overflow-y: auto;">
+                    ${result.files.map(f => `
+                        <label style="display: block; padding: 5px; margin: 3px 0; background: white; border-radius: 3px;">
+                            <input type="checkbox" class="import-file-choice" data-path="${escapeHtml(f.path)}" checked />
+                            📄 ${f.ref_id ? '[' + escapeHtml(f.ref_id) + '] ' : ''}${escapeHtml(f.path)}
+                        </label>
+                    `).join('')}
+                </div>
+            `;
+        }
+        
+        function escapeHtml(text) {
+            return String(text).replace(/[&<>"']/g, c => ({
+                '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+            })[c]);
+        }
+        
+        function renderTree(node, containerId, selectable) {
+            const container = document.getElementById(containerId);
+            container.innerHTML = node.type ? renderNode(node, selectable) : escapeHtml(node.error);
+        }
+        
+        function renderChildren(node, selectable) {
+            const childrenHtml = (node.children || []).map(c => renderNode(c, selectable)).join('');
+            if (node.next_offset === undefined) {
+                return childrenHtml;
+            }
+            return childrenHtml + `<div class="tree-item tree-more" data-path="${escapeHtml(node.path)}"
+                data-offset="${node.next_offset}" data-selectable="${selectable}" onclick="loadMore(event)">
+                ... more (${node.next_offset} of ${node.total} shown)</div>`;
+        }
+        
+        function renderNode(node, selectable) {
+            const path = escapeHtml(node.path);
+            if (node.type === 'file') {
+                const langs = node.languages ? node.languages.map(l => 
+                    '<span class="language-tag">' + l + '</span>'
+                ).join('') : '';
+                const refId = node.ref_id ? '[' + escapeHtml(node.ref_id) + '] ' : '';
+                
+                if (selectable) {
+                    const selected = exportSelection.has(node.path) ? 'selected' : '';
+                    return `<div class="tree-item tree-file ${selected}" data-path="${path}" data-size="${node.size}"
+                        onclick="toggleExportFile(event)">${refId}${escapeHtml(node.name)} ${langs}</div>`;
+                } else {
+                    return `<div class="tree-item tree-file">${refId}${escapeHtml(node.name)} ${langs}</div>`;
+                }
+            } else {
+                // Unloaded folders are fetched on first expand
+                const display = node.loaded ? 'block' : 'none';
+                return `
+                    <div>
+                        <div class="tree-item tree-folder collapse-toggle" data-path="${path}"
+                            data-selectable="${selectable}" onclick="toggleFolder(event)">
+                            ${escapeHtml(node.name)}
+                        </div>
+                        <div class="tree-children" data-loaded="${node.loaded}" style="display:${display};">
+                            ${node.loaded ? renderChildren(node, selectable) : ''}
+                        </div>
+                    </div>
+                `;
+            }
+        }
+        
+        async function toggleFolder(e) {
+            e.stopPropagation();
+            const folder = e.currentTarget;
+            const children = folder.nextElementSibling;
+            const selectable = folder.dataset.selectable === 'true';
+            if (!selectable) {
+                selectImportTarget(folder.dataset.path);
+            }
+            if (children.dataset.loaded !== 'true') {
+                const node = await fetchTree(folder.dataset.path);
+                children.innerHTML = renderChildren(node, selectable);
+                children.dataset.loaded = 'true';
+                children.style.display = 'block';
+                return;
+            }
+            children.style.display = children.style.display === 'none' ? 'block' : 'none';
+        }
+        
+        async function loadMore(e) {
+            e.stopPropagation();
+            const more = e.currentTarget;
+            const node = await fetchTree(more.dataset.path, parseInt(more.dataset.offset));
+            more.outerHTML = renderChildren(node, more.dataset.selectable === 'true');
+        }
+        
+        function toggleExportFile(e) {
+            const path = e.currentTarget.dataset.path;
+            if (exportSelection.has(path)) {
+                exportSelection.delete(path);
+            } else {
+                exportSelection.add(path);
+            }
+            updateExportSelection();
+        }
+        
+        function markExportSelection() {
+            document.querySelectorAll('#export-tree .tree-file').forEach(el => {
+                el.classList.toggle('selected', exportSelection.has(el.dataset.path));
+            });
+        }
+        
+        function selectImportTarget(path) {
+            importTargetPath = path;
+            document.getElementById('import-target').textContent = path;
+        }
+        
+        function updateExportSelection() {
+            const div = document.getElementById('export-selected');
+            const paths = Array.from(exportSelection);
+            
+            div.innerHTML = paths.map(path => `
+                <div class="selected-item">
+                    <span>📄 ${path.split('/').pop()}</span>
+                    <button class="remove-btn" onclick="removeExportFile('${path}')">Remove</button>
+                </div>
+            `).join('');
+            
+            document.getElementById('export-count').textContent = paths.length;
+            markExportSelection();
+        }
+        
+        function removeExportFile(path) {
+            exportSelection.delete(path);
+            updateExportSelection();
+        }
+        
+        function clearExportSelection() {
+            exportSelection.clear();
+            updateExportSelection();
+        }
+        
+        async function exportSelected() {
+            const paths = Array.from(exportSelection);
+            if (paths.length === 0) {
+                alert('No files selected');
+                return;
+            }
+            
+            const result = await runJob('/api/export-selected', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({paths: paths, async: true})
+            }, 'export-progress');
+            const div = document.getElementById('export-result');
+            div.style.display = 'block';
+            if (result.status !== 'success') {
+                div.innerHTML = `<strong>❌ Export failed:</strong> ${escapeHtml(result.error)}`;
+                return;
+            }
+            div.innerHTML = `<strong>✅ Exported:</strong> ${result.file_count} files<br>
+                            <strong>Output:</strong> ${result.output_file}<br>
+                            <a href="/download/${result.filename}" class="button">Download</a>`;
+        }
+        
+        async function importToSelected() {
+            if (!importPreviewData) {
+                alert('No import file selected');
+                return;
+            }
+            if (!importTargetPath) {
+                alert('No target directory selected');
+                return;
+            }
+            
+            const updateIndexes = document.getElementById('update-indexes').checked;
+            
+            // The archive was uploaded by the preview; import it by name,
+            // sending a path list only when some files were unchecked
+            const form = new FormData();
+            form.append('filename', importPreviewData.filename);
+            const choices = Array.from(document.querySelectorAll('.import-file-choice'));
+            if (choices.some(c => !c.checked)) {
+                form.append('paths', JSON.stringify(choices.filter(c => c.checked).map(c => c.dataset.path)));
+            }
+            form.append('target', importTargetPath);
+            form.append('update_indexes', updateIndexes ? 'true' : 'false');
+            form.append('async', 'true');
+            const result = await runJob('/api/import-to-target', {method: 'POST', body: form}, 'import-progress');
+            const div = document.getElementById('import-result');
+            div.style.display = 'block';
+            if (result.status !== 'success') {
+                div.innerHTML = `<strong>❌ Import failed, no files changed:</strong> ${escapeHtml(result.error)}`;
+                return;
+            }
+            div.innerHTML = `<strong>✅ Imported:</strong> ${result.imported_count} files<br>
+                            ${result.indexes_updated ? '<strong>✅ Indexes updated</strong><br>' : ''}
+                            <strong>Target:</strong> ${result.target}`;
+        }
+        
+        async function generateIndex() {
+            const path = document.getElementById('index-path').value;
+            const title = document.getElementById('index-title').value;
+            const all = document.getElementById('index-all').checked;
+            const result = await runJob('/api/index', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({path: path, title: title, all: all, async: true})
+            }, 'index-progress');
+            const div = document.getElementById('index-result');
+            div.style.display = 'block';
+            if (result.status !== 'success') {
+                div.innerHTML = `<strong>❌ Index failed:</strong> ${escapeHtml(result.error)}`;
+            } else if (all) {
+                div.innerHTML = `<strong>✅ Rebuilt:</strong> ${result.written.length} files changed, ${result.skipped.length} hand-written kept`;
+            } else {
+                div.innerHTML = `<strong>✅ Generated:</strong> ${result.output_file}<br>
+                            <strong>Entries:</strong> ${result.entry_count}`;
+            }
+        }
+        
+        // Submit a background job and follow its event stream in a progress
+        // box; resolves with the job result, or {status: 'error', error}
+        async function runJob(url, options, progressId) {
+            const response = await fetch(url, options);
+            const job = await response.json();
+            if (response.status !== 202) return {status: 'error', error: job.error};
+            const box = document.getElementById(progressId);
+            box.style.display = 'block';
+            box.innerHTML = `<div class="progress-track"><div class="progress-bar unknown"></div></div>
+                <div class="progress-text">Queued</div><div class="progress-current"></div>
+                <button class="remove-btn" onclick="fetch('/api/jobs/${job.job_id}/cancel', {method: 'POST'})">Cancel</button>
+                <ul class="progress-errors"></ul>`;
+            const status = await new Promise(resolve => {
+                const events = new EventSource(job.events_url);
+                events.addEventListener('progress', e => showProgress(box, JSON.parse(e.data)));
+                events.addEventListener('file-error', e => {
+                    const entry = JSON.parse(e.data);
+                    box.querySelector('.progress-errors').insertAdjacentHTML('beforeend',
+                        `<li>${escapeHtml(entry.path)}: ${escapeHtml(entry.error)}</li>`);
+                });
+                events.addEventListener('done', e => { events.close(); resolve(JSON.parse(e.data)); });
+            });
+            showProgress(box, Object.assign({state: status.state}, status.progress));
+            box.querySelector('button').remove();
+            if (status.state !== 'succeeded') {
+                return {status: 'error', error: status.error || status.state};
+            }
+            return await (await fetch(`/api/jobs/${job.job_id}/result`)).json();
+        }
+        
+        function showProgress(box, p) {
+            const bar = box.querySelector('.progress-bar');
+            bar.classList.toggle('unknown', !p.total);
+            if (p.total) bar.style.width = `${Math.min(100, 100 * p.done / p.total)}%`;
+            const mb = (p.bytes_written / 1048576).toFixed(1);
+            box.querySelector('.progress-text').textContent =
+                `${p.state}: ${p.done}${p.total ? ' / ' + p.total : ''} files · ${p.items_per_sec} files/s · ` +
+                `${mb} MB written${p.errors ? ' · ' + p.errors + ' errors' : ''}`;
+            box.querySelector('.progress-current').textContent = p.current || '';
+        }
+        
+        async function analyzeFile() {
+            const path = document.getElementById('analyze-path').value;
+            const div = document.getElementById('analyze-result');
+            div.style.display = 'block';
+            div.innerHTML = '';
+            const show = r => div.insertAdjacentHTML('beforeend', r.error
+                ? `<div>⚠️ ${escapeHtml(r.path || path)}: ${escapeHtml(r.error)}</div>`
+                : `<div><strong>${escapeHtml(r.path)}</strong> · REF-ID: ${escapeHtml(r.ref_id || 'None')} · ${r.line_count} lines ` +
+                  `${r.exceeds_limit ? '⚠️' : '✅'} ${r.languages.map(l => `<span class="language-tag">${escapeHtml(l)}</span>`).join('')}</div>`);
+            if (!document.getElementById('analyze-folder').checked) {
+                return show(await (await fetch(`/api/analyze?${new URLSearchParams({path: path})}`)).json());
+            }
+            const response = await fetch('/api/analyze-batch', {method: 'POST', headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({path: path, glob: document.getElementById('analyze-glob').value || null})});
+            if (!response.ok) return show(await response.json());
+            const reader = response.body.getReader(), decoder = new TextDecoder();
+            let buffer = '';
+            for (let chunk = await reader.read(); !chunk.done; chunk = await reader.read()) {
+                const lines = (buffer + decoder.decode(chunk.value, {stream: true})).split('\\n');
+                buffer = lines.pop();
+                lines.filter(line => line).map(line => JSON.parse(line)).forEach(r => r.done ? div.insertAdjacentHTML(
+                    'afterbegin', `<div><strong>${r.files} files · ${r.errors} errors · ${r.elapsed}s</strong></div>`) : show(r));
+            }
+        }
+'''
@@ -1,14 +1,21 @@
 """
 modules/templates.py
 
-Version: 1.0.0
-Date: 2025-11-29
+Version: 1.4.0
+Date: 2026-10-18
 Purpose: HTML templates for SIMA Manager
 Project: SIMA
 
 ADDED: Main HTML template with all UI
+MODIFIED: Tree folders load on expand, paged with "more" rows
+MODIFIED: Script moved to modules/template_scripts.py (350-line limit)
+MODIFIED: Import accepts .json.gz / .json.xz archives
+ADDED: Live progress bars for export, import and index jobs
+ADDED: Folder analysis (path + glob)
 """
 
+from modules.template_scripts import APP_SCRIPT
+
 HTML_TEMPLATE = '''
 <!DOCTYPE html>
 <html>
@@ -50,7 +57,14 @@ HTML_TEMPLATE = '''
         .remove-btn { background: #dc3545; color: white; border: none; padding: 4px 8px; border-radius: 3px; cursor: pointer; }
         .stats { background: #fff3cd; padding: 10px; border-radius: 4px; margin: 10px 0; }
         .collapse-toggle { cursor: pointer; }
+        .tree-more { color: #007bff; font-style: italic; }
         .section { margin: 30px 0; padding: 20px; background: #f9f9f9; border-radius: 4px; }
+        .progress { margin-top: 15px; padding: 10px; background: #f1f3f5; border-radius: 4px; font-size: 13px; }
+        .progress-track { height: 14px; background: #dee2e6; border-radius: 7px; overflow: hidden; margin-bottom: 6px; }
+        .progress-bar { height: 100%; width: 0; background: #28a745; transition: width 0.2s; }
+        .progress-bar.unknown { width: 100%; background: repeating-linear-gradient(45deg, #28a745 0 10px, #5cb85c 10px 20px); }
+        .progress-current { color: #666; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
+        .progress-errors { color: #dc3545; max-height: 120px; overflow-y: auto; margin: 5px 0 0; padding-left: 20px; }
     </style>
 </head>
 <body>
@@ -81,6 +95,7 @@ HTML_TEMPLATE = '''
                     <div class="selected-list" id="export-selected"></div>
                     <button class="button success" onclick="exportSelected()">Export Selected</button>
                     <button class="button secondary" onclick="clearExportSelection()">Clear All</button>
+                    <div id="export-progress" class="progress" style="display:none;"></div>
                     <div id="export-result" class="result" style="display:none;"></div>
                 </div>
             </div>
@@ -91,7 +106,7 @@ HTML_TEMPLATE = '''
             <div class="split-view">
                 <div class="tree-panel">
                     <h3>Import Source</h3>
-                    <input type="file" id="import-file" accept=".json" onchange="loadImportPreview()" />
+                    <input type="file" id="import-file" accept=".json,.gz,.xz" onchange="loadImportPreview()" />
                     <div id="import-preview" style="margin-top: 15px;"></div>
                 </div>
                 <div class="selection-panel">
@@ -104,6 +119,7 @@ HTML_TEMPLATE = '''
                     </div>
                     <button class="button success" onclick="importToSelected()">Import to Selected</button>
                     <label><input type="checkbox" id="update-indexes" checked /> Update indexes after import</label>
+                    <div id="import-progress" class="progress" style="display:none;"></div>
                     <div id="import-result" class="result" style="display:none;"></div>
                 </div>
             </div>
@@ -116,252 +132,24 @@ HTML_TEMPLATE = '''
                 <input type="text" id="index-path" placeholder="Directory path" />
                 <input type="text" id="index-title" placeholder="Index title" value="Index" />
                 <button class="button" onclick="generateIndex()">Generate</button>
+                <label><input type="checkbox" id="index-all" /> Rebuild all indexes below</label>
+                <div id="index-progress" class="progress" style="display:none;"></div>
                 <div id="index-result" class="result" style="display:none;"></div>
             </div>
             
             <div class="section" style="margin-top: 20px;">
                 <h3>Analyze File</h3>
-                <input type="text" id="analyze-path" placeholder="File path" />
+                <input type="text" id="analyze-path" placeholder="File or folder path" />
                 <button class="button" onclick="analyzeFile()">Analyze</button>
+                <label><input type="checkbox" id="analyze-folder" /> Whole folder</label>
+                <input type="text" id="analyze-glob" placeholder="Glob (default: all .md files)" />
                 <div id="analyze-result" class="result" style="display:none;"></div>
             </div>
         </div>
     </div>
     
     <script>
-        let exportSelection = new Set();
-        let importPreviewData = null;
-        let importTargetPath = null;
-        
-        function showTab(tab) {
-            document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
-            document.querySelectorAll('.tab-content').forEach(t => t.classList.remove('active'));
-            event.target.classList.add('active');
-            document.getElementById(tab + '-tab').classList.add('active');
-        }
-        
-        async function loadExportTree() {
-            const path = document.getElementById('export-root').value;
-            const response = await fetch('/api/tree', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({path: path})
-            });
-            const tree = await response.json();
-            renderTree(tree, 'export-tree', true);
-        }
-        
-        async function loadImportTree() {
-            const path = document.getElementById('import-root').value;
-            const response = await fetch('/api/tree', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({path: path})
-            });
-            const tree = await response.json();
-            renderTree(tree, 'import-tree', false);
-        }
-        
-        async function loadImportPreview() {
-            const file = document.getElementById('import-file').files[0];
-            const reader = new FileReader();
-            reader.onload = (e) => {
-                importPreviewData = JSON.parse(e.target.result);
-                const div = document.getElementById('import-preview');
-                div.innerHTML = `
-                    <div class="stats">
-                        <strong>Files:</strong> ${importPreviewData.files.length}<br>
-                        <strong>Version:</strong> ${importPreviewData.manifest.sima_version}<br>
-                        <strong>Created:</strong> ${new Date(importPreviewData.manifest.created).toLocaleString()}
-                    </div>
-                    <div style="max-height: 400px; overflow-y: auto;">
-                        ${importPreviewData.files.map(f => `
-                            <div style="padding: 5px; margin: 3px 0; background: white; border-radius: 3px;">
-                                📄 ${f.path}
-                                ${f.languages.map(l => '<span class="language-tag">' + l + '</span>').join('')}
-                            </div>
-                        `).join('')}
-                    </div>
-                `;
-            };
-            reader.readAsText(file);
-        }
-        
-        function renderTree(node, containerId, selectable) {
-            const container = document.getElementById(containerId);
-            container.innerHTML = renderNode(node, selectable);
-        }
-        
-        function renderNode(node, selectable, level = 0) {
-            if (node.type === 'file') {
-                const langs = node.languages ? node.languages.map(l => 
-                    '<span class="language-tag">' + l + '</span>'
-                ).join('') : '';
-                const refId = node.ref_id ? '[' + node.ref_id + '] ' : '';
-                
-                if (selectable) {
-                    const selected = exportSelection.has(node.path) ? 'selected' : '';
-                    return `<div class="tree-item tree-file ${selected}" onclick="toggleExportFile('${node.path}', ${node.size})">
-                        ${refId}${node.name} ${langs}
-                    </div>`;
-                } else {
-                    return `<div class="tree-item tree-file">${refId}${node.name} ${langs}</div>`;
-                }
-            } else {
-                const childrenHtml = node.children ? node.children.map(c => 
-                    renderNode(c, selectable, level + 1)
-                ).join('') : '';
-                
-                const onClick = selectable ? '' : `onclick="selectImportTarget('${node.path}')"`;
-                
-                return `
-                    <div>
-                        <div class="tree-item tree-folder collapse-toggle" onclick="toggleFolder(event)">
-                            ${node.name}
-                        </div>
-                        <div class="tree-children" ${onClick}>
-                            ${childrenHtml}
-                        </div>
-                    </div>
-                `;
-            }
-        }
-        
-        function toggleFolder(e) {
-            e.stopPropagation();
-            const children = e.target.nextElementSibling;
-            children.style.display = children.style.display === 'none' ? 'block' : 'none';
-        }
-        
-        function toggleExportFile(path, size) {
-            if (exportSelection.has(path)) {
-                exportSelection.delete(path);
-            } else {
-                exportSelection.add(path);
-            }
-            updateExportSelection();
-            loadExportTree();
-        }
-        
-        function selectImportTarget(path) {
-            importTargetPath = path;
-            document.getElementById('import-target').textContent = path;
-        }
-        
-        function updateExportSelection() {
-            const div = document.getElementById('export-selected');
-            const paths = Array.from(exportSelection);
-            
-            div.innerHTML = paths.map(path => `
-                <div class="selected-item">
-                    <span>📄 ${path.split('/').pop()}</span>
-                    <button class="remove-btn" onclick="removeExportFile('${path}')">Remove</button>
-                </div>
-            `).join('');
-            
-            document.getElementById('export-count').textContent = paths.length;
-        }
-        
-        function removeExportFile(path) {
-            exportSelection.delete(path);
-            updateExportSelection();
-            loadExportTree();
-        }
-        
-        function clearExportSelection() {
-            exportSelection.clear();
-            updateExportSelection();
-            loadExportTree();
-        }
-        
-        async function exportSelected() {
-            const paths = Array.from(exportSelection);
-            if (paths.length === 0) {
-                alert('No files selected');
-                return;
-            }
-            
-            const response = await fetch('/api/export-selected', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({paths: paths})
-            });
-            const result = await response.json();
-            const div = document.getElementById('export-result');
-            div.style.display = 'block';
-            div.innerHTML = `<strong>✅ Exported:</strong> ${result.file_count} files<br>
-                            <strong>Output:</strong> ${result.output_file}<br>
-                            <a href="/download/${result.filename}" class="button">Download</a>`;
-        }
-        
-        async function importToSelected() {
-            if (!importPreviewData) {
-                alert('No import file selected');
-                return;
-            }
-            if (!importTargetPath) {
-                alert('No target directory selected');
-                return;
-            }
-            
-            const updateIndexes = document.getElementById('update-indexes').checked;
-            
-            const response = await fetch('/api/import-to-target', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({
-                    data: importPreviewData,
-                    target: importTargetPath,
-                    update_indexes: updateIndexes
-                })
-            });
-            const result = await response.json();
-            const div = document.getElementById('import-result');
-            div.style.display = 'block';
-            div.innerHTML = `<strong>✅ Imported:</strong> ${result.imported_count} files<br>
-                            ${result.indexes_updated ? '<strong>✅ Indexes updated</strong><br>' : ''}
-                            <strong>Target:</strong> ${result.target}`;
-        }
-        
-        async function generateIndex() {
-            const path = document.getElementById('index-path').value;
-            const title = document.getElementById('index-title').value;
-            const response = await fetch('/api/index', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({path: path, title: title})
-            });
-            const result = await response.json();
-            const div = document.getElementById('index-result');
-            div.style.display = 'block';
-            div.innerHTML = `<strong>✅ Generated:</strong> ${result.output_file}<br>
-                            <strong>Entries:</strong> ${result.entry_count}`;
-        }
-        
-        async function analyzeFile() {
-            const path = document.getElementById('analyze-path').value;
-            const response = await fetch('/api/analyze', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({path: path})
-            });
-            const result = await response.json();
-            const div = document.getElementById('analyze-result');
-            div.style.display = 'block';
-            
-            const langs = result.languages.map(l => 
-                `<span class="language-tag">${l}</span>`
-            ).join('');
-            
-            div.innerHTML = `
-                <strong>File:</strong> ${result.path}<br>
-                <strong>REF-ID:</strong> ${result.ref_id || 'None'}<br>
-                <strong>Languages:</strong> ${langs || 'None detected'}<br>
-                <strong>Lines:</strong> ${result.line_count}<br>
-                <strong>Exceeds Limit:</strong> ${result.exceeds_limit ? '⚠️ Yes' : '✅ No'}
-            `;
-        }
-    </script>
+''' + APP_SCRIPT + '''    </script>
 </body>
 </html>
 '''
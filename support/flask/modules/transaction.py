@@ -0,0 +1,222 @@
+"""
+modules/transaction.py
+
+Version: 1.3.1
+Date: 2026-10-18
+Purpose: Atomic, journaled file writes for imports
+Project: SIMA
+
+ADDED: ImportTransaction (temp file + os.replace, rollback, crash recovery)
+ADDED: Journaled deletes (delta tombstones)
+MODIFIED: File writes timed as the "write" metrics phase
+ADDED: bytes_written counter
+MODIFIED: Transaction directories carry a per-process token; a leftover with this pid but another token is recovered
+"""
+
+from pathlib import Path
+from typing import List
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from modules.config import Config
+from modules.metrics import METRICS
+
+TXN_PREFIX = '.sima-txn-'
+JOURNAL_NAME = 'journal.jsonl'
+# Names this process's transactions beside its pid: a restarted server often
+# gets the same pid (PID 1 in a container) but never the same token
+PROCESS_TOKEN = uuid.uuid4().hex[:12]
+
+class ImportTransaction:
+    """Write a batch of files atomically with all-or-nothing rollback
+
+    Each file is written to a temp file beside its target, fsynced and moved
+    into place with os.replace. Files being overwritten are first hard-linked
+    (or copied), and files being deleted moved, into a hidden transaction
+    directory under target_dir, and every step is journaled there, so
+    rollback() - or recover() after a crash - restores the target directory
+    to its previous state. Safe for use from multiple threads.
+    """
+
+    def __init__(self, target_dir: Path):
+        self.target_dir = target_dir
+        self.txn_dir = target_dir / (f"{TXN_PREFIX}{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}-"
+                                     f"{PROCESS_TOKEN}-{id(self):x}")
+        self.written = []
+        self.deleted = []
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+        self._journal = None
+        self._backups = 0
+        self._seq = 0
+        self._created_roots = []
+
+    def __enter__(self) -> 'ImportTransaction':
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def begin(self):
+        """Create the transaction directory and journal"""
+        self._created_roots = []
+        parent = self.target_dir
+        while not parent.exists():
+            self._created_roots.append(parent)
+            parent = parent.parent
+        self.txn_dir.mkdir(parents=True)
+        self._journal = open(self.txn_dir / JOURNAL_NAME, 'a', encoding='utf-8')
+
+    def _log(self, **entry):
+        self._journal.write(json.dumps(entry) + '\n')
+        self._journal.flush()
+
+    def _make_parents(self, path: Path):
+        missing = []
+        parent = path.parent
+        while not parent.exists():
+            missing.append(parent)
+            parent = parent.parent
+        for directory in reversed(missing):
+            directory.mkdir(exist_ok=True)
+            self._log(op='mkdir', path=str(directory))
+
+    def write(self, target_path: Path, content: str):
+        """Atomically write content to target_path within this transaction"""
+        with self._lock:
+            self._seq += 1
+            tmp_path = target_path.with_name(f".{target_path.name}.{self._seq}{self.txn_dir.name}.tmp")
+            self._make_parents(target_path)
+            self._log(op='tmp', path=str(tmp_path))
+
+        # Content is written outside the lock so workers overlap their I/O
+        with METRICS.phase('write'), open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+            size = f.tell()
+            if Config.IMPORT_FSYNC:
+                f.flush()
+                os.fsync(f.fileno())
+
+        with self._lock:
+            backup = None
+            if target_path.exists():
+                self._backups += 1
+                backup = self.txn_dir / f"{self._backups}.bak"
+                try:
+                    os.link(target_path, backup)
+                except OSError:
+                    shutil.copy2(target_path, backup)
+            self._log(op='replace', path=str(target_path), backup=backup.name if backup else None)
+            os.replace(tmp_path, target_path)
+            self.written.append(str(target_path))
+            self.bytes_written += size
+
+    def delete(self, target_path: Path) -> bool:
+        """Remove target_path within this transaction (restored on rollback); False if absent"""
+        with self._lock:
+            if not target_path.is_file():
+                return False
+            self._backups += 1
+            backup = self.txn_dir / f"{self._backups}.bak"
+            self._log(op='delete', path=str(target_path), backup=backup.name)
+            shutil.move(str(target_path), str(backup))
+            self.deleted.append(str(target_path))
+            return True
+
+    def commit(self):
+        """Keep all writes and discard backups"""
+        self._close_journal()
+        shutil.rmtree(self.txn_dir, ignore_errors=True)
+
+    def rollback(self):
+        """Undo all writes made by this transaction"""
+        self._close_journal()
+        ImportTransaction._undo(self.txn_dir)
+        self.written = []
+        self.deleted = []
+        for directory in self._created_roots:
+            try:
+                directory.rmdir()
+            except OSError:
+                break
+
+    def _close_journal(self):
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+
+    @staticmethod
+    def _undo(txn_dir: Path):
+        """Replay a journal backwards, then remove the transaction directory"""
+        journal = txn_dir / JOURNAL_NAME
+        entries = []
+        if journal.exists():
+            for line in journal.read_text(encoding='utf-8').splitlines():
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break  # torn final line after a crash
+
+        for entry in reversed(entries):
+            path = Path(entry['path'])
+            try:
+                if entry['op'] == 'replace':
+                    if entry['backup'] and (txn_dir / entry['backup']).exists():
+                        os.replace(txn_dir / entry['backup'], path)
+                    elif not entry['backup'] and path.exists():
+                        path.unlink()
+                elif entry['op'] == 'delete':
+                    if (txn_dir / entry['backup']).exists():
+                        os.replace(txn_dir / entry['backup'], path)
+                elif entry['op'] == 'tmp' and path.exists():
+                    path.unlink()
+                elif entry['op'] == 'mkdir':
+                    path.rmdir()
+            except OSError as e:
+                print(f"Error rolling back {path}: {e}")
+
+        shutil.rmtree(txn_dir, ignore_errors=True)
+
+    @staticmethod
+    def _is_active(txn_dir: Path) -> bool:
+        """True if the process that owns the transaction is still running
+
+        A directory with this process's pid is live only if it also carries
+        this process's token; without one it predates the token and is stale.
+        """
+        parts = txn_dir.name[len(TXN_PREFIX):].split('-')
+        try:
+            pid = int(parts[1])
+        except (IndexError, ValueError):
+            return False
+        if pid == os.getpid():
+            return len(parts) == 4 and parts[2] == PROCESS_TOKEN
+        if os.name != 'posix':
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    @staticmethod
+    def recover(target_dir: Path) -> List[str]:
+        """Roll back transactions left behind by a crashed import"""
+        recovered = []
+        if not target_dir.is_dir():
+            return recovered
+        for txn_dir in sorted(target_dir.glob(f"{TXN_PREFIX}*")):
+            if txn_dir.is_dir() and not ImportTransaction._is_active(txn_dir):
+                ImportTransaction._undo(txn_dir)
+                recovered.append(str(txn_dir))
+        return recovered
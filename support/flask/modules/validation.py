@@ -0,0 +1,80 @@
+"""
+modules/validation.py
+
+Version: 1.1.1
+Date: 2026-10-18
+Purpose: Compliance checks for knowledge files
+Project: SIMA
+
+ADDED: Validator (line limit and required header fields; all files or git changes only)
+MODIFIED: Checked files counted in metrics
+MODIFIED: Unknown `since` commits raise ValueError
+"""
+
+from pathlib import Path
+from typing import Dict, List
+import os
+
+from modules.cache import PARSE_CACHE
+from modules.changes import change_source
+from modules.config import Config
+from modules.indexes import is_navigation_file
+from modules.metrics import METRICS
+
+
+class Validator:
+    """Check knowledge files against the SIMA file rules"""
+
+    @staticmethod
+    def check(file_path: Path) -> List[str]:
+        """Problems with one file (empty if compliant)"""
+        try:
+            kf = PARSE_CACHE.get(file_path)
+        except (OSError, UnicodeDecodeError) as e:
+            return [f"unreadable: {e}"]
+        problems = []
+        if kf.line_count > Config.MAX_FILE_LINES:
+            problems.append(f"{kf.line_count} lines (limit {Config.MAX_FILE_LINES})")
+        for field in Config.REQUIRED_FIELDS:
+            if not kf.metadata.get(field):
+                problems.append(f"missing {field}")
+        return problems
+
+    @staticmethod
+    def candidates(root: Path, changed_only: bool = True, since: str = None) -> Dict:
+        """Files to check: {'source', 'paths'}
+
+        With a git change source (Config.CHANGE_SOURCE) and changed_only,
+        only files changed since commit `since` (default HEAD, i.e.
+        uncommitted work) are listed; otherwise every file, from git
+        ls-files or a tree walk. Raises ValueError if `since` names no
+        commit.
+        """
+        source = change_source(root)
+        if source and changed_only:
+            paths, kind = source.changes(since)['changed'], 'git-changes'
+        elif source:
+            paths, kind = source.files(), 'git'
+        else:
+            paths, kind = [], 'walk'
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+                paths.extend(os.path.join(dirpath, name) for name in filenames if name.endswith('.md'))
+
+        def hidden(path: str) -> bool:
+            return any(part.startswith('.') for part in Path(os.path.relpath(path, root)).parts)
+
+        paths = sorted(p for p in paths if not is_navigation_file(os.path.basename(p)) and not hidden(p))
+        return {'source': kind, 'paths': paths}
+
+    @staticmethod
+    def validate(root: Path, changed_only: bool = True, since: str = None) -> Dict:
+        """Check candidate files; returns {source, checked, failed: [{path, problems}]}"""
+        found = Validator.candidates(root, changed_only, since)
+        failed = []
+        for path in found['paths']:
+            problems = Validator.check(Path(path))
+            if problems:
+                failed.append({'path': path, 'problems': problems})
+        METRICS.processed('validate', len(found['paths']))
+        return {'source': found['source'], 'checked': len(found['paths']), 'failed': failed}
@@ -0,0 +1,323 @@
+"""
+modules/watcher.py
+
+Version: 1.1.1
+Date: 2026-10-18
+Purpose: Background filesystem watcher that keeps in-memory state current
+Project: SIMA
+
+ADDED: InotifyBackend (Linux, via ctypes) and PollingBackend (mtime diffing)
+ADDED: KnowledgeWatcher (debounced batches -> parse cache, listings, search, REF-IDs)
+MODIFIED: Keeps the SQLite catalog current too
+MODIFIED: Listing cache is enabled for the watched root only
+"""
+
+from pathlib import Path
+from typing import Dict, Optional, Set
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from modules.cache import LISTING_CACHE, PARSE_CACHE
+from modules.catalog import get_catalog
+from modules.config import Config
+from modules.indexes import is_navigation_file
+from modules.refs import get_ref_index
+from modules.search import get_search_index
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyBackend:
+    """Recursive inotify watch; read() returns changed paths
+
+    New directories are watched as they appear (and their existing
+    contents reported). A queue overflow reports the root, which the
+    watcher treats as "rescan everything".
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._dirs = {}  # wd -> directory
+        self._watch_tree(root)
+
+    @staticmethod
+    def available() -> bool:
+        return sys.platform.startswith('linux')
+
+    def _watch_tree(self, top: str, report: Optional[Set[str]] = None):
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd < 0:
+                print(f"Cannot watch {dirpath}: {os.strerror(ctypes.get_errno())}")
+                continue
+            self._dirs[wd] = dirpath
+            if report is not None:
+                report.update(os.path.join(dirpath, name) for name in filenames)
+
+    def _unwatch_tree(self, top: str):
+        prefix = top + os.sep
+        for wd, directory in list(self._dirs.items()):
+            if directory == top or directory.startswith(prefix):
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._dirs[wd]
+
+    def read(self, timeout: float) -> Set[str]:
+        changed = set()
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return changed
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+            offset += EVENT_HEADER.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                changed.add(self.root)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._dirs[wd]
+                continue
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+            changed.add(path)
+            if mask & IN_ISDIR and mask & IN_MOVED_FROM:
+                self._unwatch_tree(path)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and not os.path.basename(path).startswith('.'):
+                self._watch_tree(path, changed)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingBackend:
+    """Portable fallback: periodically re-stat the tree and diff (mtime_ns, size)"""
+
+    def __init__(self, root: str, interval: float):
+        self.root = root
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, tuple]:
+        snapshot = {}
+        stack = [self.root]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.name.startswith('.'):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            snapshot[entry.path] = None
+                            stack.append(entry.path)
+                        else:
+                            st = entry.stat()
+                            snapshot[entry.path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                continue
+        return snapshot
+
+    def read(self, timeout: float) -> Set[str]:
+        time.sleep(min(timeout, self.interval))
+        snapshot = self._scan()
+        old = self._snapshot
+        self._snapshot = snapshot
+        changed = {path for path, sig in snapshot.items() if old.get(path, 0) != sig}
+        changed.update(path for path in old if path not in snapshot)
+        return changed
+
+    def close(self):
+        pass
+
+
+class KnowledgeWatcher:
+    """Keep the parse cache, directory listings, search and REF-ID indexes current
+
+    Runs a daemon thread over a backend (inotify when available, else
+    polling). Events are collected until the tree has been quiet for
+    `debounce` seconds (or WATCH_MAX_DELAY_SECONDS has passed) and then
+    applied as one batch, so bulk imports cost one update pass. While
+    running, read endpoints answer from memory without walking the tree.
+    """
+
+    def __init__(self, root: Path, debounce: float = None, backend: str = None):
+        self.root = os.path.abspath(root)
+        self.debounce = Config.WATCH_DEBOUNCE_SECONDS if debounce is None else debounce
+        self.backend_name = backend or Config.WATCH_BACKEND
+        self.batches = 0
+        self.events = 0
+        self.last_batch = None
+        self._backend = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self) -> 'KnowledgeWatcher':
+        """Build the in-memory state for root, then watch it in the background"""
+        use_inotify = self.backend_name == 'inotify' or (self.backend_name == 'auto' and InotifyBackend.available())
+        try:
+            self._backend = InotifyBackend(self.root) if use_inotify else None
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}), polling instead")
+        if self._backend is None:
+            self._backend = PollingBackend(self.root, Config.WATCH_POLL_INTERVAL)
+
+        for index in self._indexes():
+            index.refresh(force=True)
+            index.watched = True
+        LISTING_CACHE.enable(self.root)
+
+        self._thread = threading.Thread(target=self._run, name='sima-watcher', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop watching; indexes go back to refreshing on request"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        if self._backend:
+            self._backend.close()
+        for index in self._indexes():
+            index.watched = False
+        LISTING_CACHE.disable()
+
+    def _run(self):
+        pending = set()
+        first = last = 0.0
+        while not self._stop.is_set():
+            try:
+                changed = self._backend.read(self.debounce)
+            except OSError as e:
+                print(f"Watcher error: {e}")
+                changed = {self.root}
+            now = time.monotonic()
+            if changed:
+                if not pending:
+                    first = now
+                pending |= changed
+                last = now
+            if pending and (now - last >= self.debounce or now - first >= Config.WATCH_MAX_DELAY_SECONDS):
+                batch, pending = pending, set()
+                try:
+                    self.apply(batch)
+                except Exception as e:
+                    print(f"Watcher failed to apply {len(batch)} changes: {e}")
+
+    def _indexes(self) -> tuple:
+        """Search index, REF-ID index and catalog for root"""
+        root = Path(self.root)
+        return get_search_index(root), get_ref_index(root), get_catalog(root)
+
+    def _hidden(self, path: str) -> bool:
+        rel = os.path.relpath(path, self.root)
+        return rel != '.' and any(part.startswith('.') for part in Path(rel).parts)
+
+    def apply(self, paths: Set[str]) -> Dict:
+        """Apply one batch of changed paths (files or directories)"""
+        search, refs, catalog = self._indexes()
+        rescan = False
+        updated = 0
+        content_changed = False
+
+        for path in sorted(paths):
+            if path == self.root:
+                rescan = True
+                continue
+            if self._hidden(path):
+                continue
+            LISTING_CACHE.invalidate(os.path.dirname(path))
+            if os.path.isdir(path):
+                # Files inside a new or moved-in directory are reported individually
+                LISTING_CACHE.invalidate(path, recursive=True)
+                continue
+            if not path.endswith('.md'):
+                if not os.path.exists(path):
+                    # Possibly a deleted or moved-away directory
+                    LISTING_CACHE.invalidate(path, recursive=True)
+                    search.remove_tree(Path(path))
+                    refs.remove_tree(Path(path))
+                    catalog.remove_tree(Path(path))
+                continue
+            PARSE_CACHE.invalidate(Path(path))
+            search.update_file(Path(path))
+            refs.update_file(Path(path))
+            catalog.update_file(Path(path))
+            updated += 1
+            content_changed = content_changed or not is_navigation_file(os.path.basename(path))
+
+        if rescan:
+            LISTING_CACHE.clear()
+            search.refresh(force=True)
+            refs.refresh(force=True)
+            catalog.refresh(force=True)
+        if Config.WATCH_REBUILD_INDEXES and (content_changed or rescan):
+            # Navigation files written here are ignored above, so this cannot loop
+            from modules.hierarchy import HierarchyBuilder
+            HierarchyBuilder.rebuild(Path(self.root))
+
+        self.batches += 1
+        self.events += len(paths)
+        self.last_batch = {'paths': len(paths), 'files_updated': updated, 'rescan': rescan,
+                           'at': time.strftime('%Y-%m-%dT%H:%M:%S')}
+        return self.last_batch
+
+    def stats(self) -> Dict:
+        """Watcher state for /api/watcher"""
+        return {
+            'root': self.root,
+            'running': bool(self._thread and self._thread.is_alive()),
+            'backend': type(self._backend).__name__ if self._backend else None,
+            'debounce': self.debounce,
+            'batches': self.batches,
+            'events': self.events,
+            'last_batch': self.last_batch
+        }
+
+
+# Started by sima_manager.py when Config.WATCH_ENABLED
+WATCHER = None
+
+def start_watcher(root: Path = None) -> KnowledgeWatcher:
+    """Start the process-wide watcher (idempotent)"""
+    global WATCHER
+    if WATCHER is None:
+        WATCHER = KnowledgeWatcher(root or Config.SIMA_ROOT).start()
+    return WATCHER
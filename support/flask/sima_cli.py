@@ -0,0 +1,207 @@
+"""
+sima_cli.py
+
+Version: 1.1.1
+Date: 2026-10-18
+Purpose: Command line for SIMA operations without starting the web app (python -m sima_cli)
+Project: SIMA
+
+ADDED: export, import, index, analyze, validate and tree commands over modules/kb.py
+ADDED: JSON results on stdout, NDJSON progress events on stderr, --jobs N
+ADDED: analyze --glob
+MODIFIED: index --force / --dry-run
+"""
+
+from pathlib import Path
+import argparse
+import contextlib
+import json
+import sys
+import time
+
+# Only the standard library is imported up front; modules are loaded by the command that runs
+
+EXIT_OK = 0
+EXIT_FAILED = 1   # operation error, validation failures, unreadable files
+EXIT_USAGE = 2    # bad arguments or settings (argparse uses 2 as well)
+
+
+def emit(stream, data: dict, pretty: bool = False):
+    """One JSON document per line (indented with --pretty)"""
+    stream.write(json.dumps(data, indent=2 if pretty else None, default=str) + '\n')
+    stream.flush()
+
+
+def progress_reporter(args, stream):
+    """Progress whose updates are written as NDJSON events (None without --progress)
+
+    'progress' events carry the counts at most every --progress-interval
+    seconds; each per-file error is written once as a 'file-error' event.
+    """
+    if not args.progress:
+        return None
+    from modules.progress import Progress
+    state = {'last': 0.0, 'errors': 0}
+
+    def on_change(progress):
+        snapshot = progress.snapshot()
+        new = snapshot['errors'] - state['errors']
+        if new > 0:
+            for entry in snapshot['recent_errors'][-new:]:
+                emit(stream, dict(entry, event='file-error'))
+            state['errors'] = snapshot['errors']
+        now = time.monotonic()
+        if now - state['last'] >= args.progress_interval:
+            state['last'] = now
+            emit(stream, dict({k: v for k, v in snapshot.items() if k != 'recent_errors'}, event='progress'))
+    return Progress(on_change)
+
+
+def configure(args):
+    """Apply --config and --set over $SIMA_CONFIG / SIMA_* settings, as create_app() does"""
+    from modules.config import apply_settings, load_settings
+    settings = load_settings(args.config)
+    for item in args.set or []:
+        name, sep, value = item.partition('=')
+        if not sep:
+            raise ValueError(f"--set expects NAME=VALUE, got {item!r}")
+        settings[name] = value
+    apply_settings(settings)
+    from modules.cache import PARSE_CACHE
+    PARSE_CACHE.configure()
+
+
+# Commands: (kb, args, progress) -> (result, exit code); results are JSON-ready
+
+def cmd_export(kb, args, progress):
+    compression = None if args.compression is None else ('' if args.compression == 'none' else args.compression)
+    result = kb.export(args.output, path=args.path, files=args.files, archive_version=args.format,
+                       compression=compression, base=args.base, progress=progress)
+    return result, EXIT_OK
+
+
+def cmd_import(kb, args, progress):
+    if len(args.archives) > 1:
+        result = kb.import_chain(args.archives, args.target, update_indexes=args.update_indexes, progress=progress)
+    else:
+        result = kb.import_archive(args.archives[0], args.target, flatten=args.flatten, paths=args.paths,
+                                   update_indexes=args.update_indexes, progress=progress)
+    return result, EXIT_OK
+
+
+def cmd_index(kb, args, progress):
+    result = kb.index(args.path, title=args.title, rebuild_all=args.all, force=args.force, dry_run=args.dry_run,
+                      progress=progress)
+    return result, EXIT_OK
+
+
+def cmd_analyze(kb, args, progress):
+    """Streams one line per file (NDJSON) instead of returning a document"""
+    status = EXIT_OK
+    for result in kb.analyze_many(args.paths, progress, pattern=args.glob):
+        emit(args.out, result, args.pretty)
+        if 'error' in result:
+            status = EXIT_FAILED
+    return None, status
+
+
+def cmd_validate(kb, args, progress):
+    result = kb.validate(args.path, changed_only=not args.all, since=args.since, progress=progress)
+    return result, EXIT_FAILED if result['failed'] else EXIT_OK
+
+
+def cmd_tree(kb, args, progress):
+    result = kb.tree(args.path, depth=args.depth, offset=args.offset, limit=args.limit, metadata=args.metadata)
+    return result, EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--config', type=Path, help="settings file (JSON/YAML; default $SIMA_CONFIG)")
+    common.add_argument('--set', action='append', metavar='NAME=VALUE', help="override one Config setting")
+    common.add_argument('--root', type=Path, help="knowledge base root (default Config.SIMA_ROOT)")
+    common.add_argument('--jobs', '-j', type=int, metavar='N',
+                        help="parse in N processes (0 = one per CPU; default from Config)")
+    common.add_argument('--progress', action='store_true', help="write NDJSON progress events to stderr")
+    common.add_argument('--progress-interval', type=float, default=0.5, metavar='SECONDS')
+    common.add_argument('--pretty', action='store_true', help="indent JSON output")
+
+    parser = argparse.ArgumentParser(prog='python -m sima_cli', description="SIMA operations without the web app")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('export', parents=[common], help="export a directory or files to an archive")
+    p.add_argument('path', nargs='?', help="directory to export (default: root)")
+    p.add_argument('-o', '--output', type=Path, help="archive file (default: a new name in Config.EXPORT_DIR)")
+    p.add_argument('--files', nargs='+', help="export these files instead of a directory")
+    p.add_argument('--format', type=int, choices=(1, 2), help="archive layout (default Config.EXPORT_ARCHIVE_VERSION)")
+    p.add_argument('--compression', choices=('none', 'gzip', 'lzma'))
+    p.add_argument('--base', type=Path, help="earlier archive or .manifest.json: export only the changes")
+    p.set_defaults(run=cmd_export)
+
+    p = commands.add_parser('import', parents=[common], help="import an archive, or a base and its deltas")
+    p.add_argument('archives', nargs='+', type=Path, help="archive, or base then deltas (oldest first)")
+    p.add_argument('--target', type=Path, required=True)
+    p.add_argument('--flatten', action='store_true', help="drop archive directories (single archive)")
+    p.add_argument('--paths', nargs='+', help="import only these archive paths (single archive)")
+    p.add_argument('--update-indexes', action='store_true')
+    p.set_defaults(run=cmd_import)
+
+    p = commands.add_parser('index', parents=[common], help="write a directory index, or rebuild all of them")
+    p.add_argument('path', nargs='?', help="directory (default: root)")
+    p.add_argument('--title', default='Index')
+    p.add_argument('--all', action='store_true', help="rebuild every index, master index and router under path")
+    p.add_argument('--force', action='store_true', help="also replace navigation files written by hand")
+    p.add_argument('--dry-run', action='store_true', help="with --all: list the files that would change")
+    p.set_defaults(run=cmd_index)
+
+    p = commands.add_parser('analyze', parents=[common], help="languages, line count and metadata (NDJSON)")
+    p.add_argument('paths', nargs='+', help="files, or directories of .md files")
+    p.add_argument('--glob', help="files of each directory matching this pattern (e.g. '**/*.md')")
+    p.set_defaults(run=cmd_analyze)
+
+    p = commands.add_parser('validate', parents=[common], help="check files against the SIMA rules")
+    p.add_argument('path', nargs='?', help="directory (default: root)")
+    p.add_argument('--all', action='store_true', help="check every file, not only git changes")
+    p.add_argument('--since', help="with a git change source: changes since this commit")
+    p.set_defaults(run=cmd_validate)
+
+    p = commands.add_parser('tree', parents=[common], help="directory tree as /api/tree returns it")
+    p.add_argument('path', nargs='?', help="directory (default: root)")
+    p.add_argument('--depth', type=int, help="levels to list (-1 = all)")
+    p.add_argument('--offset', type=int, default=0)
+    p.add_argument('--limit', type=int)
+    p.add_argument('--metadata', action='store_true', help="parse languages and REF-IDs")
+    p.set_defaults(run=cmd_tree)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        configure(args)
+    except (OSError, ValueError) as e:
+        emit(sys.stdout, {'status': 'error', 'error': str(e)})
+        return EXIT_USAGE
+
+    from modules.kb import KnowledgeBase
+    kb = KnowledgeBase(args.root, jobs=args.jobs)
+    progress = progress_reporter(args, sys.stderr)
+    out = args.out = sys.stdout
+    try:
+        # Diagnostics printed by the modules go to stderr; stdout carries only results
+        with contextlib.redirect_stdout(sys.stderr):
+            result, status = args.run(kb, args, progress)
+    except KeyboardInterrupt:
+        emit(out, {'status': 'cancelled', 'error': 'Interrupted'})
+        return 130
+    except Exception as e:
+        emit(out, {'status': 'error', 'error': f"{type(e).__name__}: {e}"})
+        return EXIT_FAILED
+    if progress is not None:
+        emit(sys.stderr, dict({k: v for k, v in progress.snapshot().items() if k != 'recent_errors'}, event='progress'))
+    if result is not None:
+        emit(out, result, args.pretty)
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
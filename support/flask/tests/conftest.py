@@ -0,0 +1,112 @@
+"""
+tests/conftest.py
+
+Version: 1.0.3
+Date: 2026-10-18
+Purpose: Shared pytest fixtures (run from support/flask: python -m pytest)
+Project: SIMA
+
+ADDED: corpus (synthetic SIMA tree), isolated caches and Config per test
+ADDED: app and client fixtures (create_app over corpus)
+MODIFIED: Archive helpers (comparable, source_records, read_all, indexed) shared by the archive tests
+ADDED: saved_config fixture (shared by app and the settings tests)
+"""
+
+from pathlib import Path
+import json
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.corpus import generate_tree
+from modules.archive import ArchiveReader, open_archive
+from modules.browser import FileBrowser
+from modules.cache import LISTING_CACHE, PARSE_CACHE
+from modules.config import Config
+from modules.knowledge import KnowledgeFile
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+LAYOUTS = [(version, compression) for version in (1, 2) for compression in ('', 'gzip', 'lzma')]
+
+# Fields that carry the export time rather than file content
+VOLATILE = ('created', 'modified')
+
+def comparable(record):
+    """A file record without its export-time fields"""
+    record = json.loads(json.dumps(record))
+    for key in VOLATILE:
+        record['metadata'].pop(key, None)
+    record.pop('sima_version', None)
+    return record
+
+def source_records(corpus):
+    """What an export of corpus should hold, in archive order"""
+    records = []
+    for path in FileBrowser.walk_markdown(corpus):
+        record = KnowledgeFile(path).to_json()
+        record['path'] = str(path.relative_to(corpus))
+        records.append(comparable(record))
+    return records
+
+def read_all(archive_file):
+    """(records, manifest) of an archive of any layout"""
+    with open_archive(archive_file) as stream:
+        reader = ArchiveReader(stream)
+        return [comparable(r) for r in reader.files()], reader.manifest
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    """Fresh caches, no git change source and serial workers for every test"""
+    PARSE_CACHE.clear()
+    LISTING_CACHE.disable()
+    monkeypatch.setattr(PARSE_CACHE, 'shared', None)
+    monkeypatch.setattr(Config, 'CHANGE_SOURCE', 'walk')
+    monkeypatch.setattr(Config, 'EXPORT_WORKERS', 1)
+    monkeypatch.setattr(Config, 'IMPORT_FSYNC', False)
+    yield
+    PARSE_CACHE.clear()
+
+
+@pytest.fixture
+def indexed(monkeypatch):
+    """Opt in to index footers (Config.EXPORT_INDEXED is off by default)"""
+    monkeypatch.setattr(Config, 'EXPORT_INDEXED', True)
+
+
+@pytest.fixture
+def corpus(tmp_path) -> Path:
+    """A 24-file SIMA tree with per-directory indexes, a master index and a router"""
+    root = tmp_path / 'kb'
+    generate_tree(root, 24)
+    return root
+
+
+@pytest.fixture
+def saved_config(monkeypatch):
+    """Restore every Config setting after the test"""
+    for name in dir(Config):
+        if name.isupper():
+            monkeypatch.setattr(Config, name, getattr(Config, name))
+
+
+@pytest.fixture
+def app(corpus, tmp_path, saved_config):
+    """create_app() over corpus, with every file it writes under tmp_path (Config restored afterwards)"""
+    from sima_manager import create_app
+    state = tmp_path / 'state'
+    state.mkdir()
+    return create_app({
+        'SIMA_ROOT': str(corpus), 'EXPORT_DIR': str(tmp_path / 'exports'), 'ARCHIVE_DIR': str(tmp_path / 'archives'),
+        'PARSE_CACHE_SHARED': True, 'PARSE_CACHE_DB': str(state / 'parse.sqlite3'),
+        'CATALOG_FILE': str(state / 'catalog.sqlite3'), 'JOB_DIR': str(state / 'jobs'),
+        'METRICS_DIR': str(state / 'metrics'), 'IMPORT_FSYNC': False,
+    })
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
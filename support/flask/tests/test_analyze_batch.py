@@ -0,0 +1,54 @@
+"""
+tests/test_analyze_batch.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: /api/analyze-batch - parallel analysis streamed as NDJSON
+Project: SIMA
+
+ADDED: Results match /api/analyze, ordered and unordered parallel runs, per-file errors, request limits
+"""
+
+import json
+
+from modules.browser import FileBrowser
+from modules.config import Config
+
+def batch(client, **body):
+    response = client.post('/api/analyze-batch', json=body)
+    assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    return lines[:-1], lines[-1]
+
+
+def test_lines_match_single_file_analysis(client, corpus):
+    paths = [str(p) for p in FileBrowser.walk_markdown(corpus)][:5]
+    results, summary = batch(client, paths=paths, ordered=True)
+    assert results == [client.get('/api/analyze', query_string={'path': p}).get_json() for p in paths]
+    assert summary == dict(summary, done=True, files=5, errors=0)
+
+
+def test_parallel_runs_cover_every_file(client, corpus, monkeypatch):
+    monkeypatch.setattr(Config, 'EXPORT_CHUNK_SIZE', 3)
+    expected = [str(p) for p in FileBrowser.walk_markdown(corpus)]
+    ordered, _ = batch(client, path=str(corpus), workers=2, ordered=True)
+    assert [r['path'] for r in ordered] == expected
+    unordered, summary = batch(client, path=str(corpus), workers=2)
+    assert sorted(r['path'] for r in unordered) == sorted(expected) and summary['files'] == len(expected)
+
+
+def test_unreadable_files_are_reported_per_line(client, corpus, tmp_path):
+    good = str(next(FileBrowser.walk_markdown(corpus)))
+    results, summary = batch(client, paths=[good, str(tmp_path / 'missing.md')], ordered=True)
+    assert 'error' not in results[0] and results[1]['path'] == str(tmp_path / 'missing.md') and 'error' in results[1]
+    assert summary['errors'] == 1
+
+
+def test_glob_and_request_errors(client, corpus, monkeypatch):
+    results, _ = batch(client, path=str(corpus), glob='**/DEC-*.md')
+    assert results and all('/DEC-' in r['path'] for r in results)
+    assert client.post('/api/analyze-batch', json={}).status_code == 400
+    assert client.post('/api/analyze-batch', json={'path': str(corpus / 'missing')}).status_code == 404
+    assert client.post('/api/analyze-batch', json={'paths': [], 'workers': 'many'}).status_code == 400
+    monkeypatch.setattr(Config, 'ANALYZE_BATCH_MAX_FILES', 2)
+    assert client.post('/api/analyze-batch', json={'path': str(corpus)}).status_code == 400
@@ -0,0 +1,74 @@
+"""
+tests/test_archive.py
+
+Version: 1.0.6
+Date: 2026-10-18
+Purpose: Archive layouts - v1 and compact v2 read back the same, with every compression
+Project: SIMA
+
+ADDED: Writer/reader round-trips, IndexedArchive access, export -> import equivalence
+MODIFIED: Index footers are opted into; defaults write v1 without a footer
+MODIFIED: Streaming writer tests moved to tests/test_export.py; helpers to conftest.py
+MODIFIED: Import tests moved to tests/test_import.py
+MODIFIED: Parallel export test moved to tests/test_parallel.py
+MODIFIED: IndexedArchive tests moved to tests/test_archive_index.py
+ADDED: v2 string table introduces each string once; one body copy; smaller than v1
+"""
+
+import json
+
+import pytest
+
+from conftest import LAYOUTS, comparable, read_all, source_records
+from modules.archive import archive_records
+from modules.archive_index import IndexedArchive
+from modules.managers import ExportManager
+
+
+@pytest.mark.parametrize('version,compression', LAYOUTS)
+def test_export_reads_back_as_v1_records(corpus, tmp_path, indexed, version, compression):
+    output = tmp_path / f'out-{version}-{compression or "plain"}.json'
+    manifest = ExportManager.export_to_json(corpus, output, archive_version=version, compression=compression)
+    records, read_manifest = read_all(output)
+
+    assert records == source_records(corpus)
+    assert manifest['file_count'] == read_manifest['file_count'] == len(records)
+    assert read_manifest['version'] == ('2.0.0' if version == 2 else '1.0.0')
+    assert set(read_manifest['checksums']) == {r['path'] for r in records}
+    assert IndexedArchive.is_indexed(output) == (compression == '')
+
+
+def test_defaults_are_v1_without_footer(corpus, tmp_path):
+    output = tmp_path / 'default.json'
+    manifest = ExportManager.export_to_json(corpus, output)
+    archive = json.loads(output.read_text(encoding='utf-8'))
+    assert manifest['version'] == '1.0.0'
+    assert 'index' not in archive and 'index_offset' not in archive
+    assert not IndexedArchive.is_indexed(output)
+
+
+def test_v2_layout_expands_from_a_parsed_dict(corpus, tmp_path):
+    output = tmp_path / 'compact.json'
+    ExportManager.export_to_json(corpus, output, archive_version=2, compression='')
+    archive = json.loads(output.read_text(encoding='utf-8'))
+    assert '+' in archive['files'][0]
+    assert [comparable(r) for r in archive_records(archive)] == source_records(corpus)
+
+
+def test_v2_string_table_introduces_each_string_once(corpus, tmp_path):
+    output = tmp_path / 'compact.json'
+    ExportManager.export_to_json(corpus, output, archive_version=2, compression='')
+    archive = json.loads(output.read_text(encoding='utf-8'))
+    introduced = [s for record in archive['files'] for s in record.get('+', [])]
+    assert len(introduced) == len(set(introduced))
+    assert len(introduced) < 3 * len(archive['files'])  # versions, dates and categories repeat
+
+
+def test_v2_keeps_one_body_copy_and_is_smaller(corpus, tmp_path):
+    v1, v2 = tmp_path / 'v1.json', tmp_path / 'v2.json'
+    ExportManager.export_to_json(corpus, v1, archive_version=1, compression='')
+    ExportManager.export_to_json(corpus, v2, archive_version=2, compression='')
+    for record in json.loads(v2.read_text(encoding='utf-8'))['files']:
+        for heading, start, end in record['sections']:
+            assert 0 <= start <= end <= len(record['markdown'])
+    assert v2.stat().st_size < v1.stat().st_size
@@ -0,0 +1,74 @@
+"""
+tests/test_archive_index.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Indexed archives - footer listing, mmap random access, selective import
+Project: SIMA
+
+ADDED: IndexedArchive access, empty and non-indexed archives, list_archive, selective import
+"""
+
+import pytest
+
+from conftest import comparable, read_all, source_records
+from modules.archive_index import IndexedArchive
+from modules.managers import ExportManager
+
+
+@pytest.mark.parametrize('version', (1, 2))
+def test_indexed_archive_random_access(corpus, tmp_path, indexed, version):
+    output = tmp_path / 'indexed.json'
+    ExportManager.export_to_json(corpus, output, archive_version=version, compression='')
+    expected = {r['path']: r for r in source_records(corpus)}
+    with IndexedArchive(output) as archive:
+        assert len(archive) == len(expected)
+        listing = archive.listing(offset=2, limit=3)
+        assert [entry['path'] for entry in listing] == sorted(expected)[2:5]
+        last = sorted(expected)[-1]
+        assert comparable(archive.get(last)) == expected[last]
+        picked = [comparable(r) for r in archive.records([last, 'missing.md', sorted(expected)[0]])]
+        assert picked == [expected[last], expected[sorted(expected)[0]]]
+        with pytest.raises(KeyError):
+            archive.get('missing.md')
+
+
+def test_empty_archive_round_trip(tmp_path, indexed):
+    output = tmp_path / 'empty.json'
+    manifest = ExportManager.export_files([], output, archive_version=2, compression='')
+    assert manifest['file_count'] == 0
+    assert read_all(output)[0] == []
+    with IndexedArchive(output) as archive:
+        assert len(archive) == 0
+
+
+def test_archives_without_a_footer_are_rejected(corpus, tmp_path):
+    output = tmp_path / 'plain.json'
+    ExportManager.export_to_json(corpus, output, compression='')
+    assert not IndexedArchive.is_indexed(output)
+    with pytest.raises(ValueError):
+        IndexedArchive(output)
+    (tmp_path / 'empty.json').write_bytes(b'')
+    with pytest.raises(ValueError):
+        IndexedArchive(tmp_path / 'empty.json')
+
+
+@pytest.mark.parametrize('with_footer', (True, False))
+def test_list_archive_pages_match_with_or_without_a_footer(corpus, tmp_path, monkeypatch, with_footer):
+    from modules.config import Config
+    monkeypatch.setattr(Config, 'EXPORT_INDEXED', with_footer)
+    output = tmp_path / 'out.json'
+    ExportManager.export_to_json(corpus, output, archive_version=2, compression='')
+    page = ExportManager.list_archive(output, offset=1, limit=4)
+    assert page['indexed'] is with_footer
+    assert page['total'] == len(source_records(corpus))
+    assert [entry['path'] for entry in page['files']] == [r['path'] for r in source_records(corpus)][1:5]
+
+
+def test_selective_import_from_indexed_archive(corpus, tmp_path, indexed):
+    output = tmp_path / 'out.json'
+    ExportManager.export_to_json(corpus, output, archive_version=2, compression='')
+    with IndexedArchive(output) as archive:
+        wanted = [entry[0] for entry in archive.entries[:2]]
+    imported = ExportManager.import_from_json(output, tmp_path / 'target', paths=wanted)
+    assert sorted(imported) == sorted(str(tmp_path / 'target' / p) for p in wanted)
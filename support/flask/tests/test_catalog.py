@@ -0,0 +1,138 @@
+"""
+tests/test_catalog.py
+
+Version: 1.1.0
+Date: 2026-10-18
+Purpose: SQLite catalog - refresh, removals and faceted queries
+Project: SIMA
+
+ADDED: Deleted directories leave the catalog (directly and through the watcher)
+ADDED: Incremental refresh, filters/facets/sort/pages, CRLF files, /api/query and 304s
+"""
+
+import os
+import shutil
+
+import pytest
+
+from modules.cache import PARSE_CACHE
+from modules.catalog import Catalog
+from modules.config import Config
+from modules.watcher import KnowledgeWatcher
+
+def paths(catalog, **filters):
+    return sorted(r['path'] for r in catalog.query(filters, limit=1000)['results'])
+
+@pytest.fixture
+def catalog_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'CATALOG_FILE', tmp_path / 'catalog.sqlite3')
+    return Config.CATALOG_FILE
+
+@pytest.fixture
+def catalog(corpus, catalog_file):
+    catalog = Catalog(catalog_file, corpus)
+    catalog.refresh(force=True)
+    yield catalog
+    catalog.close()
+
+
+def test_remove_tree_drops_only_that_directory(corpus, catalog):
+    before = paths(catalog)
+    lessons = corpus / 'generic' / 'lessons'
+    shutil.rmtree(lessons)
+    catalog.remove_tree(lessons)
+    after = paths(catalog)
+    assert after == [p for p in before if not p.startswith(str(lessons) + '/')]
+    assert len(after) < len(before)
+
+
+def test_remove_tree_escapes_like_wildcards(tmp_path, catalog_file):
+    root = tmp_path / 'kb'
+    for directory in ('a_b', 'axb'):
+        (root / directory).mkdir(parents=True)
+        (root / directory / 'f.md').write_text('# F\n', encoding='utf-8')
+    catalog = Catalog(catalog_file, root)
+    catalog.refresh(force=True)
+    catalog.remove_tree(root / 'a_b')
+    assert paths(catalog) == [str(root / 'axb' / 'f.md')]
+    catalog.close()
+
+
+def test_watcher_batch_with_a_deleted_directory(corpus, catalog_file):
+    watcher = KnowledgeWatcher(corpus)
+    catalog = watcher._indexes()[2]
+    catalog.refresh(force=True)
+    decisions = corpus / 'generic' / 'decisions'
+    shutil.rmtree(decisions)
+    added = corpus / 'generic' / 'added.md'
+    added.write_text('# Added\n**REF-ID:** DEC-99\n', encoding='utf-8')
+
+    batch = watcher.apply({str(decisions), str(added)})
+    assert batch['files_updated'] == 1
+    remaining = paths(catalog)
+    assert str(added) in remaining
+    assert not [p for p in remaining if p.startswith(str(decisions) + '/')]
+
+
+def test_refresh_reads_only_changed_files(corpus, catalog):
+    files = sorted(p for p in corpus.rglob('*.md') if '-Index' not in p.name and '-Router' not in p.name
+                   and 'Master-Index' not in p.name)
+    assert catalog.query(limit=0)['total'] == len(files)
+    st = files[0].stat()
+    os.utime(files[0], ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+    files[1].write_text(files[1].read_text(encoding='utf-8') + '\nmore\n', encoding='utf-8')
+    files[2].unlink()
+    assert catalog.refresh(force=True) == {'added': 0, 'updated': 1, 'touched': 1, 'removed': 1}
+    assert catalog.refresh(force=True) == {'added': 0, 'updated': 0, 'touched': 0, 'removed': 0}
+
+
+def test_filters_facets_sort_and_pages(catalog):
+    everything = catalog.query(limit=1000)
+    lessons = catalog.query({'category': ['Lessons']}, limit=1000)
+    assert lessons['total'] == everything['facets']['category']['Lessons']
+    assert {r['category'] for r in lessons['results']} == {'Lessons'}
+
+    python = catalog.query({'language': ['python']}, facets=['language'])
+    assert python['total'] == everything['facets']['language']['python']
+    assert python['facets']['language']['python'] == python['total']
+
+    by_lines = catalog.query(sort='-line_count', limit=1000)['results']
+    assert [r['line_count'] for r in by_lines] == sorted((r['line_count'] for r in by_lines), reverse=True)
+    page = catalog.query(limit=5, offset=5)
+    assert [r['path'] for r in page['results']] == [r['path'] for r in everything['results']][5:10]
+
+    assert catalog.query({'prefix': ['generic/lessons'], 'has_ref_id': ['true']})['total'] == \
+        everything['facets']['ref_type']['LESS']
+    with pytest.raises(ValueError):
+        catalog.query(sort='nope')
+    with pytest.raises(ValueError):
+        catalog.query({'has_ref_id': ['maybe']})
+
+
+def test_crlf_file_is_cached_like_read_text(tmp_path, catalog_file):
+    root = tmp_path / 'crlf'
+    root.mkdir()
+    path = root / 'LESS-09.md'
+    path.write_bytes(b"# Title\r\n**REF-ID:** LESS-09\r\n\r\n## Body\r\n\r\n## Second\r\ntext\r\n")
+    catalog = Catalog(catalog_file, root)
+    catalog.refresh(force=True)
+    assert catalog.query()['results'][0]['title'] == 'Title'
+
+    cached = PARSE_CACHE.get(path)
+    assert cached.title == 'Title'
+    assert cached.extract_sections() == [{'heading': 'Body', 'content': ''}, {'heading': 'Second', 'content': 'text\n'}]
+    catalog.close()
+
+
+def test_api_query_and_conditional_get(client):
+    response = client.get('/api/query?category=Decisions&facets=ref_type&limit=2')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['total'] == sum(body['facets']['ref_type'].values())
+    assert len(body['results']) == 2 and set(body['facets']) == {'ref_type'}
+
+    again = client.get('/api/query?category=Decisions&facets=ref_type&limit=2',
+                       headers={'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 304
+    assert client.get('/api/query?sort=nope').status_code == 400
+    assert client.get('/api/query?path=/no/such/dir').status_code == 404
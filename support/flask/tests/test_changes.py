@@ -0,0 +1,120 @@
+"""
+tests/test_changes.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Git change source for delta exports, index state and validation
+Project: SIMA
+
+ADDED: changes()/state()/changes_since(), relative roots, revision checks, consumers
+"""
+
+from pathlib import Path
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from modules.changes import GitChangeSource, change_source
+from modules.config import Config
+from modules.delta import load_manifest
+from modules.indexes import IndexGenerator
+from modules.managers import ExportManager
+from modules.validation import Validator
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason='git is not installed')
+
+def git(root, *args):
+    subprocess.run(['git', '-C', str(root), *args], check=True, capture_output=True,
+                   env=dict(os.environ, GIT_AUTHOR_NAME='t', GIT_AUTHOR_EMAIL='t@example.com',
+                            GIT_COMMITTER_NAME='t', GIT_COMMITTER_EMAIL='t@example.com'))
+
+@pytest.fixture
+def repo(corpus, monkeypatch):
+    """corpus committed to a fresh repository, with the git change source enabled"""
+    git(corpus, 'init', '-q')
+    git(corpus, 'add', '-A')
+    git(corpus, 'commit', '-q', '-m', 'initial')
+    monkeypatch.setattr(Config, 'CHANGE_SOURCE', 'git')
+    return corpus
+
+def knowledge_files(root):
+    return sorted(p for p in root.rglob('*.md') if '.git' not in p.parts
+                  and not p.name.endswith(('-Index.md', '-Router.md', 'Master-Index-of-Indexes.md')))
+
+
+def test_changes_against_head(repo):
+    files = knowledge_files(repo)
+    files[0].write_text('# Edited\n', encoding='utf-8')
+    files[1].unlink()
+    (repo / 'new.md').write_text('# New\n', encoding='utf-8')
+    (repo / 'notes.txt').write_text('ignored: not markdown', encoding='utf-8')
+
+    changes = GitChangeSource(repo).changes()
+    assert changes == {'changed': sorted([str(files[0]), str(repo / 'new.md')]), 'deleted': [str(files[1])]}
+
+
+def test_changes_since_includes_reverted_dirty_files(repo):
+    source = GitChangeSource(repo)
+    path = knowledge_files(repo)[0]
+    original = path.read_text(encoding='utf-8')
+    path.write_text('# Dirty\n', encoding='utf-8')
+    state = source.state()
+    assert state['dirty'] == [path.relative_to(repo).as_posix()]
+    path.write_text(original, encoding='utf-8')
+    assert source.changes_since(state) == {'changed': [str(path)], 'deleted': []}
+    assert source.changes_since({'commit': '0' * 40}) is None
+
+
+def test_resolve_rejects_options_and_unknown_revisions(repo):
+    source = GitChangeSource(repo)
+    assert source.resolve('HEAD') == source.head()
+    for rev in ('--output=/tmp/x', 'no-such-branch', ''):
+        with pytest.raises(ValueError):
+            source.resolve(rev)
+
+
+def test_walk_mode_and_non_repositories_have_no_source(corpus, tmp_path):
+    assert change_source(corpus, 'walk') is None
+    assert change_source(tmp_path, 'git') is None
+
+
+def test_git_delta_export_with_a_relative_root(repo, tmp_path, monkeypatch):
+    monkeypatch.chdir(repo.parent)
+    root = Path(repo.name)
+    ExportManager.export_to_json(root, tmp_path / 'base.json')
+    assert load_manifest(tmp_path / 'base.json')['git']['commit']
+
+    files = knowledge_files(repo)
+    files[0].write_text(files[0].read_text(encoding='utf-8') + '\nmore\n', encoding='utf-8')
+    files[1].unlink()
+    delta = ExportManager.export_to_json(root, tmp_path / 'delta.json', base=tmp_path / 'base.json')
+    assert delta['file_count'] == 1
+    assert delta['deleted'] == [str(files[1].relative_to(repo))]
+    assert str(files[0].relative_to(repo)) in delta['checksums']
+
+
+def test_index_state_visits_only_changed_files(repo):
+    directory = knowledge_files(repo)[0].parent
+    IndexGenerator.write_index(directory, force=True)
+    git(repo, 'add', '-A')
+    git(repo, 'commit', '-q', '-m', 'indexes')
+    IndexGenerator.write_index(directory)
+
+    files = [p for p in knowledge_files(repo) if p.parent == directory]
+    files[0].write_text(files[0].read_text(encoding='utf-8') + '\nmore\n', encoding='utf-8')
+    state = IndexGenerator.read_state(IndexGenerator.state_path(IndexGenerator.index_path(directory)))
+    changes = GitChangeSource(repo).changes_since(state['git'])
+    records, stats = IndexGenerator.collect(directory, state['files'], changes)
+    assert stats == {'unchanged': len(files) - 1, 'touched': 0, 'parsed': 1, 'removed': 0}
+
+
+def test_validation_checks_changed_files_only(repo):
+    path = knowledge_files(repo)[0]
+    path.write_text('# No header\n', encoding='utf-8')
+    result = Validator.validate(repo)
+    assert result['source'] == 'git-changes' and result['checked'] == 1
+    assert [f['path'] for f in result['failed']] == [str(path)]
+    with pytest.raises(ValueError):
+        Validator.validate(repo, since='--no-index')
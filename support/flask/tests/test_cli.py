@@ -0,0 +1,94 @@
+"""
+tests/test_cli.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Headless CLI and KnowledgeBase library API
+Project: SIMA
+
+ADDED: No Flask import, export/import round trip, NDJSON progress and analyze output, exit codes, KnowledgeBase
+"""
+
+from pathlib import Path
+import json
+import subprocess
+import sys
+
+import pytest
+
+from modules.browser import FileBrowser
+from modules.indexes import is_navigation_file
+from modules.kb import KnowledgeBase
+from sima_cli import EXIT_FAILED, EXIT_OK, EXIT_USAGE, main
+
+FLASK_DIR = Path(__file__).resolve().parents[1]
+
+def run(capsys, *argv):
+    """(exit code, stdout documents, stderr documents)"""
+    status = main([str(a) for a in argv])
+    out, err = capsys.readouterr()
+    parse = lambda text: [json.loads(line) for line in text.splitlines() if line.startswith('{')]
+    return status, parse(out), parse(err)
+
+def files_of(root):
+    return {str(p.relative_to(root)): p.read_text(encoding='utf-8') for p in FileBrowser.walk_markdown(root)}
+
+
+def test_cli_does_not_import_flask(corpus):
+    script = ('import sys, sima_cli; status = sima_cli.main(["tree", sys.argv[1], "--depth", "0"]); '
+              'sys.exit(status or ("flask" in sys.modules and 3))')
+    proc = subprocess.run([sys.executable, '-c', script, str(corpus)], cwd=FLASK_DIR, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert json.loads(proc.stdout)['path'] == str(corpus)
+
+
+def test_export_then_import_round_trip(capsys, corpus, tmp_path, saved_config):
+    archive = tmp_path / 'out.json'
+    status, out, err = run(capsys, 'export', corpus, '-o', archive, '--format', 2, '--progress',
+                           '--progress-interval', 0)
+    assert status == EXIT_OK and out[0]['file_count'] == len(files_of(corpus))
+    assert err[-1]['event'] == 'progress' and err[-1]['done'] == out[0]['file_count']
+
+    status, out, _ = run(capsys, 'import', archive, '--target', tmp_path / 'target')
+    assert status == EXIT_OK and out[0]['imported_count'] == len(files_of(corpus))
+    assert files_of(tmp_path / 'target').keys() == files_of(corpus).keys()
+
+
+def test_analyze_streams_one_line_per_file(capsys, corpus, tmp_path, saved_config):
+    status, out, _ = run(capsys, 'analyze', corpus / 'generic', '--glob', '**/LESS-*.md')
+    assert status == EXIT_OK and out and all(Path(r['path']).name.startswith('LESS-') for r in out)
+    status, out, _ = run(capsys, 'analyze', tmp_path / 'missing.md')
+    assert status == EXIT_FAILED and 'error' in out[0]
+
+
+def test_usage_and_operation_errors(capsys, corpus, tmp_path, saved_config):
+    assert run(capsys, 'tree', corpus, '--set', 'TREE_PAGE_SIZE')[0] == EXIT_USAGE
+    assert run(capsys, 'tree', corpus, '--set', 'NO_SUCH=1')[0] == EXIT_USAGE
+    status, out, _ = run(capsys, 'export', corpus, '-o', tmp_path / 'x.json', '--base', tmp_path / 'nope.json')
+    assert status == EXIT_FAILED and out[0]['status'] == 'error'
+    assert not (tmp_path / 'x.json').exists()
+
+
+def test_validate_exit_code_follows_the_result(capsys, corpus, saved_config):
+    status, out, _ = run(capsys, 'validate', corpus, '--all')
+    assert out[0]['checked'] == len([p for p in files_of(corpus) if not is_navigation_file(Path(p).name)])
+    assert status == (EXIT_FAILED if out[0]['failed'] else EXIT_OK)
+
+
+def test_knowledge_base_parallel_analysis_matches_serial(corpus, monkeypatch):
+    from modules.config import Config
+    monkeypatch.setattr(Config, 'EXPORT_CHUNK_SIZE', 4)
+    serial = list(KnowledgeBase(corpus, jobs=1).analyze_many([corpus]))
+    parallel = list(KnowledgeBase(corpus, jobs=2).analyze_many([corpus]))
+    assert parallel == serial
+    unordered = list(KnowledgeBase(corpus, jobs=2).analyze_many([corpus], ordered=False))
+    assert sorted(r['path'] for r in unordered) == sorted(r['path'] for r in serial)
+
+
+def test_knowledge_base_defaults_to_its_root(corpus, tmp_path):
+    kb = KnowledgeBase(corpus, jobs=1)
+    assert kb.tree(depth=0)['path'] == str(corpus)
+    result = kb.export(tmp_path / 'kb.json')
+    assert result['file_count'] == len(files_of(corpus))
+    with pytest.raises(OSError):
+        kb.analyze(tmp_path / 'missing.md')
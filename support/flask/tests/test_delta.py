@@ -0,0 +1,172 @@
+"""
+tests/test_delta.py
+
+Version: 1.0.1
+Date: 2026-10-18
+Purpose: Delta exports and import chains (checksums, tombstones, base checks)
+Project: SIMA
+
+ADDED: Change detection, tombstones, chained imports, mismatched-base rollback
+ADDED: Sidecar names per compression, manifests read from the archive, deltas of deltas
+"""
+
+import hashlib
+import os
+
+import pytest
+
+from modules.browser import FileBrowser
+from modules.delta import ChangeTracker, load_manifest, manifest_path
+from modules.managers import ExportManager
+
+def files_of(root):
+    return {str(p.relative_to(root)): p.read_text(encoding='utf-8') for p in FileBrowser.walk_markdown(root)}
+
+def bump_mtime(path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+
+@pytest.fixture
+def knowledge(corpus):
+    """(root, sorted knowledge file paths relative to root) - navigation files excluded"""
+    rel = sorted(p for p in files_of(corpus) if not p.endswith(('-Index.md', '-Router.md', 'Master-Index-of-Indexes.md')))
+    return corpus, rel
+
+
+def test_full_export_checksums_are_content_digests(knowledge, tmp_path):
+    root, _ = knowledge
+    manifest = ExportManager.export_to_json(root, tmp_path / 'base.json')
+    for rel, (digest, mtime_ns, size) in manifest['checksums'].items():
+        data = (root / rel).read_bytes()
+        assert digest == hashlib.sha1(data).hexdigest()
+        assert size == len(data)
+    assert load_manifest(manifest_path(tmp_path / 'base.json'))['checksums'] == manifest['checksums']
+    assert 'deleted' not in manifest
+
+
+def test_delta_exports_only_changes_and_records_tombstones(knowledge, tmp_path):
+    root, rel = knowledge
+    ExportManager.export_to_json(root, tmp_path / 'base.json')
+
+    modified, touched, deleted = root / rel[0], root / rel[1], root / rel[2]
+    modified.write_text(modified.read_text(encoding='utf-8') + '\nmore\n', encoding='utf-8')
+    bump_mtime(touched)  # new mtime, same bytes: not exported
+    deleted.unlink()
+    (root / 'added.md').write_text('# Added\n', encoding='utf-8')
+
+    delta = ExportManager.export_to_json(root, tmp_path / 'delta.json', base=tmp_path / 'base.json')
+    base = load_manifest(tmp_path / 'base.json')
+    assert delta['base_id'] == base['archive_id']
+    assert delta['deleted'] == [rel[2]]
+    assert delta['file_count'] == 2
+    with_bytes = {p: hashlib.sha1((root / p).read_bytes()).hexdigest() for p in (rel[0], 'added.md')}
+    assert {p: delta['checksums'][p][0] for p in with_bytes} == with_bytes
+    assert delta['checksums'][rel[1]][1] == touched.stat().st_mtime_ns
+    assert rel[2] not in delta['checksums']
+
+
+def test_unchanged_tree_gives_an_empty_delta(knowledge, tmp_path):
+    root, _ = knowledge
+    base = ExportManager.export_to_json(root, tmp_path / 'base.json')
+    delta = ExportManager.export_to_json(root, tmp_path / 'delta.json', base=tmp_path / 'base.json')
+    assert delta['file_count'] == 0 and delta['deleted'] == []
+    assert delta['checksums'] == base['checksums']
+
+
+
+@pytest.mark.parametrize('name', ['out.json', 'out.json.gz', 'out.json.xz'])
+def test_manifest_sidecar_is_shared_by_every_compression(name, tmp_path):
+    assert manifest_path(tmp_path / name) == tmp_path / 'out.manifest.json'
+
+
+def test_manifest_is_read_from_the_archive_without_a_sidecar(knowledge, tmp_path):
+    root, _ = knowledge
+    manifest = ExportManager.export_to_json(root, tmp_path / 'base.json.gz', compression='gzip')
+    manifest_path(tmp_path / 'base.json.gz').unlink()
+    assert load_manifest(tmp_path / 'base.json.gz')['checksums'] == manifest['checksums']
+
+
+def test_delta_of_a_delta_is_against_the_newer_state(knowledge, tmp_path):
+    root, rel = knowledge
+    ExportManager.export_to_json(root, tmp_path / 'base.json')
+    (root / rel[0]).write_text('# Changed once\n', encoding='utf-8')
+    first = ExportManager.export_to_json(root, tmp_path / 'd1.json', base=tmp_path / 'base.json')
+    (root / rel[1]).write_text('# Changed twice\n', encoding='utf-8')
+    second = ExportManager.export_to_json(root, tmp_path / 'd2.json', base=manifest_path(tmp_path / 'd1.json'))
+    assert second['base_id'] == first['archive_id']
+    assert second['file_count'] == 1
+
+
+def test_tracker_does_not_open_files_without_a_base(tmp_path):
+    missing = tmp_path / 'never-created.md'
+    tracker = ChangeTracker()
+    assert list(tracker.filter([(missing, 'never-created.md')])) == [(missing, 'never-created.md')]
+    assert tracker.final_fields() == {'checksums': {}}
+
+
+def test_base_without_checksums_is_rejected():
+    with pytest.raises(ValueError):
+        ChangeTracker({'archive_id': 'x'})
+
+
+def test_chain_applies_newest_version_and_tombstones(knowledge, tmp_path):
+    root, rel = knowledge
+    ExportManager.export_to_json(root, tmp_path / '1.json')
+    (root / rel[0]).write_text('# First edit\n', encoding='utf-8')
+    (root / rel[1]).unlink()
+    ExportManager.export_to_json(root, tmp_path / '2.json', base=tmp_path / '1.json')
+    (root / rel[0]).write_text('# Second edit\n', encoding='utf-8')
+    (root / rel[1]).write_text('# Re-added\n', encoding='utf-8')
+    (root / rel[2]).unlink()
+    ExportManager.export_to_json(root, tmp_path / '3.json', base=tmp_path / '2.json')
+
+    chain = [tmp_path / f'{n}.json' for n in (1, 2, 3)]
+    ExportManager.import_chain(chain, tmp_path / 'fresh')
+    ExportManager.import_from_json(tmp_path / '1.json', tmp_path / 'reference')
+    expected = ExportManager.import_from_json(tmp_path / '3.json', tmp_path / 'reference')
+
+    result = files_of(tmp_path / 'fresh')
+    assert result == {p: t for p, t in files_of(tmp_path / 'reference').items() if p != rel[2]}
+    assert rel[2] not in result and rel[1] in result
+    assert 'Second edit' in result[rel[0]]
+    assert len(expected) == 2
+
+
+def test_chain_deletes_files_from_an_existing_target(knowledge, tmp_path):
+    root, rel = knowledge
+    ExportManager.export_to_json(root, tmp_path / 'base.json')
+    ExportManager.import_from_json(tmp_path / 'base.json', tmp_path / 'target')
+    (root / rel[0]).unlink()
+    ExportManager.export_to_json(root, tmp_path / 'delta.json', base=tmp_path / 'base.json')
+
+    result = ExportManager.import_chain([tmp_path / 'delta.json'], tmp_path / 'target')
+    assert result['imported'] == []
+    assert result['deleted'] == [str(tmp_path / 'target' / rel[0])]
+    assert not (tmp_path / 'target' / rel[0]).exists()
+
+
+def test_mismatched_base_rolls_back_the_whole_chain(knowledge, tmp_path):
+    root, rel = knowledge
+    ExportManager.export_to_json(root, tmp_path / 'a.json')
+    ExportManager.export_to_json(root, tmp_path / 'other.json')
+    (root / rel[0]).write_text('# Changed\n', encoding='utf-8')
+    ExportManager.export_to_json(root, tmp_path / 'delta.json', base=tmp_path / 'other.json')
+
+    with pytest.raises(ValueError):
+        ExportManager.import_chain([tmp_path / 'a.json', tmp_path / 'delta.json'], tmp_path / 'target')
+    assert files_of(tmp_path / 'target') == {}
+
+
+def test_tombstone_outside_the_target_is_skipped(tmp_path):
+    from modules.archive import new_manifest, open_archive_output
+    from modules.archive_writer import open_writer
+    outside = tmp_path / 'outside.md'
+    outside.write_text('keep', encoding='utf-8')
+    archive = tmp_path / 'evil.json'
+    with open_archive_output(archive) as stream:
+        writer = open_writer(stream, new_manifest(base_id='x'), indexed=True)
+        writer.close(checksums={}, deleted=['../outside.md'])
+
+    result = ExportManager.import_chain([archive], tmp_path / 'target')
+    assert result['deleted'] == []
+    assert outside.read_text(encoding='utf-8') == 'keep'
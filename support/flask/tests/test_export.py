@@ -0,0 +1,57 @@
+"""
+tests/test_export.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Streaming export writer - one record at a time, file_count patched or appended
+Project: SIMA
+
+ADDED: Plain v1 output, file_count on seekable and unseekable streams, export_files from an iterator
+"""
+
+import io
+import json
+
+from conftest import comparable, read_all, source_records
+from modules.archive import archive_records, new_manifest
+from modules.archive_writer import open_writer
+from modules.browser import FileBrowser
+from modules.managers import ExportManager
+
+
+def test_v1_layout_is_plain_json(corpus, tmp_path):
+    output = tmp_path / 'plain.json'
+    ExportManager.export_to_json(corpus, output, archive_version=1, compression='')
+    archive = json.loads(output.read_text(encoding='utf-8'))
+    assert archive['manifest']['file_count'] == len(archive['files'])
+    assert [comparable(r) for r in archive_records(archive)] == source_records(corpus)
+
+
+def test_seekable_stream_patches_file_count():
+    stream = io.BytesIO()
+    writer = open_writer(stream, new_manifest(), archive_version=1)
+    for n in range(3):
+        writer.write_file({'path': f'{n}.md', 'ref_id': f'DEC-0{n}', 'title': str(n)})
+    manifest = writer.close()
+    archive = json.loads(stream.getvalue().decode('utf-8'))
+    assert archive['manifest']['file_count'] == manifest['file_count'] == 3
+    assert 'file_count' not in archive
+
+
+def test_unseekable_stream_appends_file_count():
+    stream = io.BytesIO()
+    writer = open_writer(stream, new_manifest(), archive_version=1, compressed=True)
+    writer.write_file({'path': 'a.md', 'ref_id': 'DEC-01', 'title': 'A'})
+    manifest = writer.close(checksums={'a.md': ['x', 1, 2]})
+    archive = json.loads(stream.getvalue().decode('utf-8'))
+    assert archive['file_count'] == manifest['file_count'] == 1
+    assert archive['checksums'] == {'a.md': ['x', 1, 2]}
+
+
+def test_export_files_consumes_a_generator(corpus, tmp_path):
+    output = tmp_path / 'selected.json'
+    files = ((p, str(p.relative_to(corpus))) for p in FileBrowser.walk_markdown(corpus))
+    manifest = ExportManager.export_files(files, output, archive_version=1, compression='')
+    records, read_manifest = read_all(output)
+    assert records == source_records(corpus)
+    assert manifest['file_count'] == read_manifest['file_count'] == len(records)
@@ -0,0 +1,142 @@
+"""
+tests/test_hierarchy.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Whole-hierarchy rebuild of indexes, master indexes and routers
+Project: SIMA
+
+ADDED: Hand-written files kept, dry runs, stable reruns, new-index rules, titles, the repository's own tree
+"""
+
+from pathlib import Path
+import shutil
+
+import pytest
+
+from conftest import REPO_ROOT
+from modules.hierarchy import HierarchyBuilder
+from modules.indexes import GENERATED_MARKER, differs, heading
+
+NAVIGATION = ('-Index.md', '-Router.md', 'Master-Index-of-Indexes.md')
+
+def knowledge_file(path, ref_id, title=None, category='Lessons'):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"# {title or ref_id}\n\n**Version:** 1.0.0\n**Category:** {category}\n**REF-ID:** {ref_id}\n"
+                    f"**Purpose:** Test file\n\n---\n\n## Body\n\ntext\n", encoding='utf-8')
+    return path
+
+def generated(path, title):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"# {title}\n\n{GENERATED_MARKER}\n", encoding='utf-8')
+    return path
+
+def navigation_files(root):
+    return sorted(str(p) for p in root.rglob('*.md') if p.name.endswith(NAVIGATION))
+
+def snapshot(root):
+    return {str(p): p.read_bytes() for p in sorted(root.rglob('*')) if p.is_file()}
+
+@pytest.fixture
+def repository_tree(tmp_path):
+    """Copy of the repository's own knowledge tree (tooling, git data and backlog files left out)"""
+    root = tmp_path / 'sima'
+    shutil.copytree(REPO_ROOT, root, ignore=shutil.ignore_patterns('.git', 'support', '*.patch', '*.jsonl'))
+    return root
+
+
+def test_rebuild_keeps_hand_written_navigation(corpus):
+    hand_written = navigation_files(corpus)
+    before = {p: open(p, encoding='utf-8').read() for p in hand_written}
+
+    summary = HierarchyBuilder.rebuild(corpus, workers=1)
+    assert sorted(summary['skipped']) == hand_written
+    assert {p: open(p, encoding='utf-8').read() for p in hand_written} == before
+
+
+def test_rebuild_dry_run_writes_nothing(corpus):
+    before = snapshot(corpus)
+    summary = HierarchyBuilder.rebuild(corpus, workers=1, force=True, dry_run=True)
+    assert summary['dry_run'] and summary['written']
+    assert snapshot(corpus) == before
+
+
+def test_forced_rebuild_is_stable(corpus):
+    first = HierarchyBuilder.rebuild(corpus, workers=1, force=True)
+    assert first['written'] and not first['skipped']
+    second = HierarchyBuilder.rebuild(corpus, workers=1)
+    assert second['written'] == [] and second['skipped'] == []
+    assert second['parsed'] == 0
+
+
+def test_parallel_rebuild_matches_serial(corpus, tmp_path):
+    other = tmp_path / 'other'
+    shutil.copytree(corpus, other)
+    serial = HierarchyBuilder.rebuild(corpus, workers=1, force=True)
+    parallel = HierarchyBuilder.rebuild(other, workers=2, force=True)
+    assert [Path(p).relative_to(corpus) for p in serial['written']] == \
+        [Path(p).relative_to(other) for p in parallel['written']]
+    for path in serial['written']:
+        twin = other / Path(path).relative_to(corpus)
+        assert not differs(twin, Path(path).read_text(encoding='utf-8'))
+
+
+def test_forced_rebuild_keeps_titles_and_links_by_title(corpus):
+    HierarchyBuilder.rebuild(corpus, workers=1, force=True)
+    lessons = corpus / 'generic' / 'lessons' / 'lessons-Index.md'
+    assert heading(lessons, None) == 'lessons Index'
+    master = (corpus / 'SIMA-Master-Index-of-Indexes.md').read_text(encoding='utf-8')
+    assert master.startswith('# Master Index\n')
+    assert '- [lessons Index](generic/lessons/lessons-Index.md) - ' in master
+    assert (corpus / 'SIMA-Router.md').read_text(encoding='utf-8').startswith('# Router\n')
+    index = lessons.read_text(encoding='utf-8')
+    first = sorted(p for p in lessons.parent.glob('LESS-*.md'))[0]
+    assert f"[{heading(first, None)}]({first.name})" in index
+
+
+def test_no_new_index_for_the_root_or_covered_directories(corpus):
+    knowledge_file(corpus / 'AP-05-Root-Level.md', 'AP-05')
+    knowledge_file(corpus / 'generic' / 'new-topic' / 'NEW-01.md', 'NEW-01')
+    summary = HierarchyBuilder.rebuild(corpus, workers=1)
+    assert summary['written'] == []
+    assert not (corpus / f'{corpus.name}-Index.md').exists()
+    assert not (corpus / 'generic' / 'new-topic' / 'new-topic-Index.md').exists()
+
+
+def test_uncovered_directory_gets_a_titled_index(tmp_path):
+    root = tmp_path / 'kb'
+    knowledge_file(root / 'root-file.md', 'ROOT-01')
+    knowledge_file(root / 'notes' / 'deep' / 'NOTE-01.md', 'NOTE-01', title='NOTE-01: First note')
+    knowledge_file(root / 'listed' / 'LESS-01.md', 'LESS-01')
+    generated(root / 'listed' / 'listed-Index.md', 'Listed Lessons')
+    knowledge_file(root / 'routed' / 'sub' / 'DEC-01.md', 'DEC-01')
+    (root / 'routed' / 'routed-Router.md').write_text('# Routed\n', encoding='utf-8')
+
+    summary = HierarchyBuilder.rebuild(root, workers=1)
+    new_index = root / 'notes' / 'deep' / 'deep-Index.md'
+    assert sorted(summary['written']) == sorted([str(new_index), str(root / 'listed' / 'listed-Index.md')])
+    assert heading(new_index, None) == 'deep Index'
+    assert '[NOTE-01] [NOTE-01: First note](NOTE-01.md)' in new_index.read_text(encoding='utf-8')
+    assert heading(root / 'listed' / 'listed-Index.md', None) == 'Listed Lessons'
+    assert not (root / 'kb-Index.md').exists()
+    assert not (root / 'routed' / 'sub' / 'sub-Index.md').exists()
+    assert summary['skipped'] == [str(root / 'routed' / 'routed-Router.md')]
+
+
+def test_repository_tree_is_left_as_written(repository_tree):
+    """The repository's navigation files are all hand-written: a rebuild must change nothing"""
+    before = snapshot(repository_tree)
+    summary = HierarchyBuilder.rebuild(repository_tree, workers=1)
+    assert summary['written'] == []
+    assert set(summary['skipped']) <= set(navigation_files(repository_tree))
+    assert len(summary['skipped']) > 20
+    assert snapshot(repository_tree) == before
+
+
+def test_forced_rebuild_of_repository_tree_keeps_headings(repository_tree):
+    titles = {p: heading(Path(p), None) for p in navigation_files(repository_tree)}
+    summary = HierarchyBuilder.rebuild(repository_tree, workers=1, force=True)
+    assert not [p for p in summary['written'] if p not in titles]
+    for path in summary['written']:
+        assert heading(Path(path), None) == titles[path]
+    assert str(repository_tree / 'Master-Index-of-Indexes.md') in summary['written']
@@ -0,0 +1,85 @@
+"""
+tests/test_http_cache.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Conditional responses, gzip and Range downloads
+Project: SIMA
+
+ADDED: 304s for tree/analyze until files change, gzip thresholds, precompressed dashboard, Range downloads
+"""
+
+import gzip
+import os
+
+from modules.config import Config
+
+def bump_mtime(path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+
+def some_file(corpus):
+    return next(p for p in sorted(corpus.rglob('*.md')) if '-Index' not in p.name)
+
+
+def test_tree_answers_304_until_a_listed_entry_changes(client, corpus):
+    args = {'path': str(corpus), 'depth': 1}
+    first = client.get('/api/tree', query_string=args)
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and etag.startswith('W/')
+    assert 'no-cache' in first.headers['Cache-Control']
+    again = client.get('/api/tree', query_string=args, headers={'If-None-Match': etag})
+    assert again.status_code == 304 and again.get_data() == b''
+
+    (corpus / 'added.md').write_text('# Added\n', encoding='utf-8')
+    changed = client.get('/api/tree', query_string=args, headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+    assert client.get('/api/tree', query_string=dict(args, depth=2),
+                      headers={'If-None-Match': changed.headers['ETag']}).status_code == 200
+
+
+def test_analyze_revalidates_by_etag_or_date(client, corpus):
+    path = some_file(corpus)
+    first = client.get('/api/analyze', query_string={'path': str(path)})
+    validators = {'If-None-Match': first.headers['ETag']}
+    assert client.get('/api/analyze', query_string={'path': str(path)}, headers=validators).status_code == 304
+    since = {'If-Modified-Since': first.headers['Last-Modified']}
+    assert client.get('/api/analyze', query_string={'path': str(path)}, headers=since).status_code == 304
+    # POST is never answered from the client's copy
+    assert client.post('/api/analyze', json={'path': str(path)}, headers=validators).status_code == 200
+
+    bump_mtime(path)
+    assert client.get('/api/analyze', query_string={'path': str(path)}, headers=validators).status_code == 200
+
+
+def test_json_is_gzipped_above_the_threshold_for_accepting_clients(client, corpus, monkeypatch):
+    args = {'path': str(corpus), 'depth': 3, 'metadata': 'true'}
+    plain = client.get('/api/tree', query_string=args)
+    assert 'Content-Encoding' not in plain.headers and 'Accept-Encoding' in plain.headers['Vary']
+    zipped = client.get('/api/tree', query_string=args, headers={'Accept-Encoding': 'gzip'})
+    assert zipped.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(zipped.get_data()) == plain.get_data()
+    assert zipped.headers['ETag'] == plain.headers['ETag']
+
+    monkeypatch.setattr(Config, 'GZIP_MIN_BYTES', len(plain.get_data()) + 1)
+    small = client.get('/api/tree', query_string=args, headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+
+
+def test_dashboard_is_precompressed_and_conditional(client):
+    page = client.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert page.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(page.get_data()) == client.get('/').get_data()
+    assert client.get('/', headers={'If-None-Match': page.headers['ETag']}).status_code == 304
+
+
+def test_downloads_support_ranges_and_validators(client):
+    archive = Config.EXPORT_DIR / 'sima_export_test.json'
+    archive.write_bytes(b'0123456789' * 10)
+    part = client.get('/download/sima_export_test.json', headers={'Range': 'bytes=10-19'})
+    assert part.status_code == 206 and part.get_data() == b'0123456789'
+    assert part.headers['Content-Range'] == 'bytes 10-19/100'
+    whole = client.get('/download/sima_export_test.json')
+    assert 'Content-Encoding' not in whole.headers and len(whole.get_data()) == 100
+    cached = client.get('/download/sima_export_test.json', headers={'If-None-Match': whole.headers['ETag']})
+    assert cached.status_code == 304
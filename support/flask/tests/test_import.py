@@ -0,0 +1,85 @@
+"""
+tests/test_import.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Streaming import - archives decoded one record at a time and written as they arrive
+Project: SIMA
+
+ADDED: Incremental ArchiveReader, same files imported from every layout, header fields and sections kept
+"""
+
+import io
+
+import pytest
+
+from conftest import LAYOUTS, comparable, source_records
+from modules.archive import ArchiveReader
+from modules.browser import FileBrowser
+from modules.knowledge import KnowledgeFile
+from modules.managers import ExportManager
+
+class CountingStream(io.StringIO):
+    """A text stream that counts the characters read from it"""
+
+    consumed = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.consumed += len(chunk)
+        return chunk
+
+
+def test_reader_yields_the_first_record_before_reading_the_rest(corpus, tmp_path):
+    output = tmp_path / 'out.json'
+    ExportManager.export_to_json(corpus, output, archive_version=1, compression='')
+    text = output.read_text(encoding='utf-8')
+    stream = CountingStream(text)
+    files = ArchiveReader(stream, chunk_size=256).files()
+
+    first = next(files)
+    assert comparable(first) == source_records(corpus)[0]
+    assert stream.consumed < len(text) // 4
+    assert len(list(files)) == len(source_records(corpus)) - 1
+    assert stream.consumed == len(text)
+
+
+def test_reader_rejects_a_truncated_archive(corpus, tmp_path):
+    output = tmp_path / 'out.json'
+    ExportManager.export_to_json(corpus, output, archive_version=1, compression='')
+    text = output.read_text(encoding='utf-8')
+    with pytest.raises(ValueError):
+        list(ArchiveReader(io.StringIO(text[:len(text) // 2]), chunk_size=256).files())
+
+
+@pytest.mark.parametrize('version,compression', LAYOUTS)
+def test_import_writes_the_same_files_for_every_layout(corpus, tmp_path, version, compression):
+    reference = tmp_path / 'reference.json'
+    ExportManager.export_to_json(corpus, reference, archive_version=1, compression='')
+    ExportManager.import_from_json(reference, tmp_path / 'expected')
+
+    output = tmp_path / 'layout.json'
+    ExportManager.export_to_json(corpus, output, archive_version=version, compression=compression)
+    imported = ExportManager.import_from_json(output, tmp_path / 'target')
+
+    expected = {p.relative_to(tmp_path / 'expected'): p.read_text(encoding='utf-8')
+                for p in FileBrowser.walk_markdown(tmp_path / 'expected')}
+    actual = {p.relative_to(tmp_path / 'target'): p.read_text(encoding='utf-8')
+              for p in FileBrowser.walk_markdown(tmp_path / 'target')}
+    assert len(imported) == len(actual) == len(source_records(corpus))
+    assert actual == expected
+
+
+def test_imported_files_keep_header_fields_and_sections(corpus, tmp_path):
+    output = tmp_path / 'out.json'
+    ExportManager.export_to_json(corpus, output, archive_version=2, compression='')
+    ExportManager.import_from_json(output, tmp_path / 'target')
+    for path in FileBrowser.walk_markdown(corpus):
+        if path.name.endswith(('-Index.md', '-Router.md', 'Master-Index-of-Indexes.md')):
+            continue
+        before = KnowledgeFile(path)
+        after = KnowledgeFile(tmp_path / 'target' / path.relative_to(corpus))
+        assert after.metadata['ref_id'] == before.metadata['ref_id']
+        assert after.title == before.title
+        assert [s['heading'] for s in after.sections][:len(before.sections)] == \
+            [s['heading'] for s in before.sections]
@@ -0,0 +1,126 @@
+"""
+tests/test_indexes.py
+
+Version: 1.0.2
+Date: 2026-10-18
+Purpose: Incremental index sidecars and hierarchy rebuilds
+Project: SIMA
+
+ADDED: Sidecar reuse (unchanged/touched/parsed/removed), hand-written file protection, dry runs
+ADDED: CRLF files seed the parse cache with LF text
+MODIFIED: Hierarchy rebuild tests moved to tests/test_hierarchy.py; entries link by title
+"""
+
+import json
+import os
+
+import pytest
+
+from modules.indexes import GENERATED_MARKER, IndexGenerator, is_generated, write_if_changed
+
+def knowledge_file(path, ref_id, purpose='Test file', category='Lessons'):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"# {path.stem}\n\n**Version:** 1.0.0\n**Category:** {category}\n**REF-ID:** {ref_id}\n"
+                    f"**Purpose:** {purpose}\n\n---\n\n## Body\n\n```python\nx = 1\n```\n", encoding='utf-8')
+    return path
+
+def bump_mtime(path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+
+def collect_again(directory):
+    state = IndexGenerator.load_state(IndexGenerator.state_path(IndexGenerator.index_path(directory)))
+    return IndexGenerator.collect(directory, state)
+
+@pytest.fixture
+def lessons(tmp_path):
+    directory = tmp_path / 'lessons'
+    for n in range(1, 4):
+        knowledge_file(directory / f'LESS-0{n}.md', f'LESS-0{n}')
+    knowledge_file(directory / 'sub' / 'LESS-04.md', 'LESS-04')
+    return directory
+
+
+def test_write_index_creates_index_and_sidecar(lessons):
+    index_file, content = IndexGenerator.write_index(lessons, 'Lessons Index')
+    assert index_file == lessons / 'lessons-Index.md'
+    assert index_file.read_text(encoding='utf-8') == content
+    assert content.rstrip().endswith(GENERATED_MARKER)
+    assert '[LESS-04] [LESS-04](sub/LESS-04.md) `python` - Test file' in content
+    state = json.loads(IndexGenerator.state_path(index_file).read_text(encoding='utf-8'))
+    assert sorted(state['files']) == ['LESS-01.md', 'LESS-02.md', 'LESS-03.md', os.path.join('sub', 'LESS-04.md')]
+
+
+def test_unchanged_files_are_not_reopened(lessons):
+    IndexGenerator.write_index(lessons)
+    records, stats = collect_again(lessons)
+    assert stats == {'unchanged': 4, 'touched': 0, 'parsed': 0, 'removed': 0}
+
+
+def test_touched_modified_and_deleted_files(lessons):
+    IndexGenerator.write_index(lessons)
+    bump_mtime(lessons / 'LESS-01.md')
+    knowledge_file(lessons / 'LESS-02.md', 'LESS-02', purpose='Rewritten purpose')
+    (lessons / 'LESS-03.md').unlink()
+
+    records, stats = collect_again(lessons)
+    assert stats == {'unchanged': 1, 'touched': 1, 'parsed': 1, 'removed': 1}
+    assert records['LESS-02.md']['entry']['purpose'] == 'Rewritten purpose'
+
+    _, content = IndexGenerator.write_index(lessons)
+    assert 'Rewritten purpose' in content and 'LESS-03' not in content
+    assert collect_again(lessons)[1] == {'unchanged': 3, 'touched': 0, 'parsed': 0, 'removed': 0}
+
+
+def test_unreadable_sidecar_means_full_rebuild(lessons):
+    index_file, first = IndexGenerator.write_index(lessons)
+    IndexGenerator.state_path(index_file).write_text('{not json', encoding='utf-8')
+    assert collect_again(lessons)[1]['parsed'] == 4
+    _, second = IndexGenerator.write_index(lessons)
+    assert second == first
+
+
+def test_navigation_files_are_not_entries(lessons):
+    (lessons / 'lessons-Router.md').write_text('# Router\n', encoding='utf-8')
+    _, content = IndexGenerator.write_index(lessons)
+    assert 'lessons-Router' not in content and 'lessons-Index' not in content
+
+
+def test_hand_written_index_is_kept_unless_forced(lessons):
+    index_file = IndexGenerator.index_path(lessons)
+    index_file.write_text('# Curated by hand\n', encoding='utf-8')
+    assert not is_generated(index_file)
+    with pytest.raises(FileExistsError):
+        IndexGenerator.write_index(lessons)
+    assert index_file.read_text(encoding='utf-8') == '# Curated by hand\n'
+
+    IndexGenerator.write_index(lessons, force=True)
+    assert is_generated(index_file)
+
+
+def test_entries_link_by_title(tmp_path):
+    path = knowledge_file(tmp_path / 'd' / 'LESS-01.md', 'LESS-01')
+    path.write_text(path.read_text(encoding='utf-8').replace('# LESS-01', '# LESS-01: Titled'), encoding='utf-8')
+    _, content = IndexGenerator.write_index(path.parent)
+    assert '- [LESS-01] [LESS-01: Titled](LESS-01.md) `python` - Test file' in content
+
+
+def test_date_only_changes_are_not_written(tmp_path):
+    path = tmp_path / 'x-Index.md'
+    assert write_if_changed(path, '# X\n**Date:** 2026-01-01\nbody')
+    assert not write_if_changed(path, '# X\n**Date:** 2026-10-18\nbody')
+    assert write_if_changed(path, '# X\n**Date:** 2026-10-18\nchanged')
+
+
+def test_crlf_file_is_cached_like_read_text(tmp_path):
+    from modules.cache import PARSE_CACHE
+    directory = tmp_path / 'crlf'
+    directory.mkdir()
+    path = directory / 'LESS-09.md'
+    path.write_bytes(b"# Title\r\n**REF-ID:** LESS-09\r\n\r\n## Body\r\n\r\n## Second\r\ntext\r\n")
+    _, content = IndexGenerator.write_index(directory)
+    assert '- [LESS-09] [Title](LESS-09.md)' in content
+
+    cached = PARSE_CACHE.get(path)
+    assert cached.title == 'Title'
+    assert cached.extract_sections() == [{'heading': 'Body', 'content': ''}, {'heading': 'Second', 'content': 'text\n'}]
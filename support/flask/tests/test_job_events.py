@@ -0,0 +1,106 @@
+"""
+tests/test_job_events.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Job progress and its Server-Sent Events stream
+Project: SIMA
+
+ADDED: Progress counts/cancel/wait, file-error and done events, Last-Event-ID resume, /api/jobs/<id>/events
+"""
+
+import json
+import threading
+
+import pytest
+
+from modules import jobs
+from modules.config import Config
+from modules.job_events import job_events
+from modules.jobs import FAILED, SUCCEEDED, Job, JobQueue
+from modules.progress import Cancelled, Progress
+
+@pytest.fixture(autouse=True)
+def fast_events(monkeypatch):
+    monkeypatch.setattr(Config, 'SSE_MIN_INTERVAL', 0)
+    monkeypatch.setattr(Config, 'SSE_HEARTBEAT_SECONDS', 1)
+
+def parse(stream):
+    """[(id, event, data)] of an SSE stream"""
+    events = []
+    for message in ''.join(stream).strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in message.splitlines())
+        events.append((int(fields['id']), fields['event'], json.loads(fields['data'])))
+    return events
+
+def finished_job(errors):
+    job = Job('export', {})
+    job.progress.start(3)
+    for n in range(3):
+        job.progress.advance(f'{n}.md', error='bad' if n < errors else None)
+    job.state = FAILED if errors else SUCCEEDED
+    return job
+
+
+def test_progress_counts_and_cancels_at_the_next_item():
+    progress = Progress()
+    progress.start(2)
+    progress.advance('a.md', error=ValueError('broken'))
+    snapshot = progress.snapshot()
+    assert (snapshot['done'], snapshot['total'], snapshot['errors']) == (1, 2, 1)
+    assert snapshot['recent_errors'] == [{'path': 'a.md', 'error': 'broken'}]
+    progress.cancel()
+    with pytest.raises(Cancelled):
+        progress.advance('b.md')
+
+
+def test_wait_returns_on_the_next_update():
+    progress = Progress()
+    seen = progress.version
+    threading.Timer(0.05, progress.advance, ['a.md']).start()
+    assert progress.wait(seen, 5) > seen
+    assert progress.wait(progress.version, 0.01) == progress.version
+
+
+def test_finished_job_sends_each_error_then_done():
+    events = parse(job_events(finished_job(errors=2)))
+    assert [(i, e) for i, e, _ in events] == [(2, 'file-error'), (2, 'file-error'), (2, 'done')]
+    assert [d['path'] for _, e, d in events if e == 'file-error'] == ['0.md', '1.md']
+    assert events[-1][2]['state'] == FAILED
+
+
+def test_reconnect_skips_errors_already_sent():
+    events = parse(job_events(finished_job(errors=2), errors_sent=1))
+    assert [(e, d.get('path')) for _, e, d in events] == [('file-error', '1.md'), ('done', None)]
+
+
+def test_running_job_streams_progress_until_done(tmp_path):
+    queue = JobQueue(tmp_path / 'jobs', workers=1)
+    step = threading.Event()
+
+    def run(progress):
+        progress.start(2)
+        step.wait(5)
+        progress.advance('a.md')
+        progress.advance('b.md')
+        return {'status': 'success'}
+    job = queue.submit('index', {}, run)
+    stream = job_events(job)
+    first = parse([next(stream)])[0]
+    assert first[1] == 'progress' and first[2]['state'] in ('queued', 'running')
+    step.set()
+    events = parse(stream)
+    assert events[-1][1] == 'done' and events[-1][2]['state'] == SUCCEEDED
+    assert events[-1][2]['progress']['done'] == 2
+
+
+def test_events_route(client, corpus, tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, '_QUEUE', JobQueue(tmp_path / 'jobs', workers=1))
+    submitted = client.post('/api/jobs', json={'kind': 'export', 'path': str(corpus)})
+    assert submitted.status_code == 202
+    response = client.get(submitted.get_json()['events_url'])
+    assert response.mimetype == 'text/event-stream'
+    events = parse(response.get_data(as_text=True))
+    assert events[-1][1] == 'done' and events[-1][2]['state'] == SUCCEEDED
+    assert events[-1][2]['progress']['done'] == events[-1][2]['progress']['total'] > 0
+    assert client.get('/api/jobs/unknown/events').status_code == 404
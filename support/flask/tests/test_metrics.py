@@ -0,0 +1,110 @@
+"""
+tests/test_metrics.py
+
+Version: 1.0.1
+Date: 2026-10-18
+Purpose: Metrics rendering for one process and summed across worker snapshots
+Project: SIMA
+
+ADDED: Single-process render, shared-directory aggregation, exited workers, snapshot cleanup
+ADDED: Request middleware labels by route template; /metrics 404 while disabled
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from modules.config import Config
+from modules.metrics import METRICS, START_TIME, Metrics, clear_snapshots
+
+def dead_pid() -> int:
+    proc = subprocess.Popen([sys.executable, '-c', 'pass'])
+    proc.wait()
+    return proc.pid
+
+def sample(text, line_start):
+    return [line for line in text.splitlines() if line.startswith(line_start)]
+
+@pytest.fixture
+def metrics(monkeypatch):
+    monkeypatch.setattr(Config, 'METRICS_ENABLED', True)
+    return Metrics()
+
+@pytest.fixture
+def shared(metrics, monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'METRICS_SHARED', True)
+    monkeypatch.setattr(Config, 'METRICS_DIR', tmp_path / 'metrics')
+    metrics.configure()
+    return metrics
+
+@pytest.fixture
+def instrumented(monkeypatch, request):
+    """Test client of an app with metrics on (the process-wide METRICS is switched off afterwards)"""
+    monkeypatch.setattr(Config, 'METRICS_ENABLED', True)
+    METRICS.reset()
+    yield request.getfixturevalue('client')
+    METRICS.configure(enabled=False)
+    METRICS.reset()
+
+def other_worker(metrics, pid, requests):
+    """Write the snapshot another worker process would have flushed"""
+    snapshot = metrics.snapshot()
+    snapshot.update(pid=pid, counters=[['sima_http_requests_total',
+                                        [['method', 'GET'], ['route', '/'], ['status', '200']], requests]],
+                    histograms=[['sima_http_request_duration_seconds', [['method', 'GET'], ['route', '/']],
+                                 [requests] + [0] * len(metrics.buckets) + [0.001 * requests, requests]]])
+    (Config.METRICS_DIR / f'metrics-{pid}.json').write_text(json.dumps(snapshot), encoding='utf-8')
+
+
+def test_single_process_render(metrics):
+    metrics.inc('sima_http_requests_total', route='/', method='GET', status=200)
+    metrics.observe('sima_http_request_duration_seconds', 0.002, route='/', method='GET')
+    text = metrics.render()
+    assert sample(text, 'sima_http_requests_total{') == ['sima_http_requests_total{method="GET",route="/",status="200"} 1']
+    assert 'sima_http_request_duration_seconds_count{method="GET",route="/"} 1' in text
+    assert sample(text, 'sima_process_start_time_seconds ')
+    assert not metrics.shared_dir
+
+
+def test_workers_are_summed(shared):
+    shared.inc('sima_http_requests_total', route='/', method='GET', status=200)
+    shared.observe('sima_http_request_duration_seconds', 0.002, route='/', method='GET')
+    other_worker(shared, os.getppid(), 3)
+    other_worker(shared, dead_pid(), 5)
+
+    text = shared.render()
+    assert sample(text, 'sima_http_requests_total{') == ['sima_http_requests_total{method="GET",route="/",status="200"} 9']
+    assert 'sima_http_request_duration_seconds_count{method="GET",route="/"} 9' in text
+    assert 'sima_http_request_duration_seconds_bucket{method="GET",route="/",le="0.005"} 9' in text
+    # Counters of exited workers stay in the totals; their gauges are dropped
+    assert sample(text, 'sima_process_start_time_seconds{pid=') == [
+        f'sima_process_start_time_seconds{{pid="{pid}"}} {START_TIME!r}' for pid in sorted((os.getpid(), os.getppid()), key=str)]
+
+
+def test_counters_do_not_depend_on_the_scraped_worker(shared):
+    other_worker(shared, 1, 3)
+    first = sample(shared.render(), 'sima_http_requests_total{')
+    other_worker(shared, 1, 4)
+    assert sample(shared.render(), 'sima_http_requests_total{') == [first[0][:-1] + '4']
+
+
+def test_clear_snapshots(shared):
+    other_worker(shared, 1, 3)
+    shared.flush()
+    assert clear_snapshots(Config.METRICS_DIR) == 2
+    assert not list(Config.METRICS_DIR.glob('metrics-*.json'))
+
+
+def test_requests_are_recorded_by_route_template(instrumented):
+    assert instrumented.get('/api/ref/NOPE-01').status_code == 404
+    instrumented.get('/api/ref/NOPE-02')
+    text = instrumented.get('/metrics').get_data(as_text=True)
+    assert 'sima_http_requests_total{method="GET",route="/api/ref/<ref_id>",status="404"} 2' in text
+    assert 'sima_http_request_duration_seconds_count{method="GET",route="/api/ref/<ref_id>"} 2' in text
+
+
+def test_metrics_endpoint_is_off_by_default(client):
+    assert client.get('/metrics').status_code == 404
@@ -0,0 +1,98 @@
+"""
+tests/test_operations.py
+
+Version: 1.0.1
+Date: 2026-10-18
+Purpose: Export operations - output names reserved while a job is pending
+Project: SIMA
+
+ADDED: Reservations released after a finished, failed or rejected export
+ADDED: Reservations released when a queued export is cancelled or the queue is full
+"""
+
+import threading
+
+import pytest
+
+from modules import operations
+from modules.config import Config
+from modules.delta import manifest_path
+from modules.jobs import CANCELLED, RUNNING, JobQueue, QueueFull
+
+@pytest.fixture
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'EXPORT_DIR', tmp_path / 'exports')
+    Config.EXPORT_DIR.mkdir()
+    yield Config.EXPORT_DIR
+    operations._RESERVED.clear()  # export_target() called outside a job keeps its reservation
+
+@pytest.fixture
+def busy_queue(tmp_path, monkeypatch):
+    """A one-worker queue whose worker is held by a running job"""
+    monkeypatch.setattr(Config, 'JOB_MAX_QUEUED', 1)
+    jobs = JobQueue(tmp_path / 'jobs', workers=1)
+    started, release = threading.Event(), threading.Event()
+
+    def hold(progress):
+        started.set()
+        release.wait(10)
+        return {}
+    blocker = jobs.submit('hold', {}, hold)
+    assert started.wait(10) and blocker.state == RUNNING
+    yield jobs
+    release.set()
+
+def submit_export(jobs, corpus):
+    run = operations.prepare_export({'path': str(corpus)})
+    return jobs.submit('export', {}, run, run.cleanup)
+
+
+def test_pending_exports_get_distinct_names(corpus, export_dir):
+    first = operations.prepare_export({'path': str(corpus)})
+    second = operations.prepare_export({'path': str(corpus)})
+    assert len(operations._RESERVED) == 2
+    names = {first()['filename'], second()['filename']}
+    assert len(names) == 2
+    assert operations._RESERVED == set()
+
+
+def test_finished_export_keeps_its_name_taken(corpus, export_dir):
+    result = operations.prepare_export({'path': str(corpus)})()
+    output_file, _, _ = operations.export_target({})
+    assert output_file.name != result['filename']
+    assert manifest_path(export_dir / result['filename']).exists()
+
+
+def test_failed_export_releases_its_name(corpus, export_dir):
+    (export_dir / 'bad.json').write_text('{}', encoding='utf-8')
+    run = operations.prepare_export({'path': str(corpus), 'base': 'bad.json'})
+    with pytest.raises(ValueError):
+        run()
+    assert operations._RESERVED == set()
+    assert [p.name for p in export_dir.iterdir()] == ['bad.json']
+
+
+def test_rejected_request_reserves_nothing(corpus, export_dir):
+    with pytest.raises(FileNotFoundError):
+        operations.prepare_export({'path': str(corpus), 'base': 'nope.json'})
+    with pytest.raises(ValueError):
+        operations.prepare_export_selected({'paths': [], 'workers': 'many'})
+    assert operations._RESERVED == set()
+
+
+def test_cancelled_queued_export_releases_its_name(corpus, export_dir, busy_queue):
+    job = submit_export(busy_queue, corpus)
+    assert len(operations._RESERVED) == 1
+    busy_queue.cancel(job.id)
+    assert job.state == CANCELLED
+    assert operations._RESERVED == set()
+    assert job.run is None and job.cleanup is None
+
+
+def test_export_rejected_by_full_queue_releases_its_name(corpus, export_dir, busy_queue):
+    queued = submit_export(busy_queue, corpus)
+    with pytest.raises(QueueFull):
+        submit_export(busy_queue, corpus)
+    assert len(operations._RESERVED) == 1  # only the queued export's name
+    busy_queue.cancel(queued.id)
+    assert operations._RESERVED == set()
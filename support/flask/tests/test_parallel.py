@@ -0,0 +1,69 @@
+"""
+tests/test_parallel.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Parallel export - chunked work, ordered results, output identical to a serial export
+Project: SIMA
+
+ADDED: chunked/ordered_map/resolve_workers, process-pool exports matching serial ones
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import time
+
+import pytest
+
+from conftest import read_all
+from modules.browser import FileBrowser
+from modules.config import Config
+from modules.managers import ExportManager
+from modules.parallel import chunked, ordered_map, resolve_workers
+
+
+def test_chunked_splits_lazily():
+    assert list(chunked(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(chunked([], 3)) == []
+
+
+def test_resolve_workers():
+    assert resolve_workers(3) == 3
+    assert resolve_workers(0) == resolve_workers(None) == (os.cpu_count() or 1)
+
+
+def test_ordered_map_keeps_submission_order_within_its_window():
+    in_flight, peak, lock = [0], [0], threading.Lock()
+
+    def work(chunk):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.01 * (5 - chunk[0]))  # early chunks finish last
+        with lock:
+            in_flight[0] -= 1
+        return [n * 10 for n in chunk]
+
+    with ThreadPoolExecutor(4) as executor:
+        results = list(ordered_map(executor, work, chunked(range(5), 1), window=2))
+    assert results == [[0], [10], [20], [30], [40]]
+    assert peak[0] <= 2
+
+
+@pytest.mark.parametrize('version', (1, 2))
+def test_parallel_export_matches_serial(corpus, tmp_path, monkeypatch, version):
+    monkeypatch.setattr(Config, 'EXPORT_CHUNK_SIZE', 4)
+    serial, parallel = tmp_path / 'serial.json', tmp_path / 'parallel.json'
+    a = ExportManager.export_to_json(corpus, serial, workers=1, archive_version=version, compression='')
+    b = ExportManager.export_to_json(corpus, parallel, workers=2, archive_version=version, compression='')
+    assert read_all(serial)[0] == read_all(parallel)[0]
+    assert a['checksums'] == b['checksums']
+
+
+def test_parallel_export_of_selected_files_keeps_their_order(corpus, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'EXPORT_CHUNK_SIZE', 3)
+    paths = list(reversed(list(FileBrowser.walk_markdown(corpus))))
+    output = tmp_path / 'selected.json'
+    ExportManager.export_files(((p, str(p)) for p in paths), output, workers=2, compression='')
+    assert [r['path'] for r in read_all(output)[0]] == [str(p) for p in paths]
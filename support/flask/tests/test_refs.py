@@ -0,0 +1,88 @@
+"""
+tests/test_refs.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: REF-ID resolution and Related-graph bundles
+Project: SIMA
+
+ADDED: Resolution (header and file-name IDs, duplicates), reverse links, closures, updates, /api/ref routes
+"""
+
+import pytest
+
+from modules.config import Config
+from modules.refs import RefIndex, related_ids
+
+def note(path, title, ref_id='', related=''):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    header = f"**REF-ID:** {ref_id}\n" if ref_id else ''
+    footer = f"\n**Related:** {related}\n" if related else ''
+    path.write_text(f"# {title}\n\n**Version:** 1.0.0\n{header}\n---\n\n## Body\n\nText.\n{footer}", encoding='utf-8')
+    return path
+
+@pytest.fixture
+def graph(tmp_path):
+    root = tmp_path / 'graph'
+    note(root / 'decisions' / 'one.md', 'One', 'DEC-01', 'AP-02 (anti-pattern), LESS-03')
+    note(root / 'anti' / 'AP-02-Globals.md', 'Globals', related='LESS-03, NOPE-09')
+    note(root / 'lessons' / 'three.md', 'Three', 'LESS-03')
+    note(root / 'lessons' / 'dup.md', 'Copy', 'DEC-01')
+    index = RefIndex(root)
+    index.refresh(force=True)
+    return root, index
+
+def ids(bundle):
+    return {entry['ref_id']: entry['depth'] for entry in bundle['entries']}
+
+
+def test_related_ids_are_unique_and_ordered():
+    assert related_ids(['DEC-17 (why), AP-28', 'DEC-17, LESS-01']) == ['DEC-17', 'AP-28', 'LESS-01']
+
+
+def test_resolve_from_header_or_file_name(graph):
+    root, index = graph
+    one = index.resolve('dec-01')
+    assert one['path'] == str(root / 'decisions' / 'one.md')
+    assert one['related'] == ['AP-02', 'LESS-03']
+    assert one['duplicates'] == [str(root / 'lessons' / 'dup.md')]
+    assert index.resolve('AP-02')['title'] == 'Globals'
+    assert index.resolve('LESS-03')['related_by'] == ['AP-02', 'DEC-01']
+    assert index.resolve('NOPE-09') is None
+
+
+def test_closure_by_depth_and_direction(graph):
+    _, index = graph
+    assert ids(index.closure('DEC-01', depth=0)) == {'DEC-01': 0}
+    bundle = index.closure('DEC-01', depth=2, content=False)
+    assert ids(bundle) == {'DEC-01': 0, 'AP-02': 1, 'LESS-03': 1}
+    assert bundle['missing'] == ['NOPE-09']
+    assert 'content' not in bundle['entries'][0]
+    assert ids(index.closure('LESS-03', depth=1)) == {'LESS-03': 0}
+    back = index.closure('LESS-03', depth=1, reverse=True)
+    assert ids(back) == {'LESS-03': 0, 'AP-02': 1, 'DEC-01': 1}
+    assert back['entries'][0]['content'].startswith('# Three')
+    assert index.closure('NOPE-09') is None
+
+
+def test_updates_and_removals_keep_the_graph_consistent(graph):
+    root, index = graph
+    (root / 'lessons' / 'dup.md').unlink()
+    note(root / 'decisions' / 'one.md', 'One', 'DEC-01', 'AP-02')
+    assert index.refresh(force=True) == {'added': 0, 'updated': 1, 'removed': 1}
+    assert index.resolve('DEC-01')['duplicates'] == []
+    assert index.resolve('LESS-03')['related_by'] == ['AP-02']
+    index.remove_tree(root / 'anti')
+    assert index.resolve('LESS-03')['related_by'] == []
+    assert index.stats() == {'root': str(root), 'files': 2, 'ref_ids': 2, 'edges': 1}
+
+
+def test_ref_routes(client, tmp_path, graph):
+    root, _ = graph
+    assert client.get('/api/ref/DEC-01', query_string={'path': str(root)}).get_json()['title'] == 'One'
+    assert client.get('/api/ref/NOPE-09', query_string={'path': str(root)}).status_code == 404
+    assert client.get('/api/ref/DEC-01', query_string={'path': str(tmp_path / 'missing')}).status_code == 404
+    closure = client.get('/api/ref/DEC-01/closure', query_string={'path': str(root), 'depth': 99, 'content': 0})
+    assert closure.get_json()['depth'] == Config.REF_CLOSURE_MAX_DEPTH
+    assert ids(closure.get_json()) == {'DEC-01': 0, 'AP-02': 1, 'LESS-03': 1}
+    assert client.get('/api/ref/DEC-01/closure', query_string={'path': str(root), 'depth': 'deep'}).status_code == 400
@@ -0,0 +1,148 @@
+"""
+tests/test_scanner.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Single-pass scanner against the legacy line-based parse on the repository's .md files
+Project: SIMA
+
+ADDED: Baseline comparison (identical outside code fences) and fence-handling cases
+"""
+
+import re
+
+import pytest
+
+from conftest import REPO_ROOT
+from modules.knowledge import KnowledgeFile
+from modules.scanner import scan_markdown
+
+HEADER_FIELDS = (('**Version:**', 'version'), ('**Date:**', 'date'), ('**Purpose:**', 'purpose'),
+                 ('**Category:**', 'category'), ('**REF-ID:**', 'ref_id'))
+
+FENCE_RE = re.compile(r' {0,3}(`{3,}|~{3,})(.*)$')
+
+def fenced_lines(lines):
+    """Indexes of lines inside code fences (fence lines included)"""
+    fenced = set()
+    marker = None
+    for i, line in enumerate(lines):
+        m = FENCE_RE.match(line)
+        if marker is None:
+            if m:
+                marker = m.group(1)
+                fenced.add(i)
+        else:
+            fenced.add(i)
+            if m and m.group(1).startswith(marker) and not m.group(2).strip():
+                marker = None
+    return fenced
+
+def legacy_parse(content: str, skip_fences: bool) -> dict:
+    """The pre-scanner KnowledgeFile parse, optionally ignoring lines inside code fences"""
+    lines = content.split('\n')
+    skip = fenced_lines(lines) if skip_fences else set()
+
+    metadata = {}
+    for i, line in enumerate(lines[:20]):
+        for field, key in HEADER_FIELDS:
+            if i not in skip and line.startswith(field):
+                metadata[key] = line[len(field):].strip()
+
+    title = next((line[2:] for i, line in enumerate(lines)
+                  if i not in skip and line.startswith('# ') and line[2:]), None)
+
+    def footer(marker):
+        for i, line in enumerate(lines):
+            pos = line.find(marker)
+            if i not in skip and pos >= 0 and line[pos + len(marker):]:
+                return [v.strip() for v in line[pos + len(marker):].split(',')]
+        return []
+
+    sections, current, body = [], None, []
+    for i, line in enumerate(lines):
+        if i not in skip and line.startswith('## '):
+            if current is not None:
+                sections.append((current, '\n'.join(body)))
+            current, body = line[3:].strip(), []
+        elif current is not None:
+            body.append(line)
+    if current is not None:
+        sections.append((current, '\n'.join(body)))
+
+    return {'metadata': metadata, 'title': title, 'keywords': footer('**Keywords:** '),
+            'related': footer('**Related:** '), 'sections': sections, 'line_count': len(lines)}
+
+def scanned(content: str) -> dict:
+    result = scan_markdown(content)
+    return {'metadata': result['metadata'], 'title': result['title'], 'keywords': result['keywords'],
+            'related': result['related'], 'line_count': result['line_count'],
+            'sections': [(s['heading'], content[s['start']:s['end']]) for s in result['sections']]}
+
+REPO_FILES = sorted(p for p in REPO_ROOT.rglob('*.md') if '.git' not in p.parts)
+
+
+def test_repository_has_markdown():
+    assert len(REPO_FILES) > 50
+
+
+@pytest.mark.parametrize('path', REPO_FILES, ids=lambda p: str(p.relative_to(REPO_ROOT)))
+def test_matches_baseline_outside_fences(path):
+    """Every field equals the legacy parse once lines inside code fences are ignored"""
+    content = KnowledgeFile(path).content
+    assert scanned(content) == legacy_parse(content, skip_fences=True)
+
+
+def test_only_fenced_files_differ_from_legacy():
+    """Files without code fences parse exactly as before; the rest differ only through fences"""
+    changed = []
+    for path in REPO_FILES:
+        content = KnowledgeFile(path).content
+        if scanned(content) != legacy_parse(content, skip_fences=False):
+            changed.append(path)
+            assert fenced_lines(content.split('\n')), path
+    # The repository's templates show headers and sections inside fences
+    assert any('templates' in p.parts for p in changed)
+
+
+def test_header_fields_inside_fence_are_ignored():
+    text = "# Title\n```markdown\n**Version:** 9.9.9\n```\n**Version:** 1.2.0\n**REF-ID:** DEC-01\n"
+    assert scan_markdown(text)['metadata'] == {'version': '1.2.0', 'ref_id': 'DEC-01'}
+
+
+def test_sections_inside_fence_are_ignored():
+    text = "# T\n\n## One\nbody\n~~~\n## Not a section\n~~~\n## Two\nend"
+    result = scanned(text)
+    assert result['sections'] == [('One', 'body\n~~~\n## Not a section\n~~~'), ('Two', 'end')]
+
+
+def test_footer_inside_fence_is_ignored():
+    text = "# T\n```\n**Related:** NOPE-1\n```\n**Related:** DEC-01, LESS-02\n"
+    assert scan_markdown(text)['related'] == ['DEC-01', 'LESS-02']
+
+
+def test_unclosed_fence_runs_to_end():
+    text = "# T\n## A\n```python\n## inside\n"
+    result = scan_markdown(text)
+    assert [s['heading'] for s in result['sections']] == ['A']
+    assert result['languages'] == {'python'}
+
+
+def test_languages_come_from_fence_info():
+    text = "# T\n```py\nx = 1\n```\n```{.javascript}\n```\n```\nplain\n```\nimport os in prose\n"
+    assert scan_markdown(text)['languages'] == {'python', 'javascript'}
+
+
+def test_longer_closing_fence_and_info_on_closer():
+    text = "```\na\n```` \n## After\n```\n```js\n## Still inside\n```\n"
+    # "```js" cannot close a fence; only the closer without info ends the block
+    assert [s['heading'] for s in scan_markdown(text)['sections']] == ['After']
+
+
+def test_crlf_files_parse_like_lf(tmp_path):
+    path = tmp_path / 'crlf.md'
+    path.write_bytes(b"# Title\r\n**REF-ID:** LESS-07\r\n\r\n## Body\r\ntext\r\n")
+    kf = KnowledgeFile(path)
+    assert kf.metadata == {'ref_id': 'LESS-07'}
+    assert kf.extract_sections() == [{'heading': 'Body', 'content': 'text\n'}]
+    assert kf.line_count == 6
@@ -0,0 +1,88 @@
+"""
+tests/test_search.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Full-text search - tokenizing, BM25 ranking, incremental updates, snippets, /api/search
+Project: SIMA
+
+ADDED: Field-weighted ranking, refresh of edited/deleted files, watched indexes, route errors
+"""
+
+import pytest
+
+from modules.search import SearchIndex, tokenize
+
+def note(path, ref_id, title, body, keywords=''):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    footer = f"\n**Keywords:** {keywords}\n" if keywords else ''
+    path.write_text(f"# {title}\n\n**Version:** 1.0.0\n**REF-ID:** {ref_id}\n**Purpose:** Test note\n\n---\n\n"
+                    f"## Details\n\n{body}\n{footer}", encoding='utf-8')
+    return path
+
+@pytest.fixture
+def notes(tmp_path):
+    root = tmp_path / 'notes'
+    note(root / 'a.md', 'LESS-01', 'Cache invalidation', 'Keys expire after an hour.')
+    note(root / 'b.md', 'LESS-02', 'Retries', 'Retry with backoff; the cache is not involved in retries.')
+    note(root / 'sub' / 'c.md', 'DEC-03', 'Logging', 'Structured logs, see DEC-17.', keywords='audit, tracing')
+    return root
+
+def paths(result):
+    return [r['path'].rsplit('/', 1)[-1] for r in result['results']]
+
+
+def test_tokenize_splits_hyphenated_words():
+    assert tokenize('See DEC-17, now!') == ['see', 'dec-17', 'dec', '17', 'now']
+
+
+def test_title_match_outranks_body_match(notes):
+    result = SearchIndex(notes).search('cache')
+    assert paths(result) == ['a.md', 'b.md']
+    assert result['total'] == 2
+    assert result['results'][0]['ref_id'] == 'LESS-01'
+    assert result['results'][0]['score'] > result['results'][1]['score']
+
+
+def test_keywords_and_ref_ids_are_searchable(notes):
+    index = SearchIndex(notes)
+    assert paths(index.search('tracing')) == ['c.md']
+    assert paths(index.search('DEC-17')) == ['c.md']
+
+
+def test_snippets_come_from_matching_sections(notes):
+    result = SearchIndex(notes).search('backoff')
+    assert result['results'][0]['sections'] == [
+        {'heading': 'Details', 'hits': 1, 'snippet': 'Retry with backoff; the cache is not involved in retries.'}]
+    assert 'sections' not in SearchIndex(notes).search('backoff', snippets=False)['results'][0]
+
+
+def test_refresh_reindexes_only_changes(notes):
+    index = SearchIndex(notes)
+    assert index.refresh(force=True) == {'added': 3, 'updated': 0, 'removed': 0}
+    note(notes / 'a.md', 'LESS-01', 'Cache invalidation', 'Keys now expire after a day, with jitter.')
+    (notes / 'b.md').unlink()
+    assert index.refresh(force=True) == {'added': 0, 'updated': 1, 'removed': 1}
+    assert paths(index.search('jitter')) == ['a.md']
+    assert index.search('backoff')['total'] == 0
+    assert index.stats()['documents'] == 2
+
+
+def test_watched_index_takes_updates_without_walking(notes):
+    index = SearchIndex(notes)
+    index.refresh(force=True)
+    index.watched = True
+    note(notes / 'd.md', 'LESS-04', 'Pagination', 'Cursor pages.')
+    assert index.search('pagination')['total'] == 0  # no walk while a watcher feeds changes
+    assert index.update_file(notes / 'd.md') == 'added'
+    assert paths(index.search('pagination')) == ['d.md']
+    index.remove_tree(notes / 'sub')
+    assert index.search('logging')['total'] == 0
+
+
+def test_api_search(client, corpus):
+    assert client.get('/api/search').status_code == 400
+    assert client.get('/api/search?q=x&limit=many').status_code == 400
+    assert client.get('/api/search', query_string={'q': 'x', 'path': str(corpus / 'missing')}).status_code == 404
+    result = client.get('/api/search?q=lesson&limit=2').get_json()
+    assert len(result['results']) <= 2 and result['query'] == 'lesson'
@@ -0,0 +1,82 @@
+"""
+tests/test_settings.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Production serving - settings sources, create_app(), the parse store shared by workers
+Project: SIMA
+
+ADDED: File/environment/mapping precedence, typed conversion, unknown names, create_app, SharedParseStore
+"""
+
+from pathlib import Path
+import json
+import os
+
+import pytest
+
+from modules.cache import ParseCache, SharedParseStore
+from modules.config import Config, apply_settings, load_settings, read_settings_file
+from sima_manager import create_app
+
+
+def test_environment_wins_over_the_settings_file(tmp_path):
+    settings_file = tmp_path / 'sima.json'
+    settings_file.write_text(json.dumps({'port': 6000, 'TREE_PAGE_SIZE': 50}), encoding='utf-8')
+    environ = {'SIMA_CONFIG': str(settings_file), 'SIMA_PORT': '7000', 'SIMA_lower': 'x', 'SIMA_NOT_A_SETTING': '1',
+               'OTHER_PORT': '1'}
+    assert load_settings(environ=environ) == {'PORT': '7000', 'TREE_PAGE_SIZE': 50}
+
+
+def test_yaml_settings_file(tmp_path):
+    pytest.importorskip('yaml')
+    settings_file = tmp_path / 'sima.yaml'
+    settings_file.write_text('watch_enabled: true\nexport_workers: 3\n', encoding='utf-8')
+    assert read_settings_file(settings_file) == {'watch_enabled': True, 'export_workers': 3}
+    settings_file.write_text('- a list\n', encoding='utf-8')
+    with pytest.raises(ValueError):
+        read_settings_file(settings_file)
+
+
+def test_settings_are_converted_to_their_default_types(saved_config):
+    applied = apply_settings({'debug': 'yes', 'PORT': '8080', 'sse_min_interval': '0.5',
+                              'metrics_scopes': 'http, cache', 'SIMA_ROOT': '/srv/kb'})
+    assert applied == {'DEBUG': True, 'PORT': 8080, 'SSE_MIN_INTERVAL': 0.5,
+                       'METRICS_SCOPES': ('http', 'cache'), 'SIMA_ROOT': Path('/srv/kb')}
+    assert Config.PORT == 8080 and Config.SIMA_ROOT == Path('/srv/kb')
+
+
+@pytest.mark.parametrize('settings', [{'PORT': '80', 'DEBUG': 'maybe'}, {'PORT': '80', 'NO_SUCH': 1},
+                                      {'PORT': '80', 'EXPORT_WORKERS': 'many'}])
+def test_bad_settings_change_nothing(saved_config, settings):
+    port = Config.PORT
+    with pytest.raises(ValueError):
+        apply_settings(settings)
+    assert Config.PORT == port
+
+
+def test_create_app_mapping_wins_and_directories_are_made(tmp_path, saved_config, monkeypatch):
+    monkeypatch.setenv('SIMA_TREE_PAGE_SIZE', '7')
+    monkeypatch.setenv('SIMA_EXPORT_DIR', str(tmp_path / 'env-exports'))
+    app = create_app({'EXPORT_DIR': str(tmp_path / 'exports'), 'ARCHIVE_DIR': str(tmp_path / 'archives'),
+                      'CATALOG_FILE': str(tmp_path / 'catalog.sqlite3'), 'JOB_DIR': str(tmp_path / 'jobs'),
+                      'PARSE_CACHE_SHARED': True, 'PARSE_CACHE_DB': str(tmp_path / 'parse.sqlite3')})
+    assert Config.TREE_PAGE_SIZE == 7
+    assert Config.EXPORT_DIR == tmp_path / 'exports' and Config.EXPORT_DIR.is_dir()
+    assert Config.ARCHIVE_DIR.is_dir() and not (tmp_path / 'env-exports').exists()
+    assert app.test_client().get('/api/jobs').status_code == 200
+    with pytest.raises(ValueError):
+        create_app({'NO_SUCH_SETTING': 1})
+
+
+def test_workers_share_parsed_files(corpus, tmp_path):
+    path = next(corpus.rglob('*.md'))
+    first, second = (ParseCache(10, shared=SharedParseStore(tmp_path / 'parse.sqlite3')) for _ in range(2))
+    parsed = first.get(path)
+    again = second.get(path)
+    assert second.stats()['shared_hits'] == 1
+    assert (again.title, again.sections) == (parsed.title, parsed.sections)
+
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10_000_000))
+    second.get(path)
+    assert second.stats()['shared_hits'] == 1  # a changed signature is parsed again
@@ -0,0 +1,147 @@
+"""
+tests/test_transaction.py
+
+Version: 1.0.1
+Date: 2026-10-18
+Purpose: ImportTransaction commit, rollback and crash recovery
+Project: SIMA
+
+ADDED: Rollback of writes/deletes/new directories, recover() of abandoned journals, import rollback
+ADDED: recover() of a leftover transaction with this pid but another process token
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from modules.managers import ExportManager
+from modules.transaction import TXN_PREFIX, ImportTransaction
+
+def snapshot(root):
+    return {str(p.relative_to(root)): p.read_text(encoding='utf-8') for p in sorted(root.rglob('*')) if p.is_file()}
+
+def dead_pid() -> int:
+    """pid of a process that has already exited"""
+    proc = subprocess.Popen([sys.executable, '-c', 'pass'])
+    proc.wait()
+    return proc.pid
+
+@pytest.fixture
+def target(tmp_path):
+    root = tmp_path / 'target'
+    (root / 'keep').mkdir(parents=True)
+    (root / 'keep' / 'a.md').write_text('old a', encoding='utf-8')
+    (root / 'b.md').write_text('old b', encoding='utf-8')
+    return root
+
+
+def test_commit_keeps_writes_and_removes_journal(target):
+    with ImportTransaction(target) as txn:
+        txn.write(target / 'keep' / 'a.md', 'new a')
+        txn.write(target / 'new' / 'c.md', 'c')
+        assert txn.delete(target / 'b.md')
+    assert snapshot(target) == {'keep/a.md': 'new a', 'new/c.md': 'c'}
+    assert not list(target.glob(f'{TXN_PREFIX}*'))
+    assert txn.bytes_written == len('new a') + len('c')
+
+
+def test_error_rolls_back_everything(target):
+    before = snapshot(target)
+    with pytest.raises(RuntimeError):
+        with ImportTransaction(target) as txn:
+            txn.write(target / 'keep' / 'a.md', 'new a')
+            txn.write(target / 'deep' / 'er' / 'c.md', 'c')
+            txn.delete(target / 'b.md')
+            raise RuntimeError('disk full')
+    assert snapshot(target) == before
+    assert not (target / 'deep').exists()
+    assert not list(target.glob(f'{TXN_PREFIX}*'))
+
+
+def test_rollback_removes_a_target_directory_it_created(tmp_path):
+    target = tmp_path / 'missing' / 'target'
+    txn = ImportTransaction(target)
+    txn.begin()
+    txn.write(target / 'x.md', 'x')
+    txn.rollback()
+    assert not (tmp_path / 'missing').exists()
+
+
+def test_delete_of_missing_file_is_a_no_op(target):
+    with ImportTransaction(target) as txn:
+        assert not txn.delete(target / 'nope.md')
+    assert txn.deleted == []
+
+
+def test_recover_undoes_an_abandoned_transaction(target):
+    before = snapshot(target)
+    txn = ImportTransaction(target)
+    txn.txn_dir = target / f'{TXN_PREFIX}20260101000000-{dead_pid()}-1'
+    txn.begin()
+    txn.write(target / 'keep' / 'a.md', 'half-imported')
+    txn.write(target / 'new' / 'c.md', 'c')
+    txn.delete(target / 'b.md')
+    txn._close_journal()  # the process "crashes" here: no commit, no rollback
+
+    assert ImportTransaction.recover(target) == [str(txn.txn_dir)]
+    assert snapshot(target) == before
+    assert not (target / 'new').exists()
+
+
+def test_recover_tolerates_a_torn_journal_line(target):
+    txn = ImportTransaction(target)
+    txn.txn_dir = target / f'{TXN_PREFIX}20260101000000-{dead_pid()}-2'
+    txn.begin()
+    txn.write(target / 'c.md', 'c')
+    txn._journal.write('{"op": "replace", "pa')
+    txn._close_journal()
+
+    ImportTransaction.recover(target)
+    assert not (target / 'c.md').exists()
+    assert snapshot(target) == {'keep/a.md': 'old a', 'b.md': 'old b'}
+
+
+def test_recover_leaves_live_transactions_alone(target):
+    with ImportTransaction(target) as txn:
+        txn.write(target / 'c.md', 'c')
+        assert ImportTransaction.recover(target) == []
+        assert (target / 'c.md').exists()
+
+
+def test_failed_import_rolls_back_earlier_records(target, tmp_path):
+    records = [
+        {'path': 'keep/a.md', 'title': 'A', 'metadata': {}, 'content': {'markdown': 'x'}},
+        {'path': 'z.md', 'title': 'Z', 'metadata': {}, 'content': {'markdown': 'z'}},
+    ]
+    archive = tmp_path / 'broken.json'
+    text = json.dumps({'manifest': {'version': '1.0.0'}, 'files': records})
+    archive.write_text(text[:-3], encoding='utf-8')  # truncated: malformed after the records
+    before = snapshot(target)
+    with pytest.raises(ValueError):
+        ExportManager.import_from_json(archive, target)
+    assert snapshot(target) == before
+
+
+@pytest.mark.parametrize('path', ['../escaped.md', '/abs/escaped.md', 'a/../../escaped.md'])
+def test_records_outside_the_target_are_per_file_errors(target, path):
+    records = [{'path': path, 'title': 'E', 'metadata': {}, 'content': {'markdown': ''}},
+               {'path': 'ok.md', 'title': 'OK', 'metadata': {}, 'content': {'markdown': ''}}]
+    imported = ExportManager.import_records(records, target)
+    assert imported == [str(target / 'ok.md')]
+    assert not (target.parent / 'escaped.md').exists()
+
+
+@pytest.mark.parametrize('owner', [f'{os.getpid()}-0123456789ab-1', f'{os.getpid()}-1'])
+def test_recover_undoes_a_transaction_of_an_earlier_process_with_this_pid(target, owner):
+    before = snapshot(target)
+    txn = ImportTransaction(target)
+    txn.txn_dir = target / f'{TXN_PREFIX}20260101000000-{owner}'
+    txn.begin()
+    txn.write(target / 'keep' / 'a.md', 'half-imported')
+    txn._close_journal()  # a restarted server often gets the same pid (PID 1 in a container)
+
+    assert ImportTransaction.recover(target) == [str(txn.txn_dir)]
+    assert snapshot(target) == before
@@ -0,0 +1,137 @@
+"""
+tests/test_watcher.py
+
+Version: 1.0.0
+Date: 2026-10-18
+Purpose: Filesystem watcher - backends, batches applied to the in-memory indexes, listing cache
+Project: SIMA
+
+ADDED: ListingCache scope/invalidation, polling and inotify backends, apply() batches, a live watcher
+"""
+
+import os
+import shutil
+import sys
+import time
+
+import pytest
+
+from modules.cache import LISTING_CACHE, ListingCache
+from modules.config import Config
+from modules.watcher import InotifyBackend, KnowledgeWatcher, PollingBackend
+
+@pytest.fixture
+def watched(corpus, tmp_path, monkeypatch):
+    """A watcher over corpus (not started) with its catalog under tmp_path"""
+    monkeypatch.setattr(Config, 'CATALOG_FILE', tmp_path / 'catalog.sqlite3')
+    watcher = KnowledgeWatcher(corpus)
+    for index in watcher._indexes():
+        index.refresh(force=True)
+    return watcher
+
+def found(watcher, query):
+    return [r['path'] for r in watcher._indexes()[0].search(query, snippets=False)['results']]
+
+def eventually(check, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not check():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+def note(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"# {text}\n\n**REF-ID:** DEC-98\n\n## Body\n\n{text}\n", encoding='utf-8')
+    return path
+
+
+def test_listing_cache_serves_only_its_root(tmp_path):
+    (tmp_path / 'root' / 'sub').mkdir(parents=True)
+    (tmp_path / 'other').mkdir()
+    cache = ListingCache()
+    assert [e[0] for e in cache.list(str(tmp_path / 'root'))] == ['sub']
+    assert cache.stats()['entries'] == 0  # disabled: always scans
+
+    cache.enable(tmp_path / 'root')
+    cache.list(str(tmp_path / 'root'))
+    cache.list(str(tmp_path / 'root' / 'sub'))
+    cache.list(str(tmp_path / 'other'))
+    (tmp_path / 'root' / 'new.md').write_text('# New\n', encoding='utf-8')
+    assert [e[0] for e in cache.list(str(tmp_path / 'root'))] == ['sub']  # stale until invalidated
+    assert cache.stats()['entries'] == 2 and cache.stats()['hits'] == 1
+
+    cache.invalidate(str(tmp_path / 'root'), recursive=True)
+    assert cache.stats()['entries'] == 0
+    assert [e[0] for e in cache.list(str(tmp_path / 'root'))] == ['new.md', 'sub']
+
+
+def test_polling_backend_reports_changes(tmp_path):
+    (tmp_path / 'a.md').write_text('a', encoding='utf-8')
+    (tmp_path / 'gone.md').write_text('g', encoding='utf-8')
+    backend = PollingBackend(str(tmp_path), interval=0)
+    assert backend.read(0) == set()
+    (tmp_path / 'a.md').write_text('changed', encoding='utf-8')
+    (tmp_path / 'gone.md').unlink()
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / '.hidden').mkdir()
+    assert backend.read(0) == {str(tmp_path / p) for p in ('a.md', 'gone.md', 'sub')}
+
+
+@pytest.mark.skipif(not InotifyBackend.available(), reason='inotify is Linux-only')
+def test_inotify_backend_follows_new_directories(tmp_path):
+    backend = InotifyBackend(str(tmp_path))
+    try:
+        (tmp_path / 'sub').mkdir()
+        assert str(tmp_path / 'sub') in backend.read(1.0)
+        (tmp_path / 'sub' / 'a.md').write_text('a', encoding='utf-8')
+        changed = set()
+        assert eventually(lambda: changed.update(backend.read(0.1)) or str(tmp_path / 'sub' / 'a.md') in changed)
+    finally:
+        backend.close()
+
+
+def test_apply_updates_indexes_for_files_and_deleted_directories(watched, corpus):
+    added = note(corpus / 'generic' / 'zebra.md', 'Zebra crossing')
+    hidden = note(corpus / '.drafts' / 'secret.md', 'Zebra draft')
+    batch = watched.apply({str(added), str(hidden)})
+    assert batch == dict(batch, paths=2, files_updated=1, rescan=False)
+    assert found(watched, 'zebra') == [str(added)]
+    assert watched._indexes()[1].resolve('DEC-98')['path'] == str(added)
+
+    os.unlink(added)
+    watched.apply({str(added)})
+    assert found(watched, 'zebra') == []
+
+
+def test_apply_drops_a_deleted_directory(watched, corpus):
+    decisions = corpus / 'generic' / 'decisions'
+    search, refs, _ = watched._indexes()
+    gone = len(list(decisions.rglob('*.md')))
+    before = search.stats()['documents'], refs.stats()['files']
+    shutil.rmtree(decisions)
+    assert watched.apply({str(decisions)})['files_updated'] == 0
+    assert (search.stats()['documents'], refs.stats()['files']) == (before[0] - gone, before[1] - gone)
+
+
+def test_root_event_rescans_everything(watched, corpus):
+    added = note(corpus / 'platforms' / 'yak.md', 'Yak shaving')
+    assert watched.apply({str(corpus)})['rescan'] is True
+    assert found(watched, 'yak') == [str(added)]
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='timing-sensitive on Windows')
+def test_running_watcher_keeps_search_current(watched, corpus, monkeypatch):
+    monkeypatch.setattr(Config, 'WATCH_POLL_INTERVAL', 0.05)
+    watched.debounce = 0.05
+    watched.backend_name = 'polling'
+    watched.start()
+    try:
+        assert LISTING_CACHE.enabled and LISTING_CACHE.root == str(corpus)
+        added = note(corpus / 'generic' / 'quokka.md', 'Quokka habits')
+        assert eventually(lambda: found(watched, 'quokka') == [str(added)])
+        assert watched.stats()['backend'] == 'PollingBackend' and watched.stats()['batches'] >= 1
+    finally:
+        watched.stop()
+    assert not LISTING_CACHE.enabled
+    assert not watched._indexes()[0].watched
@@ -0,0 +1,22 @@
+"""
+wsgi.py
+
+Version: 1.0.1
+Date: 2026-10-18
+Purpose: WSGI entry point for multi-worker serving (gunicorn -c gunicorn.conf.py wsgi:app)
+Project: SIMA
+
+ADDED: Module-level app with the shared parse store enabled by default
+MODIFIED: Shared metrics enabled by default
+"""
+
+import os
+
+# Workers share parsed metadata through Config.PARSE_CACHE_DB unless told otherwise
+os.environ.setdefault('SIMA_PARSE_CACHE_SHARED', 'true')
+# ...and /metrics sums every worker's snapshot in Config.METRICS_DIR
+os.environ.setdefault('SIMA_METRICS_SHARED', 'true')
+
+from sima_manager import create_app  # noqa: E402
+
+app = create_app()